@@ -13,10 +13,24 @@ from app.db.base import Base
 
 # Import all models here to register them with Base.metadata for migration file
 from app.models.data_source import DataSource
-from app.models.grafana_source import GrafanaSource
-from app.models.kibana_source import KibanaSource
+from app.models.data_source_acl import DataSourceAcl
+from app.models.source import Source
+from app.models.source_health import SourceHealth
+from app.models.grafana_dashboard import GrafanaDashboard
 from app.models.permission import Permission
+from app.models.refresh_token import RefreshToken
+from app.models.api_key import ApiKey
+from app.models.authz_version import AuthzVersion
+from app.models.delete_job import DeleteJob
+from app.models.summary_counter import SummaryCounter
+from app.models.change_log import ChangeLog
+from app.models.change_sequence import ChangeSequence
 from app.models.role_has_permissions import RoleHasPermissions
+from app.models.user_has_roles import UserHasRoles
+from app.models.user_effective_permission import UserEffectivePermission
+from app.models.role_inheritance import RoleInheritance
+from app.models.role_closure import RoleClosure
+from app.models.role_permission_pattern import RolePermissionPattern
 from app.models.role import Role
 from app.models.user import User
 
@@ -0,0 +1,62 @@
+"""Rename permission read_all_data_sources to bypass_data_source_acl
+
+Revision ID: d3b8f6a2c4e7
+Revises: a9e4c2d7b5f3
+Create Date: 2026-10-22 09:41:15.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b8f6a2c4e7'
+down_revision: Union[str, None] = 'a9e4c2d7b5f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_NAME = 'read_all_data_sources'
+NEW_NAME = 'bypass_data_source_acl'
+
+
+def upgrade() -> None:
+    # Databases migrated before 6b1d0f3e8c24 seeded the bypass permission under
+    # its old name, which read_* wildcard grants match
+    bind = op.get_bind()
+    ids = dict(bind.execute(
+        sa.text("SELECT name, id FROM permissions WHERE name IN (:old, :new)"),
+        {'old': OLD_NAME, 'new': NEW_NAME},
+    ).all())
+    if OLD_NAME not in ids:
+        return
+    if NEW_NAME not in ids:
+        bind.execute(sa.text("UPDATE permissions SET name = :new WHERE id = :old_id"),
+                     {'new': NEW_NAME, 'old_id': ids[OLD_NAME]})
+    else:
+        # `seed` already added the new name: move the grants over to it
+        params = {'old_id': ids[OLD_NAME], 'new_id': ids[NEW_NAME]}
+        for table, key, columns in (
+                ('role_has_permissions', 'role_id', 'role_id, expires_at'),
+                ('user_effective_permissions', 'user_id', 'user_id'),
+        ):
+            existing = {row[0] for row in bind.execute(
+                sa.text(f"SELECT {key} FROM {table} WHERE permission_id = :new_id"), params
+            ).all()}
+            rows = bind.execute(sa.text(f"SELECT {columns} FROM {table} WHERE permission_id = :old_id"), params).all()
+            for row in rows:
+                if row[0] not in existing:
+                    values = dict(zip([c.strip() for c in columns.split(',')], row), permission_id=ids[NEW_NAME])
+                    bind.execute(sa.text(
+                        f"INSERT INTO {table} ({', '.join(values)}) VALUES ({', '.join(':' + c for c in values)})"
+                    ), values)
+            bind.execute(sa.text(f"DELETE FROM {table} WHERE permission_id = :old_id"), params)
+        bind.execute(sa.text("DELETE FROM permissions WHERE id = :old_id"), params)
+    # Snapshots compiled with the old name are stale
+    op.execute("UPDATE authz_versions SET users_version = users_version + 1, roles_version = roles_version + 1")
+
+
+def downgrade() -> None:
+    # The older revisions seed the new name as well; nothing to undo
+    pass
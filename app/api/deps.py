@@ -1,17 +1,25 @@
 # app/api/deps.py
 
-from fastapi import Depends, status
-from typing import Callable
+from fastapi import Depends, Query, status
+from typing import Callable, Iterable, List, Optional
 from sqlmodel import Session, select
-from app.core.security import decode_token
+from datetime import datetime, UTC
+from app.core.security import decode_access_token, decode_token, hash_token
+from app.core.rbac_graph import rbac_graph_store
+from app.core.effective_permissions import user_permission_names
+from app.core.api_keys import is_api_key, last_used_tracker
 from app.db.database import get_session
 from app.models.user import User
+from app.models.role import Role
+from app.models.api_key import ApiKey
 from app.schemas.user import UserPermissions
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.schemas.pagination import Pagination
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
 from app.core.response_controller import ResponseController
 import re
 
-bearer_scheme = HTTPBearer()
+bearer_scheme = HTTPBearer(auto_error=False)
+api_key_scheme = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 def format_source_url(url: str) -> str:
     """Ensures the URL starts with 'http://' or 'https://', and removes trailing slash if present."""
@@ -29,11 +37,88 @@ def get_db_session():
     # Use get_session directly and delegate to it
     yield from get_session()
 
+def get_pagination(
+        limit: int = Query(100, ge=1, le=1000),
+        after_id: Optional[int] = Query(None, ge=0),
+) -> Pagination:
+    """Keyset pagination: `after_id` is the last id of the previous page."""
+    return Pagination(limit=limit, after_id=after_id)
+
+def build_user_permissions(
+        user: User,
+        role: Role,
+        roles: List[Role],
+        permissions: Iterable[str]
+) -> UserPermissions:
+    """Resolve a user acting under some roles into the principal used by the endpoints."""
+    return UserPermissions(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        status=user.status,
+        role=role,
+        roles=[r.name for r in roles],
+        role_ids=[r.id for r in roles],
+        permissions=list(set(permissions))
+    )
+
+def get_api_key_user(api_key: str, db: Session) -> UserPermissions:
+    """
+    Authenticate a service account by API key.
+
+    Keys are looked up by their SHA-256 digest through a unique index, so this
+    is a single indexed query with no bcrypt involved.
+    """
+    statement = (
+        select(ApiKey, User, Role)
+        .join(User, ApiKey.user_id == User.id)
+        .join(Role, ApiKey.role_id == Role.id)
+        .where(ApiKey.key_hash == hash_token(api_key))
+    )
+    row = db.exec(statement).first()
+    if not row:
+        return ResponseController.send_error(
+            error="Invalid API key.", 
+            error_messages={}, 
+            code=status.HTTP_401_UNAUTHORIZED)
+
+    stored_key, user, role = row
+    if stored_key.expires_at is not None:
+        expires_at = stored_key.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=UTC)
+        if expires_at <= datetime.now(UTC):
+            return ResponseController.send_error(
+                error="API key has expired.", 
+                error_messages={}, 
+                code=status.HTTP_401_UNAUTHORIZED)
+
+    last_used_tracker.touch(stored_key.id)
+    # The key is scoped to its role only, not to the account's roles; the
+    # graph has the role's inherited and wildcard grants already expanded
+    permissions = [p.name for p in rbac_graph_store.current().role_effective_permissions(role.id)]
+    return build_user_permissions(user, role, [role], permissions)
+
 def get_current_user(
-        credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), 
+        credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme), 
+        api_key: Optional[str] = Depends(api_key_scheme),
         db: Session = Depends(get_db_session)
 ) -> UserPermissions:
-    token = credentials.credentials
+    """
+    Resolve the caller from either a bearer JWT or an API key.
+
+    API keys may be sent in the X-API-Key header or as the bearer token.
+    """
+    token = api_key or (credentials.credentials if credentials else None)
+    if not token:
+        return ResponseController.send_error(
+            error="Not authenticated.", 
+            error_messages={}, 
+            code=status.HTTP_401_UNAUTHORIZED)
+
+    if is_api_key(token):
+        return get_api_key_user(token, db)
+
     # Decode the token to get the username
     username = decode_token(token)
     if not username:
@@ -51,22 +136,33 @@ def get_current_user(
             error_messages={}, 
             code=status.HTTP_404_NOT_FOUND)
     
-    role = user.role
-    permissions = set()
-    for perm in role.permissions:
-        permissions.add(perm.name)
-
-    return UserPermissions(
-        id=user.id,
-        name=user.name,
-        email=user.email,
-        status=user.status,
-        role=role,
-        permissions=list(permissions)
-    )
+    # Effective permissions over all of the user's roles are materialized,
+    # so this is a single indexed lookup however many roles the user has
+    return build_user_permissions(
+        user, user.role, user.roles, user_permission_names(db, user.id))
 
 def user_has_permission(perm: str) -> Callable:
-    def dependency(current_user: UserPermissions = Depends(get_current_user)):
+    def dependency(
+            credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme), 
+            api_key: Optional[str] = Depends(api_key_scheme),
+            db: Session = Depends(get_db_session)
+    ):
+        token = api_key or (credentials.credentials if credentials else None)
+
+        # Bearer JWTs carry the user id, so the check is answered from the
+        # in-process RBAC graph with only a signature verification and no DB access
+        if token and not is_api_key(token):
+            user_id = decode_access_token(token).get("uid")
+            allowed = rbac_graph_store.user_has_permission(user_id, perm) if user_id is not None else None
+            if allowed is not None:
+                if not allowed:
+                    return ResponseController.send_error(
+                        error="You don't have enough permissions.", 
+                        error_messages={}, 
+                        code=status.HTTP_403_FORBIDDEN)
+                return True
+
+        current_user = get_current_user(credentials, api_key, db)
         if perm not in current_user.permissions:
             return ResponseController.send_error(
                 error="You don't have enough permissions.", 
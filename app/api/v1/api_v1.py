@@ -7,10 +7,17 @@ from app.api.v1.endpoints import (
     roles,
     permissions,
     data_sources,
-    kibana_sources,
-    grafana_sources,
+    kibana_saved_objects,
+    sources,
+    grafana_dashboards,
     role_has_permissions,
-    logout
+    logout,
+    api_keys,
+    authz,
+    reports,
+    rbac_config,
+    delete_jobs,
+    summary
 )
 
 api_router = APIRouter()
@@ -22,5 +29,17 @@ api_router.include_router(permissions.router, prefix="/permissions", tags=["perm
 api_router.include_router(roles.router, prefix="/roles", tags=["roles"])
 api_router.include_router(role_has_permissions.router, prefix="/role-has-permissions", tags=["role_has_permissions"])
 api_router.include_router(data_sources.router, prefix="/data-sources", tags=["data_sources"])
-api_router.include_router(grafana_sources.router, prefix="/grafana-sources", tags=["grafana_sources"])
-api_router.include_router(kibana_sources.router, prefix="/kibana-sources", tags=["kibana_sources"])
+api_router.include_router(sources.router, prefix="/sources", tags=["sources"])
+for source_type, source_type_router in sources.type_routers.items():
+    api_router.include_router(source_type_router, prefix=f"/sources/{source_type.value}", tags=["sources"])
+    if source_type in sources.LEGACY_PREFIXES:
+        api_router.include_router(source_type_router, prefix=sources.LEGACY_PREFIXES[source_type],
+                                  tags=[f"{source_type.value}_sources"])
+api_router.include_router(grafana_dashboards.router, prefix="/grafana-dashboards", tags=["grafana_dashboards"])
+api_router.include_router(kibana_saved_objects.router, prefix="/kibana-saved-objects", tags=["kibana_saved_objects"])
+api_router.include_router(api_keys.router, prefix="/api-keys", tags=["api_keys"])
+api_router.include_router(authz.router, prefix="/authz", tags=["authz"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(rbac_config.router, prefix="/rbac", tags=["rbac_config"])
+api_router.include_router(delete_jobs.router, prefix="/delete-jobs", tags=["delete_jobs"])
+api_router.include_router(summary.router, prefix="/summary", tags=["summary"])
@@ -0,0 +1,127 @@
+# app/api/v1/endpoints/api_keys.py
+
+from fastapi import APIRouter, Depends, status
+from sqlmodel import Session, select
+
+from app.api.deps import get_db_session, user_has_permission, get_current_user
+from app.core.api_keys import generate_api_key
+from app.core.rbac_graph import rbac_graph_store
+from app.core.security import hash_token
+from app.schemas.user import UserPermissions
+from app.schemas.api_key import ApiKeyCreate, ApiKeyRead
+from app.models.api_key import ApiKey
+from app.models.role import Role
+from app.models.user import User
+from app.core.response_controller import ResponseController
+from app.schemas.response_controller import SuccessResponse
+
+router = APIRouter()
+
+@router.get("/", response_model=SuccessResponse)
+def read_api_keys(
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("read_api_key")),
+):
+    """List all API keys. The keys themselves are never returned."""
+    api_keys = db.exec(select(ApiKey)).all()
+    pydantic_api_keys = [ApiKeyRead.model_validate(k) for k in api_keys]
+
+    result = {"api_keys": pydantic_api_keys}
+    return ResponseController.send_response(
+        result=result,
+        message="List of API keys",
+        code=status.HTTP_200_OK
+    )
+
+@router.post("/", response_model=SuccessResponse)
+def create_api_key(
+    api_key_in: ApiKeyCreate,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("create_api_key")),
+    current_user: UserPermissions = Depends(get_current_user),
+):
+    """
+    Create an API key for a service account.
+
+    The key is only returned in this response; only its digest is stored.
+    A key can only carry permissions the caller holds, and only callers with
+    `manage_api_keys` may create keys for other users.
+    """
+    user_id = api_key_in.user_id if api_key_in.user_id is not None else current_user.id
+    if user_id != current_user.id and "manage_api_keys" not in current_user.permissions:
+        return ResponseController.send_error(
+            error="You can only create API keys for yourself.",
+            error_messages={"user_id": ["Creating keys for other users requires manage_api_keys"]},
+            code=status.HTTP_403_FORBIDDEN
+        )
+    if not db.get(User, user_id):
+        return ResponseController.send_error(
+            error="User not found",
+            error_messages={},
+            code=status.HTTP_400_BAD_REQUEST
+        )
+
+    role = db.exec(select(Role).where(Role.name == api_key_in.role)).first()
+    if not role:
+        return ResponseController.send_error(
+            error="Role not found, please create it first",
+            error_messages={},
+            code=status.HTTP_400_BAD_REQUEST
+        )
+    # Everything the role grants, inherited and wildcard grants included
+    missing = sorted(
+        {p.name for p in rbac_graph_store.current().role_effective_permissions(role.id)}
+        - set(current_user.permissions)
+    )
+    if missing:
+        return ResponseController.send_error(
+            error="The role grants permissions you don't have.",
+            error_messages={"role": missing},
+            code=status.HTTP_403_FORBIDDEN
+        )
+
+    raw_key = generate_api_key()
+    api_key = ApiKey(
+        name=api_key_in.name,
+        key_prefix=raw_key[:12],
+        key_hash=hash_token(raw_key),
+        user_id=user_id,
+        role_id=role.id,
+        expires_at=api_key_in.expires_at,
+    )
+    db.add(api_key)
+    db.commit()
+    db.refresh(api_key)
+
+    pydantic_api_key = ApiKeyRead.model_validate(api_key)
+    result = {"api_key": pydantic_api_key, "key": raw_key}
+
+    return ResponseController.send_response(
+        result=result,
+        message="API key created successfully",
+        code=status.HTTP_201_CREATED
+    )
+
+@router.delete("/{api_key_id}", response_model=SuccessResponse)
+def delete_api_key(
+    api_key_id: int,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("delete_api_key")),
+):
+    """Revoke an API key by ID."""
+    api_key = db.get(ApiKey, api_key_id)
+    if not api_key:
+        return ResponseController.send_error(
+            error="API key not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND
+        )
+
+    db.delete(api_key)
+    db.commit()
+
+    return ResponseController.send_response(
+        result={},
+        message="API key deleted successfully",
+        code=status.HTTP_200_OK
+    )
@@ -7,13 +7,28 @@ from app.models.user import User
 from app.core.security import create_access_token 
 from app.core.hashing import verify_password
 from app.core.config import settings
+from app.core.refresh_tokens import issue_refresh_token, rotate_refresh_token
 from app.api.deps import get_session
 from starlette import status
 from app.core.response_controller import ResponseController
 from app.schemas.response_controller import SuccessResponse
 from app.schemas.login import LoginRequest
+from app.schemas.token import RefreshRequest
  
 router = APIRouter()
+
+def build_token_response(user: User, refresh_token: str, refresh_expires_at: datetime) -> dict:
+    """Issue a fresh access token and pair it with the given refresh token."""
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        username=user.email, expires_delta=access_token_expires, user_id=user.id)
+    return {
+        "access_token": {"token_type": "bearer", 
+                         "token": access_token, 
+                         "expires_at": str(datetime.now(UTC) + access_token_expires)}, 
+        "refresh_token": {"token": refresh_token,
+                          "expires_at": str(refresh_expires_at)},
+        "user":{"email":user.email}}
  
 @router.post("/login", response_model=SuccessResponse)
 def login(
@@ -39,16 +54,38 @@ def login(
             error_messages={}, 
             code=status.HTTP_401_UNAUTHORIZED)
     
-    # Generate access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(username=user.email, expires_delta=access_token_expires)
+    # Start a new refresh token family for this login
+    refresh_token, stored_token = issue_refresh_token(db, user.id)
+    db.commit()
     
     return ResponseController.send_response(
-            result={
-                "access_token": {"token_type": "bearer", 
-                                 "token": access_token, 
-                                 "expires_at": str(datetime.now(UTC) + access_token_expires)}, 
-                "user":{"email":user.email}},
+            result=build_token_response(user, refresh_token, stored_token.expires_at),
             message="Login successful",
             code=status.HTTP_200_OK
         )
+
+@router.post("/refresh", response_model=SuccessResponse)
+def refresh(
+    request: RefreshRequest,
+    db: Session = Depends(get_session)
+):
+    """
+    Exchange a refresh token for a new access token.
+
+    The presented refresh token is rotated: it is revoked and a new one is returned.
+    Re-using an already rotated token revokes every token issued from the same login.
+    """
+    refresh_token, stored_token = rotate_refresh_token(db, request.refresh_token)
+    user = db.get(User, stored_token.user_id)
+    if not user:
+        return ResponseController.send_error(
+            error="User not found.", 
+            error_messages={}, 
+            code=status.HTTP_401_UNAUTHORIZED)
+    db.commit()
+
+    return ResponseController.send_response(
+            result=build_token_response(user, refresh_token, stored_token.expires_at),
+            message="Token refreshed successfully",
+            code=status.HTTP_200_OK
+        )
@@ -0,0 +1,34 @@
+# app/api/v1/endpoints/authz.py
+
+from fastapi import APIRouter, Depends, status
+from sqlmodel import Session
+
+from app.api.deps import get_db_session, user_has_permission
+from app.core.authz_decisions import evaluate
+from app.core.response_controller import ResponseController
+from app.schemas.authz import AuthzDecisionRequest
+from app.schemas.response_controller import SuccessResponse
+
+router = APIRouter()
+
+@router.post("/decisions", response_model=SuccessResponse)
+def authorization_decisions(
+    request: AuthzDecisionRequest,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("check_authorization")),
+):
+    """
+    Answer a batch of (subject, action, resource) checks in one request.
+
+    Decisions are returned in the order of the checks. An action is a
+    permission name; with a resource, the subject must also be able to see
+    the data source the resource belongs to.
+    """
+    decisions = evaluate(db, request.checks)
+
+    result = {"decisions": decisions}
+    return ResponseController.send_response(
+        result=result,
+        message="Authorization decisions",
+        code=status.HTTP_200_OK
+    )
@@ -1,48 +1,59 @@
 # app/api/v1/endpoints/data_sources.py
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, status
 from sqlalchemy import and_
 from sqlmodel import Session, select
 from datetime import datetime, UTC
 
-from app.api.deps import get_db_session, user_has_permission, get_current_user
+from sqlalchemy.orm import selectinload
+from app.api.deps import get_db_session, get_pagination, user_has_permission, get_current_user
 from app.schemas.user import UserPermissions
+from app.schemas.pagination import Pagination
 from app.models.data_source import DataSource
-from app.models.grafana_source import GrafanaSource
-from app.models.kibana_source import KibanaSource
+from app.models.data_source_acl import DataSourceAcl
+from app.models.source import Source
+from app.models.role import Role
+from app.models.user import User
+from app.core import cascade_delete, change_feed, summary_counters
+from app.core.data_source_acl import can_see, filter_visible
+from app.core.pagination import paginate, split_page
 
 from app.schemas.data_source import (
     DataSourceCreate,
     DataSourceRead,
     DataSourceUpdate,
 )
+from app.schemas.data_source_acl import DataSourceAclCreate, DataSourceAclRead
+from app.schemas.delete_job import DeleteJobRead
 from app.core.response_controller import ResponseController
 from app.schemas.response_controller import SuccessResponse
 
 router = APIRouter()
 
+def _record_grant_change(db: Session, data_source_id: int) -> None:
+    # Who sees the sources of the data source changed: they are fed again, so
+    # mirrors of the principals that gained or lost them catch up
+    change_feed.record_select(db, change_feed.SOURCES, select(Source.id).where(Source.data_source_id == data_source_id))
+
 @router.get("/", response_model=SuccessResponse)
 def read_data_sources(
     db: Session = Depends(get_db_session),
+    page: Pagination = Depends(get_pagination),
     has_perm: bool = Depends(user_has_permission("read_data_source")),
+    current_user: UserPermissions = Depends(get_current_user),
 ):
-    """List all data sources."""
-    data_sources = db.exec(select(DataSource)).all()
-
-    # Ensure grafana or kibana sources are loaded for each data source
-    for data_source in data_sources:
-        if data_source.type == "grafana":
-            data_source.grafana_sources = db.exec(
-                select(GrafanaSource).where(GrafanaSource.data_source_id == data_source.id)
-            ).all()
-        elif data_source.type == "kibana":
-            data_source.kibana_sources = db.exec(
-                select(KibanaSource).where(KibanaSource.data_source_id == data_source.id)
-            ).all()
+    """List the data sources visible to the current user, one page at a time."""
+    statement = (
+        select(DataSource)
+        # All sources of the page in one query on ix_sources_data_source_id_type
+        .options(selectinload(DataSource.sources))
+    )
+    statement = filter_visible(statement, DataSource.id, current_user)
+    data_sources, next_after_id = split_page(db.exec(paginate(statement, DataSource.id, page)).all(), page)
 
     pydantic_data_sources = [DataSourceRead.model_validate(ds) for ds in data_sources]
 
-    result = {"data_sources": pydantic_data_sources}
+    result = {"data_sources": pydantic_data_sources, "next_after_id": next_after_id}
     return ResponseController.send_response(
         result=result,
         message="List of data sources",
@@ -54,10 +65,12 @@ def read_data_source(
     data_source_id: int,
     db: Session = Depends(get_db_session),
     has_perm: bool = Depends(user_has_permission("read_data_source")),
+    current_user: UserPermissions = Depends(get_current_user),
 ):
     """Retrieve a single data source by its ID."""
     data_source = db.get(DataSource, data_source_id)
-    if not data_source:
+    # Data sources the user may not see are reported as missing
+    if not data_source or not can_see(db, current_user, data_source_id):
         return ResponseController.send_error(
             error="Data source not found",
             error_messages={},
@@ -99,6 +112,9 @@ def create_data_source(
         created_by_id=current_user.id
     )
     db.add(data_source)
+    db.flush()
+    summary_counters.record(db, [], summary_counters.data_source_keys(data_source.type))
+    summary_counters.open_buckets(db, summary_counters.SOURCES_PER_DATA_SOURCE, [data_source.id])
     db.commit()
     db.refresh(data_source)
 
@@ -117,10 +133,12 @@ def update_data_source(
     data_source_in: DataSourceUpdate,
     db: Session = Depends(get_db_session),
     has_perm: bool = Depends(user_has_permission("update_data_source")),
+    current_user: UserPermissions = Depends(get_current_user),
 ):
     """Update an existing data source by ID."""
     data_source = db.get(DataSource, data_source_id)
-    if not data_source:
+    # Data sources the user may not see are reported as missing
+    if not data_source or not can_see(db, current_user, data_source_id):
         return ResponseController.send_error(
             error="Data source not found",
             error_messages={},
@@ -142,6 +160,8 @@ def update_data_source(
         data_source.name = data_source_in.name
 
     if data_source_in.type is not None:
+        summary_counters.record(db, summary_counters.data_source_keys(data_source.type),
+                                summary_counters.data_source_keys(data_source_in.type))
         data_source.type = data_source_in.type
 
     if data_source_in.description is not None:
@@ -167,23 +187,152 @@ def update_data_source(
 @router.delete("/{data_source_id}", response_model=SuccessResponse)
 def delete_data_source(
     data_source_id: int,
+    background_tasks: BackgroundTasks,
+    run_async: bool = Query(False, alias="async"),
     db: Session = Depends(get_db_session),
     has_perm: bool = Depends(user_has_permission("delete_data_source")),
+    current_user: UserPermissions = Depends(get_current_user),
 ):
-    """Delete a data source by ID."""
+    """
+    Delete a data source by ID with its sources, their dashboards and probe
+    results, and its grants; returns the rows deleted by table.
+
+    With `async=true` the delete runs in the background, a batch of sources
+    per transaction, and a job is returned (202) to poll at /delete-jobs/{id}.
+    """
     data_source = db.get(DataSource, data_source_id)
-    if not data_source:
+    if not data_source or not can_see(db, current_user, data_source_id):
         return ResponseController.send_error(
             error="Data source not found",
             error_messages={},
             code=status.HTTP_404_NOT_FOUND
         )
 
-    db.delete(data_source)
+    if run_async:
+        job = cascade_delete.submit_job(db, cascade_delete.DATA_SOURCE, data_source_id)
+        background_tasks.add_task(cascade_delete.run_job, job.id)
+        return ResponseController.send_response(
+            result={"job": DeleteJobRead.model_validate(job)},
+            message="Data source deletion started",
+            code=status.HTTP_202_ACCEPTED
+        )
+
+    counts = cascade_delete.delete_data_source(db, data_source_id)
+
+    return ResponseController.send_response(
+        result={"deleted": counts},
+        message="Data source deleted successfully",
+        code=status.HTTP_200_OK
+    )
+
+@router.get("/{data_source_id}/acl", response_model=SuccessResponse)
+def read_data_source_acl(
+    data_source_id: int,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("manage_data_source_acl")),
+):
+    """List the grants of a data source."""
+    if not db.get(DataSource, data_source_id):
+        return ResponseController.send_error(
+            error="Data source not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND
+        )
+
+    entries = db.exec(
+        select(DataSourceAcl).where(DataSourceAcl.data_source_id == data_source_id).order_by(DataSourceAcl.id)
+    ).all()
+    result = {"acl": [DataSourceAclRead.model_validate(entry) for entry in entries]}
+    return ResponseController.send_response(
+        result=result,
+        message="Data source grants",
+        code=status.HTTP_200_OK
+    )
+
+@router.post("/{data_source_id}/acl", response_model=SuccessResponse)
+def create_data_source_acl(
+    data_source_id: int,
+    acl_in: DataSourceAclCreate,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("manage_data_source_acl")),
+):
+    """Grant a data source to a user or a role."""
+    if not db.get(DataSource, data_source_id):
+        return ResponseController.send_error(
+            error="Data source not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND
+        )
+    if (acl_in.user_id is None) == (acl_in.role_id is None):
+        return ResponseController.send_error(
+            error="Provide exactly one of user_id or role_id",
+            error_messages={},
+            code=status.HTTP_400_BAD_REQUEST
+        )
+    if acl_in.user_id is not None and not db.get(User, acl_in.user_id):
+        return ResponseController.send_error(
+            error="User not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND
+        )
+    if acl_in.role_id is not None and not db.get(Role, acl_in.role_id):
+        return ResponseController.send_error(
+            error="Role not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND
+        )
+
+    existing_entry = db.exec(
+        select(DataSourceAcl).where(
+            DataSourceAcl.data_source_id == data_source_id,
+            DataSourceAcl.user_id == acl_in.user_id if acl_in.user_id is not None
+            else DataSourceAcl.role_id == acl_in.role_id,
+        )
+    ).first()
+    if existing_entry:
+        return ResponseController.send_error(
+            error="Data source is already granted",
+            error_messages={},
+            code=status.HTTP_400_BAD_REQUEST
+        )
+
+    entry = DataSourceAcl(data_source_id=data_source_id, user_id=acl_in.user_id, role_id=acl_in.role_id)
+    db.add(entry)
+    db.flush()
+    _record_grant_change(db, data_source_id)
+    db.commit()
+    db.refresh(entry)
+
+    result = {"acl": DataSourceAclRead.model_validate(entry)}
+    return ResponseController.send_response(
+        result=result,
+        message="Data source granted successfully",
+        code=status.HTTP_201_CREATED
+    )
+
+@router.delete("/{data_source_id}/acl/{acl_id}", response_model=SuccessResponse)
+def delete_data_source_acl(
+    data_source_id: int,
+    acl_id: int,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("manage_data_source_acl")),
+):
+    """Revoke a grant of a data source."""
+    entry = db.get(DataSourceAcl, acl_id)
+    if not entry or entry.data_source_id != data_source_id:
+        return ResponseController.send_error(
+            error="Grant not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND
+        )
+
+    db.delete(entry)
+    db.flush()
+    _record_grant_change(db, data_source_id)
     db.commit()
 
     return ResponseController.send_response(
         result={},
-        message="Data source deleted successfully",
+        message="Data source grant revoked successfully",
         code=status.HTTP_200_OK
     )
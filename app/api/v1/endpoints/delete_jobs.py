@@ -0,0 +1,41 @@
+# app/api/v1/endpoints/delete_jobs.py
+
+from fastapi import APIRouter, Depends, status
+from sqlmodel import Session
+
+from app.api.deps import get_current_user, get_db_session
+from app.core.response_controller import ResponseController
+from app.models.delete_job import DeleteJob
+from app.schemas.delete_job import DeleteJobRead
+from app.schemas.response_controller import SuccessResponse
+from app.schemas.user import UserPermissions
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=SuccessResponse)
+def read_delete_job(
+    job_id: str,
+    db: Session = Depends(get_db_session),
+    current_user: UserPermissions = Depends(get_current_user),
+):
+    """State and counts of a background delete; readable with the permission to start it (`delete_<kind>`)."""
+    job = db.get(DeleteJob, job_id)
+    if not job:
+        return ResponseController.send_error(
+            error="Delete job not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND
+        )
+
+    if f"delete_{job.kind}" not in current_user.permissions:
+        return ResponseController.send_error(
+            error="You don't have enough permissions.",
+            error_messages={},
+            code=status.HTTP_403_FORBIDDEN
+        )
+
+    return ResponseController.send_response(
+        result={"job": DeleteJobRead.model_validate(job)},
+        message="Delete job details",
+        code=status.HTTP_200_OK
+    )
@@ -0,0 +1,39 @@
+# app/api/v1/endpoints/grafana_dashboards.py
+
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, status
+from sqlmodel import Session
+
+from app.api.deps import get_current_user, get_db_session, user_has_permission
+from app.core.dashboard_catalog import dashboard_catalog
+from app.core.response_controller import ResponseController
+from app.schemas.grafana_dashboard import GrafanaDashboardRead
+from app.schemas.response_controller import SuccessResponse
+from app.schemas.user import UserPermissions
+
+router = APIRouter()
+
+@router.get("/", response_model=SuccessResponse)
+def search_grafana_dashboards(
+    q: str = Query("", max_length=255),
+    tag: List[str] = Query([]),
+    grafana_source_id: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("read_grafana_source")),
+    current_user: UserPermissions = Depends(get_current_user),
+):
+    """
+    Search the dashboards of all Grafana sources visible to the current user.
+
+    Every word of `q` matches the start of a word of the title, and every
+    `tag` must be present. Results are in title order and come from the local
+    catalog, which is synced in the background; no Grafana instance is queried.
+    """
+    dashboards = dashboard_catalog.search(db, current_user, q, tag, grafana_source_id, limit)
+    result = {"grafana_dashboards": [GrafanaDashboardRead.model_validate(d) for d in dashboards]}
+    return ResponseController.send_response(
+        result=result,
+        message="List of Grafana dashboards",
+        code=status.HTTP_200_OK
+    )
@@ -0,0 +1,61 @@
+# app/api/v1/endpoints/kibana_saved_objects.py
+
+from typing import List
+import json
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_current_user, get_db_session, user_has_permission
+from app.core.dashboard_index import words
+from app.core.kibana_search import DEFAULT_TYPES, kibana_search, load_targets, merge_results
+from app.core.response_controller import ResponseController
+from app.schemas.response_controller import SuccessResponse
+from app.schemas.user import UserPermissions
+
+router = APIRouter()
+
+@router.get("/", response_model=SuccessResponse)
+async def search_kibana_saved_objects(
+    q: str = Query(..., min_length=1, max_length=255),
+    type: List[str] = Query(list(DEFAULT_TYPES)),
+    limit: int = Query(20, ge=1, le=100),
+    stream: bool = Query(False),
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("read_kibana_source")),
+    current_user: UserPermissions = Depends(get_current_user),
+):
+    """
+    Search the saved objects of all Kibana sources visible to the current user
+    by title.
+
+    The sources are queried concurrently; those that fail or miss the deadline
+    are listed with their status and the results of the others are returned.
+    With `stream` the response is NDJSON: one line per source as soon as it
+    answers, then a last line with the merged ranking.
+    """
+    if not words(q):
+        return ResponseController.send_error(
+            error="The query must contain a word",
+            error_messages={},
+            code=status.HTTP_400_BAD_REQUEST
+        )
+    targets = await run_in_threadpool(load_targets, db, current_user)
+
+    if not stream:
+        result = await kibana_search.search(targets, q, type, limit)
+        return ResponseController.send_response(
+            result=result,
+            message="Kibana saved objects",
+            code=status.HTTP_200_OK
+        )
+
+    async def lines():
+        results = []
+        async for result in kibana_search.iter_results(targets, q, type, limit):
+            results.append(result)
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"saved_objects": merge_results(results, q, limit)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -1,27 +1,33 @@
 from fastapi import APIRouter, Depends, status
-from fastapi.security import HTTPAuthorizationCredentials
+from sqlmodel import Session, select
 from app.schemas.response_controller import SuccessResponse
-from app.core.security import BLACKLIST, decode_token
-from app.api.deps import bearer_scheme
+from app.schemas.token import RefreshRequest
+from app.core.security import hash_token
+from app.core.refresh_tokens import revoke_token_family
+from app.api.deps import get_db_session
 from app.core.response_controller import ResponseController
+from app.models.refresh_token import RefreshToken
 
  
 router = APIRouter()
-
-# Dependency to Get Token
-def get_current_token(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
-) -> str:
-    """Extracts the token string from the authorization header"""
-    return credentials.credentials
  
 @router.post("/", response_model=SuccessResponse)
 def logout(
-    token: str = Depends(get_current_token)     # Gets the actual token string
+    request: RefreshRequest,
+    db: Session = Depends(get_db_session)
 ):
-    """Logout user."""
-    username: str = decode_token(token)     # Validate and Decode the token
-    BLACKLIST.add(token)
+    """
+    Logout user.
+
+    Revokes the refresh token and every token rotated from the same login.
+    Access tokens already handed out stay valid until their (short) expiry.
+    """
+    stored = db.exec(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_token(request.refresh_token))
+    ).first()
+    if stored:
+        revoke_token_family(db, stored.family_id)
+        db.commit()
     return ResponseController.send_response(
             result={},
             message="Logout successful",
@@ -2,19 +2,17 @@
 
 from typing import List
 from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
-from app.api.deps import get_db_session, user_has_permission
-from app.models.permission import Permission
+from app.api.deps import user_has_permission
+from app.core.rbac_graph import rbac_graph_store
 from app.schemas.permission import PermissionRead
 
 router = APIRouter()
 
 @router.get("/", response_model=List[PermissionRead])
 def read_permissions(
-    db: Session = Depends(get_db_session),
     has_perm: bool = Depends(user_has_permission("read_permission")),
 ):
     """List all permissions."""
-    permissions = db.exec(select(Permission)).all()
-    return permissions
+    graph = rbac_graph_store.current()
+    return sorted(graph.permissions.values(), key=lambda p: p.id)
 
@@ -0,0 +1,69 @@
+# app/api/v1/endpoints/rbac_config.py
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import Response
+from sqlmodel import Session
+
+from app.api.deps import get_db_session, user_has_permission
+from app.core.authz_snapshot import snapshot_store
+from app.core.rbac_config import apply_plan, config_errors, dump_config, export_config, plan_changes
+from app.core.rbac_graph import rbac_graph_store
+from app.core.response_controller import ResponseController
+from app.schemas.rbac_config import RbacConfig
+from app.schemas.response_controller import SuccessResponse
+
+router = APIRouter()
+
+@router.get("/export")
+def export_rbac_config(
+    format: str = Query("json", pattern="^(json|yaml)$"),
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("export_rbac_config")),
+):
+    """Permissions, roles and their grants as a canonical JSON or YAML document."""
+    return Response(
+        content=dump_config(export_config(db), format),
+        media_type="application/json" if format == "json" else "application/yaml",
+        headers={"Content-Disposition": f'attachment; filename="rbac.{format}"'},
+    )
+
+@router.post("/apply", response_model=SuccessResponse)
+def apply_rbac_config(
+    config: RbacConfig,
+    dry_run: bool = Query(False),
+    prune: bool = Query(False),
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("apply_rbac_config")),
+):
+    """
+    Bring the roles and permissions in line with a document, in one transaction.
+
+    Only the difference is written. With `dry_run` the planned changes are
+    returned without applying them; with `prune` roles and permissions missing
+    from the document are deleted.
+    """
+    current = export_config(db)
+    errors = config_errors(current, config, prune)
+    if errors:
+        return ResponseController.send_error(
+            error="The RBAC configuration is invalid",
+            error_messages=errors,
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    plan = plan_changes(current, config, prune)
+    applied = not dry_run and not plan.is_empty()
+    if applied:
+        members_changed = apply_plan(db, plan)
+        db.commit()
+        if members_changed:
+            snapshot_store.publish_full(db)
+        else:
+            snapshot_store.publish_roles(db)
+        rbac_graph_store.load(db)
+
+    return ResponseController.send_response(
+        result={"plan": plan, "applied": applied},
+        message="RBAC configuration applied" if applied else "RBAC configuration planned",
+        code=status.HTTP_200_OK,
+    )
@@ -0,0 +1,31 @@
+# app/api/v1/endpoints/reports.py
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from app.api.deps import get_db_session, user_has_permission
+from app.core.access_review import iter_report_csv, load_access_review
+
+router = APIRouter()
+
+@router.get("/access-review")
+def access_review_report(
+    report: str = Query("matrix", pattern="^(matrix|permissions|roles)$"),
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("read_access_review")),
+):
+    """
+    Access-review report as CSV.
+
+    `matrix` has one row per user and a 0/1 column per effective permission;
+    `permissions` counts the users holding each permission; `roles` counts the
+    members and permissions of each role. The data is loaded up front with a
+    few bulk queries and the CSV is streamed in chunks.
+    """
+    review = load_access_review(db)
+    return StreamingResponse(
+        iter_report_csv(review, report),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="access-review-{report}.csv"'},
+    )
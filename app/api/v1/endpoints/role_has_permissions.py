@@ -1,16 +1,127 @@
+from datetime import datetime, UTC
+from typing import Optional
 from fastapi import APIRouter, Depends, status
+from sqlalchemy import delete
 from sqlmodel import Session, select
 from app.models.role import Role
 from app.models.permission import Permission
 from app.models.role_has_permissions import RoleHasPermissions
+from app.models.role_permission_pattern import RolePermissionPattern
 from app.schemas.role import RoleRead
 from app.api.deps import get_db_session, user_has_permission
 from app.core.response_controller import ResponseController
+from app.core.rbac_graph import rbac_graph_store
+from app.core.authz_versions import bump_roles_version
+from app.core import change_feed
+from app.core.effective_permissions import (
+    as_utc, grant_to_holders_of, grant_to_role_members, holder_ids_of, refresh_role_members, refresh_users
+)
+from app.core.role_hierarchy import ancestor_ids_of
+from app.core.role_permissions import assign_permissions, remove_permissions
+from app.core.grant_expiry import grant_expiry_sweeper
+from app.core.permission_patterns import pattern_errors
 from app.schemas.response_controller import SuccessResponse
-from app.schemas.role_has_permissions import AssignPermissionsRequest
+from app.schemas.role_has_permissions import (
+    AssignPermissionsRequest, BulkRolePermissionsRequest, RolePermissionChanges
+)
 
 router = APIRouter()
 
+def _expiry_error(expires_at: Optional[datetime]):
+    if expires_at is not None and as_utc(expires_at) <= datetime.now(UTC):
+        return ResponseController.send_error(
+            error="expires_at must be in the future",
+            error_messages={},
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+    return None
+
+def _bulk_request_errors(db: Session, request: BulkRolePermissionsRequest):
+    """Validate all role and permission ids with one query each."""
+    role_ids, permission_ids = set(request.role_ids), set(request.permission_ids)
+    found_roles = set(db.exec(select(Role.id).where(Role.id.in_(role_ids))).all())
+    if found_roles != role_ids:
+        return ResponseController.send_error(
+            error="One or more roles do not exist",
+            error_messages={"role_ids": sorted(role_ids - found_roles)},
+            code=status.HTTP_404_NOT_FOUND,
+        )
+    found_permissions = set(db.exec(select(Permission.id).where(Permission.id.in_(permission_ids))).all())
+    if found_permissions != permission_ids:
+        return ResponseController.send_error(
+            error="One or more permissions do not exist",
+            error_messages={"permission_ids": sorted(permission_ids - found_permissions)},
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+    return None
+
+def _bulk_changed(db: Session, role_ids) -> None:
+    """
+    Bump the roles version once and reload the changed roles and the roles
+    including them; nothing when no role changed, so the graphs stay current.
+    """
+    role_ids = sorted(role_ids)
+    if not role_ids:
+        return
+    bump_roles_version(db)
+    change_feed.record(db, change_feed.ROLES, role_ids)
+    db.commit()
+    rbac_graph_store.role_changed(db, role_ids[0], ancestor_ids_of(db, role_ids))
+
+@router.post("/bulk-assign", response_model=SuccessResponse)
+def bulk_assign_permissions(
+    request: BulkRolePermissionsRequest,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("assign_permissions")),
+):
+    """Assign many permissions to many roles in one transaction, optionally until `expires_at`."""
+    error = _bulk_request_errors(db, request) or _expiry_error(request.expires_at)
+    if error:
+        return error
+
+    added = assign_permissions(db, request.role_ids, request.permission_ids, request.expires_at)
+    # Extended expiries change the roles' state as well
+    changed = request.role_ids if request.expires_at is not None else [r for r, count in added.items() if count]
+    grant_to_holders_of(db, changed, request.permission_ids)
+    _bulk_changed(db, changed)
+    if request.expires_at is not None:
+        grant_expiry_sweeper.schedule(request.expires_at)
+
+    result = {"roles": [RolePermissionChanges(role_id=role_id, added=count) for role_id, count in added.items()],
+              "added": sum(added.values())}
+    return ResponseController.send_response(
+        result=result,
+        message="Permissions assigned successfully",
+        code=status.HTTP_200_OK,
+    )
+
+
+@router.post("/bulk-remove", response_model=SuccessResponse)
+def bulk_remove_permissions(
+    request: BulkRolePermissionsRequest,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("remove_permissions")),
+):
+    """Remove many permissions from many roles in one transaction."""
+    error = _bulk_request_errors(db, request)
+    if error:
+        return error
+
+    removed = remove_permissions(db, request.role_ids, request.permission_ids)
+    changed = [role_id for role_id, count in removed.items() if count]
+    # Holders may still have a removed permission through another role
+    refresh_users(db, holder_ids_of(db, changed))
+    _bulk_changed(db, changed)
+
+    result = {"roles": [RolePermissionChanges(role_id=role_id, removed=count) for role_id, count in removed.items()],
+              "removed": sum(removed.values())}
+    return ResponseController.send_response(
+        result=result,
+        message="Permissions removed successfully",
+        code=status.HTTP_200_OK,
+    )
+
+
 @router.post("/{role_id}/assign-permissions", response_model=SuccessResponse)
 def assign_permissions_to_role(
     role_id: int,
@@ -38,20 +149,39 @@ def assign_permissions_to_role(
             error_messages={},
             code=status.HTTP_400_BAD_REQUEST,
         )
+    errors = pattern_errors(request.patterns)
+    if errors:
+        return ResponseController.send_error(
+            error="One or more permission patterns are invalid",
+            error_messages=errors,
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+    error = _expiry_error(request.expires_at)
+    if error:
+        return error
 
     # Assign the permissions
-    for permission in permissions:
-        existing_link = db.exec(
-            select(RoleHasPermissions).where(
-                RoleHasPermissions.role_id == role_id,
-                RoleHasPermissions.permission_id == permission.id,
-            )
-        ).first()
-        if not existing_link:
-            role_permission = RoleHasPermissions(role_id=role_id, permission_id=permission.id)
-            db.add(role_permission)
+    assign_permissions(db, [role_id], request.permission_ids, request.expires_at)
+
+    # Wildcard grants are stored once, however many permissions they match
+    existing_patterns = set(db.exec(
+        select(RolePermissionPattern.pattern).where(RolePermissionPattern.role_id == role_id)
+    ).all())
+    new_patterns = sorted(set(request.patterns) - existing_patterns)
+    for pattern in new_patterns:
+        db.add(RolePermissionPattern(role_id=role_id, pattern=pattern))
 
+    db.flush()
+    if new_patterns:
+        refresh_role_members(db, role_id)
+    else:
+        grant_to_role_members(db, role_id, request.permission_ids)
+    bump_roles_version(db)
+    change_feed.record(db, change_feed.ROLES, [role_id])
     db.commit()
+    rbac_graph_store.role_changed(db, role_id)
+    if request.expires_at is not None and request.permission_ids:
+        grant_expiry_sweeper.schedule(request.expires_at)
 
     # Refresh role's permissions
     role.permissions = db.exec(
@@ -60,6 +190,7 @@ def assign_permissions_to_role(
 
     # Prepare the response
     pydantic_role = RoleRead.model_validate(role)
+    pydantic_role.permission_patterns = sorted(rbac_graph_store.current().roles[role_id].permission_patterns)
     result = {"role": pydantic_role}
 
     return ResponseController.send_response(
@@ -98,17 +229,20 @@ def remove_permissions_from_role(
         )
 
     # Remove the permissions
-    for permission in permissions:
-        existing_link = db.exec(
-            select(RoleHasPermissions).where(
-                RoleHasPermissions.role_id == role_id,
-                RoleHasPermissions.permission_id == permission.id,
-            )
-        ).first()
-        if existing_link:
-            db.delete(existing_link)
+    remove_permissions(db, [role_id], request.permission_ids)
+    if request.patterns:
+        db.exec(delete(RolePermissionPattern.__table__).where(
+            RolePermissionPattern.__table__.c.role_id == role_id,
+            RolePermissionPattern.__table__.c.pattern.in_(request.patterns),
+        ))
 
+    # Members may still hold a removed permission through another role
+    db.flush()
+    refresh_role_members(db, role_id)
+    bump_roles_version(db)
+    change_feed.record(db, change_feed.ROLES, [role_id])
     db.commit()
+    rbac_graph_store.role_changed(db, role_id)
 
     return ResponseController.send_response(
         result={},
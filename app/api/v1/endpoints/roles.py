@@ -1,33 +1,49 @@
 # app/api/v1/endpoints/roles.py
 
-from fastapi import APIRouter, Depends, status
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, status
 from sqlmodel import Session, select
 from app.api.deps import get_db_session, user_has_permission
 from app.models.role import Role
 from app.models.permission import Permission
 from app.models.role_has_permissions import RoleHasPermissions
-from app.schemas.role import RoleCreate, RoleRead, RoleUpdate
+from app.models.role_permission_pattern import RolePermissionPattern
+from app.models.user_has_roles import UserHasRoles
+from app.schemas.role import RoleChildRequest, RoleCreate, RoleRead, RoleUpdate
+from app.schemas.permission import PermissionRead
+from app.schemas.delete_job import DeleteJobRead
 from app.core.response_controller import ResponseController
+from app.core.rbac_graph import RbacGraph, RoleNode, rbac_graph_store
+from app.core.authz_versions import bump_roles_version
+from app.core.effective_permissions import refresh_role_members
+from app.core import cascade_delete, change_feed, role_hierarchy, summary_counters
+from app.core.permission_patterns import pattern_errors
 from app.schemas.response_controller import SuccessResponse
 
 router = APIRouter()
 
+def role_read(graph: RbacGraph, role: RoleNode) -> RoleRead:
+    """Build the response model of a role from the RBAC graph."""
+    return RoleRead(
+        id=role.id,
+        name=role.name,
+        created_at=role.created_at,
+        updated_at=role.updated_at,
+        permissions=[PermissionRead.model_validate(p) for p in graph.role_permissions(role.id)],
+        permission_patterns=sorted(role.permission_patterns),
+        child_role_ids=sorted(role.child_ids),
+    )
+
 @router.get("/", response_model=SuccessResponse)
 def read_roles(
-    db: Session = Depends(get_db_session),
     has_perm: bool = Depends(user_has_permission("read_role")),
 ):
     """List all roles."""
-    # Fetch all roles
-    roles = db.exec(select(Role)).all()
-
-    # Ensure permissions are loaded for each role
-    for role in roles:
-        role.permissions = db.exec(
-            select(Permission).join(RoleHasPermissions).where(RoleHasPermissions.role_id == role.id)
-        ).all()
+    # Served from the in-process RBAC graph, no queries needed
+    graph = rbac_graph_store.current()
+    roles = sorted(graph.roles.values(), key=lambda r: r.id)
 
-    pydantic_roles = [RoleRead.model_validate(u) for u in roles]
+    pydantic_roles = [role_read(graph, r) for r in roles]
     result = {"roles": pydantic_roles}
 
     return ResponseController.send_response(
@@ -35,14 +51,33 @@ def read_roles(
         message="List of roles",
         code=status.HTTP_200_OK)
 
+@router.get("/changes", response_model=SuccessResponse)
+def read_role_changes(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("read_role")),
+):
+    """
+    Roles created, changed or deleted since `cursor`, oldest first; start
+    without a cursor for a full sync and pass the returned one next time.
+    """
+    entries, next_cursor, has_more = change_feed.read_changes(db, change_feed.ROLES, cursor, limit)
+    # Read from the database: the RBAC graph may not have caught up with the feed yet
+    roles = change_feed.load_roles(db, change_feed.changed_ids(entries))
+    return ResponseController.send_response(
+        result=change_feed.feed_result("role", entries, roles, next_cursor, has_more),
+        message="Role changes",
+        code=status.HTTP_200_OK)
+
 @router.get("/{role_id}", response_model=SuccessResponse)
 def get_role(role_id: int, 
-             db: Session = Depends(get_db_session),
              has_perm: bool = Depends(user_has_permission("read_role")),
              ):
     """Role details."""
-    # Fetch the role by ID
-    role = db.exec(select(Role).where(Role.id == role_id)).first()
+    # Fetch the role by ID from the in-process RBAC graph
+    graph = rbac_graph_store.current()
+    role = graph.roles.get(role_id)
     if not role:
         return ResponseController.send_error(
             error=f"Role with ID {role_id} not found",
@@ -50,12 +85,7 @@ def get_role(role_id: int,
             code=status.HTTP_404_NOT_FOUND,
         )
 
-    # Fetch related permissions
-    role.permissions = db.exec(
-        select(Permission).join(RoleHasPermissions).where(RoleHasPermissions.role_id == role_id)
-    ).all()
-
-    pydantic_role = RoleRead.model_validate(role)
+    pydantic_role = role_read(graph, role)
     return ResponseController.send_response(
         result={"role": pydantic_role},
         message="Role details",
@@ -90,24 +120,39 @@ def create_role(
                 error_messages={},
                 code=status.HTTP_400_BAD_REQUEST,
             )
+    patterns = sorted(set(role_data.permission_patterns or []))
+    errors = pattern_errors(patterns)
+    if errors:
+        return ResponseController.send_error(
+            error="One or more permission patterns are invalid",
+            error_messages=errors,
+            code=status.HTTP_400_BAD_REQUEST,
+        )
 
     # Create the new role
     new_role = Role(name=role_data.name)
     db.add(new_role)
-    db.commit()  # Save the role to generate an ID
-    db.refresh(new_role)
+    db.flush()  # Generate an ID
+    role_hierarchy.add_role(db, new_role.id)
+    summary_counters.open_buckets(db, summary_counters.USERS_PER_ROLE, [new_role.id])
 
     # Assign permissions to the new role (if any)
     for permission in permissions:
         role_permission = RoleHasPermissions(role_id=new_role.id, permission_id=permission.id)
         db.add(role_permission)
+    for pattern in patterns:
+        db.add(RolePermissionPattern(role_id=new_role.id, pattern=pattern))
 
+    bump_roles_version(db)
+    change_feed.record(db, change_feed.ROLES, [new_role.id])
     db.commit()  # Save role-permission relationships
     db.refresh(new_role)
+    rbac_graph_store.role_changed(db, new_role.id)
 
     # Prepare the response
     new_role.permissions = permissions  # Attach permissions to the role object
     pydantic_new_role = RoleRead.model_validate(new_role)
+    pydantic_new_role.permission_patterns = patterns
     result = {"role": pydantic_new_role}
 
     return ResponseController.send_response(
@@ -119,10 +164,19 @@ def create_role(
 @router.delete("/{role_id}", response_model=SuccessResponse)
 def delete_role(
     role_id: int,
+    background_tasks: BackgroundTasks,
+    run_async: bool = Query(False, alias="async"),
     db: Session = Depends(get_db_session),
     has_perm: bool = Depends(user_has_permission("delete_role")),
 ):
-    """Delete a role by ID."""
+    """
+    Delete a role by ID; returns the rows affected by table. Its members,
+    grants, patterns, data source grants and scoped API keys go with it, and
+    users having it as their primary role are left without one.
+
+    With `async=true` the delete runs in the background and a job is returned
+    (202) to poll at /delete-jobs/{id}.
+    """
     # Fetch the role by ID
     role = db.get(Role, role_id)
     if not role:
@@ -132,12 +186,19 @@ def delete_role(
             code=status.HTTP_404_NOT_FOUND,
         )
 
-    # Delete the role
-    db.delete(role)
-    db.commit()
+    if run_async:
+        job = cascade_delete.submit_job(db, cascade_delete.ROLE, role_id)
+        background_tasks.add_task(cascade_delete.run_job, job.id)
+        return ResponseController.send_response(
+            result={"job": DeleteJobRead.model_validate(job)},
+            message="Role deletion started",
+            code=status.HTTP_202_ACCEPTED,
+        )
+
+    counts = cascade_delete.delete_role(db, role_id)
 
     return ResponseController.send_response(
-        result={},
+        result={"deleted": counts},
         message="Role deleted successfully",
         code=status.HTTP_200_OK,
     )
@@ -158,6 +219,7 @@ def rename_role(
             code=status.HTTP_404_NOT_FOUND,
         )
 
+    renamed = role_in.name is not None and role_in.name != role.name
     if role_in.name is not None:
         # Check if name is already used
         if db.exec(select(Role).where(Role.name == role_in.name, Role.id != role_id)).first():
@@ -169,18 +231,91 @@ def rename_role(
         role.name = role_in.name
 
     db.add(role)
+    change_feed.record(db, change_feed.ROLES, [role_id])
+    if renamed:
+        # Users are read with the names of their roles
+        uhr = UserHasRoles.__table__
+        change_feed.record_select(db, change_feed.USERS, select(uhr.c.user_id).where(uhr.c.role_id == role_id))
     db.commit()
     db.refresh(role)
+    rbac_graph_store.role_changed(db, role_id)
 
-    # Fetch related permissions
-    role.permissions = db.exec(
-        select(Permission).join(RoleHasPermissions).where(RoleHasPermissions.role_id == role_id)
-    ).all()
-
-    pydantic_role = RoleRead.model_validate(role)
+    graph = rbac_graph_store.current()
+    pydantic_role = role_read(graph, graph.roles[role_id])
     return ResponseController.send_response(
         result={"role": pydantic_role},
         message="Role renamed successfully",
         code=status.HTTP_200_OK,
     )
 
+@router.post("/{role_id}/children", response_model=SuccessResponse)
+def add_child_role(
+    role_id: int,
+    request: RoleChildRequest,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("manage_role_hierarchy")),
+):
+    """Make a role include (inherit the permissions of) another role."""
+    child_id = request.child_role_id
+    if not db.get(Role, role_id) or not db.get(Role, child_id):
+        return ResponseController.send_error(
+            error="Role not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND,
+        )
+    if role_hierarchy.has_edge(db, role_id, child_id):
+        return ResponseController.send_error(
+            error="Role already includes this role",
+            error_messages={},
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+    if role_hierarchy.creates_cycle(db, role_id, child_id):
+        return ResponseController.send_error(
+            error="Role hierarchy cannot contain cycles",
+            error_messages={"child_role_id": ["The child role already includes this role, directly or indirectly"]},
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    role_hierarchy.add_edge(db, role_id, child_id)
+    refresh_role_members(db, role_id)
+    bump_roles_version(db)
+    change_feed.record(db, change_feed.ROLES, [role_id])
+    db.commit()
+    rbac_graph_store.role_changed(db, role_id)
+
+    graph = rbac_graph_store.current()
+    return ResponseController.send_response(
+        result={"role": role_read(graph, graph.roles[role_id])},
+        message="Child role added successfully",
+        code=status.HTTP_200_OK,
+    )
+
+@router.delete("/{role_id}/children/{child_role_id}", response_model=SuccessResponse)
+def remove_child_role(
+    role_id: int,
+    child_role_id: int,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("manage_role_hierarchy")),
+):
+    """Stop a role from including another role."""
+    if not role_hierarchy.has_edge(db, role_id, child_role_id):
+        return ResponseController.send_error(
+            error="Role does not include this role",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND,
+        )
+
+    role_hierarchy.remove_edge(db, role_id, child_role_id)
+    refresh_role_members(db, role_id)
+    bump_roles_version(db)
+    change_feed.record(db, change_feed.ROLES, [role_id])
+    db.commit()
+    rbac_graph_store.role_changed(db, role_id)
+
+    graph = rbac_graph_store.current()
+    return ResponseController.send_response(
+        result={"role": role_read(graph, graph.roles[role_id])},
+        message="Child role removed successfully",
+        code=status.HTTP_200_OK,
+    )
+
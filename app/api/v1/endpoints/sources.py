@@ -0,0 +1,364 @@
+# app/api/v1/endpoints/sources.py
+
+from typing import Dict, Optional
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, UTC
+
+from app.api.deps import (
+    get_current_user, get_db_session, get_pagination, format_source_url, user_has_permission
+)
+from app.core.data_source_acl import can_see, filter_visible
+from app.core.pagination import paginate, split_page
+from app.core import cascade_delete, change_feed, summary_counters
+from app.core.source_bulk import bulk_create, bulk_response, bulk_update
+from app.core.source_credentials import encrypt_secret
+from app.core.source_health import source_health_prober
+from app.core.source_proxy import PROXY_METHODS, load_upstream, source_proxy
+from app.schemas.pagination import Pagination
+from app.schemas.user import UserPermissions
+from app.schemas.source import SourceBulkUpdate, SourceCreate, SourceRead, SourceUpdate
+from app.schemas.source_bulk import SourceBulkRequest
+from app.core.response_controller import ResponseController
+from app.schemas.response_controller import SuccessResponse
+from app.models.source import AuthType, Source
+from app.models.data_source import DataSource, SourceType
+
+# Sources of every type: GET /sources/
+router = APIRouter()
+
+def _with_health(db: Session, sources) -> list:
+    pydantic_sources = [SourceRead.model_validate(source) for source in sources]
+    for source in pydantic_sources:
+        source.health = source_health_prober.cache.get(db, source.type, source.id)
+    return pydantic_sources
+
+@router.get("/", response_model=SuccessResponse)
+def read_sources(
+    type: Optional[SourceType] = Query(None),
+    data_source_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db_session),
+    page: Pagination = Depends(get_pagination),
+    current_user: UserPermissions = Depends(get_current_user),
+):
+    """
+    List the sources of all types the current user may read (`read_<type>_source`),
+    or of one `type`, of the data sources visible to them, one page at a time.
+    """
+    readable = [source_type for source_type in SourceType
+                if f"read_{source_type.value}_source" in current_user.permissions and type in (None, source_type)]
+    if not readable:
+        return ResponseController.send_error(
+            error="You don't have enough permissions.",
+            error_messages={},
+            code=status.HTTP_403_FORBIDDEN
+        )
+
+    statement = select(Source).where(Source.type.in_(readable))
+    if data_source_id is not None:
+        statement = statement.where(Source.data_source_id == data_source_id)
+    statement = filter_visible(statement, Source.data_source_id, current_user)
+    sources, next_after_id = split_page(db.exec(paginate(statement, Source.id, page)).all(), page)
+
+    result = {"sources": _with_health(db, sources), "next_after_id": next_after_id}
+    return ResponseController.send_response(
+        result=result,
+        message="List of sources",
+        code=status.HTTP_200_OK
+    )
+
+@router.get("/changes", response_model=SuccessResponse)
+def read_source_changes(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db_session),
+    current_user: UserPermissions = Depends(get_current_user),
+):
+    """
+    Sources created, changed or deleted since `cursor`, oldest first, of the
+    types the current user may read; sources they cannot see (any more) are
+    reported as deleted. Granting or revoking a data source feeds its sources
+    again. Start without a cursor for a full sync.
+    """
+    readable = [source_type for source_type in SourceType
+                if f"read_{source_type.value}_source" in current_user.permissions]
+    if not readable:
+        return ResponseController.send_error(
+            error="You don't have enough permissions.",
+            error_messages={},
+            code=status.HTTP_403_FORBIDDEN
+        )
+
+    entries, next_cursor, has_more = change_feed.read_changes(db, change_feed.SOURCES, cursor, limit)
+    ids = change_feed.changed_ids(entries)
+    sources = []
+    if ids:
+        statement = select(Source).where(Source.id.in_(ids), Source.type.in_(readable))
+        sources = db.exec(filter_visible(statement, Source.data_source_id, current_user)).all()
+    loaded = {source.id: source for source in _with_health(db, sources)}
+    return ResponseController.send_response(
+        result=change_feed.feed_result("source", entries, loaded, next_cursor, has_more),
+        message="Source changes",
+        code=status.HTTP_200_OK
+    )
+
+
+def source_router(source_type: SourceType) -> APIRouter:
+    """
+    The routes of one source type, served under /sources/<type>. Permissions
+    are `<action>_<type>_source` and responses name the source `<type>_source`.
+    """
+    type_router = APIRouter()
+    label = source_type.value.capitalize()
+    one, many = f"{source_type.value}_source", f"{source_type.value}_sources"
+
+    def not_found():
+        return ResponseController.send_error(
+            error=f"{label} source not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND
+        )
+
+    def get_source(db: Session, source_id: int) -> Optional[Source]:
+        source = db.get(Source, source_id)
+        return source if source is not None and source.type == source_type else None
+
+    def get_visible_source(db: Session, principal: UserPermissions, source_id: int) -> Optional[Source]:
+        # Sources of data sources the user may not see are reported as missing
+        source = get_source(db, source_id)
+        return source if source is not None and can_see(db, principal, source.data_source_id) else None
+
+    def check_data_source(db: Session, principal: UserPermissions, data_source_id: int) -> None:
+        data_source = db.get(DataSource, data_source_id)
+        if not data_source or not can_see(db, principal, data_source_id):
+            return ResponseController.send_error(
+                error="Associated DataSource not found",
+                error_messages={},
+                code=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Also check if linked DataSource is of the same type
+        if data_source.type != source_type:
+            return ResponseController.send_error(
+                error=f"Associated DataSource is not a {label} source",
+                error_messages={},
+                code=status.HTTP_400_BAD_REQUEST
+            )
+
+    @type_router.get("/", response_model=SuccessResponse)
+    def read_typed_sources(
+        db: Session = Depends(get_db_session),
+        page: Pagination = Depends(get_pagination),
+        has_perm: bool = Depends(user_has_permission(f"read_{one}")),
+        current_user: UserPermissions = Depends(get_current_user),
+    ):
+        """List the sources of this type of data sources visible to the current user, one page at a time."""
+        statement = filter_visible(select(Source).where(Source.type == source_type), Source.data_source_id, current_user)
+        sources, next_after_id = split_page(db.exec(paginate(statement, Source.id, page)).all(), page)
+
+        result = {many: _with_health(db, sources), "next_after_id": next_after_id}
+        return ResponseController.send_response(
+            result=result,
+            message=f"List of {label} sources",
+            code=status.HTTP_200_OK
+        )
+
+    @type_router.post("/bulk", response_model=SuccessResponse)
+    def bulk_create_sources(
+        request: SourceBulkRequest,
+        db: Session = Depends(get_db_session),
+        has_perm: bool = Depends(user_has_permission(f"create_{one}")),
+        current_user: UserPermissions = Depends(get_current_user),
+    ):
+        """
+        Create many sources in one transaction; `items` take the fields of a
+        single create. Every item gets its result; with `atomic` (the default)
+        nothing is created unless all items are valid.
+        """
+        results = bulk_create(db, current_user, source_type, SourceCreate, request.items, request.atomic)
+        return bulk_response(db, results, request.atomic, f"{label} sources created")
+
+    @type_router.put("/bulk", response_model=SuccessResponse)
+    def bulk_update_sources(
+        request: SourceBulkRequest,
+        db: Session = Depends(get_db_session),
+        has_perm: bool = Depends(user_has_permission(f"update_{one}")),
+        current_user: UserPermissions = Depends(get_current_user),
+    ):
+        """
+        Update many sources in one transaction; `items` take the fields of a
+        single update and the `id` of the source. Every item gets its result;
+        with `atomic` (the default) nothing is changed unless all items are valid.
+        """
+        results = bulk_update(db, current_user, source_type, SourceBulkUpdate, request.items, request.atomic)
+        return bulk_response(db, results, request.atomic, f"{label} sources updated")
+
+    @type_router.get("/{source_id}", response_model=SuccessResponse)
+    def read_source(
+        source_id: int,
+        db: Session = Depends(get_db_session),
+        has_perm: bool = Depends(user_has_permission(f"read_{one}")),
+        current_user: UserPermissions = Depends(get_current_user),
+    ):
+        """Retrieve a single source by its ID."""
+        source = get_visible_source(db, current_user, source_id)
+        if not source:
+            return not_found()
+
+        result = {one: _with_health(db, [source])[0]}
+        return ResponseController.send_response(
+            result=result,
+            message=f"{label} source details",
+            code=status.HTTP_200_OK
+        )
+
+    @type_router.post("/", response_model=SuccessResponse)
+    def create_source(
+        source_in: SourceCreate,
+        db: Session = Depends(get_db_session),
+        has_perm: bool = Depends(user_has_permission(f"create_{one}")),
+        current_user: UserPermissions = Depends(get_current_user),
+    ):
+        """
+        Create a new source.
+
+        Source URL should start with http:// or https:// and remove trailing slash if present.
+        """
+        # Ensure the URL starts with http:// or https:// and remove trailing slash if present
+        source_in.source_url = format_source_url(source_in.source_url)
+
+        # 1. Ensure the linked DataSource exists, is visible to the user and is of this type
+        check_data_source(db, current_user, source_in.data_source_id)
+
+        # 2. Create the new source
+        source = Source(
+            type=source_type,
+            data_source_id=source_in.data_source_id,
+            source_url=source_in.source_url,
+            auth_type=source_in.auth_type,
+            auth_username=source_in.auth_username,
+            auth_password=encrypt_secret(source_in.auth_password),
+            bearer_token=encrypt_secret(source_in.bearer_token),
+        )
+        db.add(source)
+        db.flush()
+        summary_counters.record(db, [], summary_counters.source_keys(source_type, source.data_source_id))
+        change_feed.record(db, change_feed.SOURCES, [source.id])
+        db.commit()
+        db.refresh(source)
+
+        # 3. Build the response
+        result = {one: SourceRead.model_validate(source)}
+        return ResponseController.send_response(
+            result=result,
+            message=f"{label} source created successfully",
+            code=status.HTTP_201_CREATED
+        )
+
+    @type_router.put("/{source_id}", response_model=SuccessResponse)
+    def update_source(
+        source_id: int,
+        source_in: SourceUpdate,
+        db: Session = Depends(get_db_session),
+        has_perm: bool = Depends(user_has_permission(f"update_{one}")),
+        current_user: UserPermissions = Depends(get_current_user),
+    ):
+        """Update a source by ID."""
+        source = get_visible_source(db, current_user, source_id)
+        if not source:
+            return not_found()
+
+        # Ensure the linked DataSource exists, is visible to the user and is of this type
+        if source_in.data_source_id is not None:
+            check_data_source(db, current_user, source_in.data_source_id)
+
+        # Handle auth_type change
+        if source_in.auth_type is not None and source_in.auth_type != source.auth_type:
+            if source.auth_type == AuthType.BASIC and source_in.auth_type == AuthType.BEARER:
+                # Switching from basic to bearer, remove username and password
+                source.auth_username = None
+                source.auth_password = None
+            elif source.auth_type == AuthType.BEARER and source_in.auth_type == AuthType.BASIC:
+                # Switching from bearer to basic, remove bearer token
+                source.bearer_token = None
+            source.auth_type = source_in.auth_type
+
+        # Update fields only if provided
+        if source_in.source_url is not None:
+            # Ensure the URL starts with http:// or https:// and remove trailing slash if present
+            source.source_url = format_source_url(source_in.source_url)
+
+        if source_in.auth_username is not None:
+            source.auth_username = source_in.auth_username
+
+        if source_in.auth_password is not None:
+            source.auth_password = encrypt_secret(source_in.auth_password)
+
+        if source_in.bearer_token is not None:
+            source.bearer_token = encrypt_secret(source_in.bearer_token)
+
+        if source_in.data_source_id is not None:
+            summary_counters.record(db, summary_counters.source_keys(source_type, source.data_source_id),
+                                    summary_counters.source_keys(source_type, source_in.data_source_id))
+            source.data_source_id = source_in.data_source_id
+
+        source.updated_at = datetime.now(UTC)
+        db.add(source)
+        change_feed.record(db, change_feed.SOURCES, [source_id])
+        db.commit()
+        db.refresh(source)
+
+        result = {one: SourceRead.model_validate(source)}
+        return ResponseController.send_response(
+            result=result,
+            message=f"{label} source updated successfully",
+            code=status.HTTP_200_OK,
+        )
+
+    @type_router.delete("/{source_id}", response_model=SuccessResponse)
+    def delete_source(
+        source_id: int,
+        db: Session = Depends(get_db_session),
+        has_perm: bool = Depends(user_has_permission(f"delete_{one}")),
+        current_user: UserPermissions = Depends(get_current_user),
+    ):
+        """Delete a source by ID, with its dashboards and probe results; returns the rows deleted by table."""
+        source = get_visible_source(db, current_user, source_id)
+        if not source:
+            return not_found()
+
+        counts = cascade_delete.delete_source(db, source_id)
+
+        return ResponseController.send_response(
+            result={"deleted": counts},
+            message=f"{label} source deleted successfully",
+            code=status.HTTP_200_OK
+        )
+
+    @type_router.api_route("/{source_id}/proxy/{path:path}", methods=PROXY_METHODS)
+    async def proxy_source(
+        source_id: int,
+        path: str,
+        request: Request,
+        db: Session = Depends(get_db_session),
+        has_perm: bool = Depends(user_has_permission(f"proxy_{one}")),
+        current_user: UserPermissions = Depends(get_current_user),
+    ):
+        """
+        Forward a request to the API of a source, e.g. `GET /sources/grafana/1/proxy/api/...`,
+        authenticated with the credentials stored for the source. Bodies are
+        streamed in both directions.
+        """
+        upstream = await run_in_threadpool(load_upstream, db, current_user, source_type, source_id)
+        if upstream is None:
+            return not_found()
+        return await source_proxy.forward(request, upstream, path)
+
+    return type_router
+
+
+type_routers: Dict[SourceType, APIRouter] = {source_type: source_router(source_type) for source_type in SourceType}
+
+# Prefixes of the per-type routers that preceded /sources/<type>, kept as aliases
+LEGACY_PREFIXES = {SourceType.GRAFANA: "/grafana-sources", SourceType.KIBANA: "/kibana-sources"}
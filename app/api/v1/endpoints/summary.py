@@ -0,0 +1,93 @@
+# app/api/v1/endpoints/summary.py
+
+from fastapi import APIRouter, Depends, status
+from sqlmodel import Session, select
+
+from app.api.deps import get_db_session, get_pagination, user_has_permission
+from app.core import summary_counters
+from app.core.pagination import paginate, split_page
+from app.core.response_controller import ResponseController
+from app.models.data_source import DataSource
+from app.models.role import Role
+from app.schemas.pagination import Pagination
+from app.schemas.response_controller import SuccessResponse
+
+router = APIRouter()
+
+@router.get("/", response_model=SuccessResponse)
+def read_summary(
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("read_summary")),
+):
+    """
+    Users per status, data sources per type and sources per type, with their
+    totals, for the admin dashboard. Read from counters kept current by every
+    change, so neither the cost nor the size of the response grows with the
+    tables; the counts per role and per data source are paged separately.
+    """
+    counters = summary_counters.load_counters(db)
+
+    result = {
+        "users": {
+            "total": sum(counters[summary_counters.USERS_PER_STATUS].values()),
+            "per_status": counters[summary_counters.USERS_PER_STATUS],
+        },
+        "data_sources": {
+            "total": sum(counters[summary_counters.DATA_SOURCES_PER_TYPE].values()),
+            "per_type": counters[summary_counters.DATA_SOURCES_PER_TYPE],
+        },
+        "sources": {
+            "total": sum(counters[summary_counters.SOURCES_PER_TYPE].values()),
+            "per_type": counters[summary_counters.SOURCES_PER_TYPE],
+        },
+    }
+    return ResponseController.send_response(
+        result=result,
+        message="Summary",
+        code=status.HTTP_200_OK
+    )
+
+@router.get("/users-per-role", response_model=SuccessResponse)
+def read_users_per_role(
+    db: Session = Depends(get_db_session),
+    page: Pagination = Depends(get_pagination),
+    has_perm: bool = Depends(user_has_permission("read_summary")),
+):
+    """The users of each role (as primary role), one page of roles at a time."""
+    roles, next_after_id = split_page(db.exec(paginate(select(Role.id, Role.name), Role.id, page)).all(), page)
+    counts = summary_counters.load_buckets(db, summary_counters.USERS_PER_ROLE, (role.id for role in roles))
+
+    result = {
+        "users_per_role": [{"role_id": role.id, "role": role.name, "users": counts[role.id]} for role in roles],
+        "next_after_id": next_after_id,
+    }
+    return ResponseController.send_response(
+        result=result,
+        message="Users per role",
+        code=status.HTTP_200_OK
+    )
+
+@router.get("/sources-per-data-source", response_model=SuccessResponse)
+def read_sources_per_data_source(
+    db: Session = Depends(get_db_session),
+    page: Pagination = Depends(get_pagination),
+    has_perm: bool = Depends(user_has_permission("read_summary")),
+):
+    """The sources of each data source, one page of data sources at a time."""
+    data_sources, next_after_id = split_page(
+        db.exec(paginate(select(DataSource.id, DataSource.name), DataSource.id, page)).all(), page)
+    counts = summary_counters.load_buckets(db, summary_counters.SOURCES_PER_DATA_SOURCE,
+                                           (data_source.id for data_source in data_sources))
+
+    result = {
+        "sources_per_data_source": [
+            {"data_source_id": data_source.id, "data_source": data_source.name, "sources": counts[data_source.id]}
+            for data_source in data_sources
+        ],
+        "next_after_id": next_after_id,
+    }
+    return ResponseController.send_response(
+        result=result,
+        message="Sources per data source",
+        code=status.HTTP_200_OK
+    )
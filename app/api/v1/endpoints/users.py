@@ -1,26 +1,49 @@
 # app/api/v1/endpoints/users.py
 
-from fastapi import APIRouter, Depends, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy import and_
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 from app.api.deps import get_db_session, user_has_permission
 from app.models.user import User
 from app.models.role import Role
-from app.schemas.user import UserCreate, UserRead, UserUpdate
+from app.schemas.user import UserCreate, UserRead, UserRoleGrant, UserUpdate
 from app.core.hashing import hash_password
+from app.core.authz_snapshot import snapshot_store
+from app.core.authz_versions import bump_users_version
+from app.core.effective_permissions import (
+    as_utc, clear_user, grant_user_role, refresh_users, set_user_roles, user_role_ids
+)
+from app.core.grant_expiry import grant_expiry_sweeper
+from app.core import change_feed, summary_counters
 from datetime import datetime, UTC
 from app.core.response_controller import ResponseController
 from app.schemas.response_controller import SuccessResponse
 
 router = APIRouter()
 
+def resolve_additional_roles(db: Session, names: Optional[List[str]]) -> List[int]:
+    """Role ids for the given names with one query; errors if any is unknown."""
+    if not names:
+        return []
+    role_ids = db.exec(select(Role.id).where(Role.name.in_(names))).all()
+    if len(role_ids) != len(set(names)):
+        return ResponseController.send_error(
+            error="Role not found, please create it first", 
+            error_messages={}, 
+            code=status.HTTP_400_BAD_REQUEST)
+    return list(role_ids)
+
 @router.get("/", response_model=SuccessResponse)
 def read_users(
     db: Session = Depends(get_db_session),
     has_perm: bool = Depends(user_has_permission("read_user")),
 ):
     """List all users."""
-    users = db.exec(select(User)).all()
+    users = db.exec(
+        select(User).options(selectinload(User.role), selectinload(User.roles))
+    ).all()
 
     # Convert each ORM user to the Pydantic model
     pydantic_users = [UserRead.model_validate(u) for u in users]
@@ -33,6 +56,24 @@ def read_users(
         code=status.HTTP_200_OK
     )
 
+@router.get("/changes", response_model=SuccessResponse)
+def read_user_changes(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("read_user")),
+):
+    """
+    Users created, changed or deleted since `cursor`, oldest first; start
+    without a cursor for a full sync and pass the returned one next time.
+    """
+    entries, next_cursor, has_more = change_feed.read_changes(db, change_feed.USERS, cursor, limit)
+    users = change_feed.load_users(db, change_feed.changed_ids(entries))
+    return ResponseController.send_response(
+        result=change_feed.feed_result("user", entries, users, next_cursor, has_more),
+        message="User changes",
+        code=status.HTTP_200_OK)
+
 @router.get("/{user_id}", response_model=SuccessResponse)
 def read_user(
     user_id: int,
@@ -76,6 +117,7 @@ def create_user(
             error="Role not found, please create it first", 
             error_messages={}, 
             code=status.HTTP_400_BAD_REQUEST)
+    additional_role_ids = resolve_additional_roles(db, user_in.roles)
 
     updated_user = User(
         name=user_in.name,
@@ -85,8 +127,16 @@ def create_user(
         role=user_role, 
     )
     db.add(updated_user)
+    db.flush()
+    summary_counters.record(db, [], summary_counters.user_keys(user_role.id, updated_user.status))
+    role_ids = {user_role.id, *additional_role_ids}
+    set_user_roles(db, updated_user.id, role_ids)
+    refresh_users(db, [updated_user.id])
+    bump_users_version(db)
+    change_feed.record(db, change_feed.USERS, [updated_user.id])
     db.commit()
     db.refresh(updated_user)
+    snapshot_store.publish_user(db, updated_user.id, role_ids)
     
     pydantic_user = UserRead.model_validate(updated_user)
     result = {"user": pydantic_user}
@@ -111,8 +161,13 @@ def delete_user(
             error_messages={}, 
             code=status.HTTP_404_NOT_FOUND)
 
+    clear_user(db, user_id)
+    summary_counters.record(db, summary_counters.user_keys(user.role_id, user.status), [])
     db.delete(user)
+    bump_users_version(db)
+    change_feed.record(db, change_feed.USERS, [user_id], deleted=True)
     db.commit()
+    snapshot_store.publish_user(db, user_id, None)
     return ResponseController.send_response(
         result={},
         message="User deleted successfully",
@@ -132,6 +187,7 @@ def update_user(
             error="User not found", 
             error_messages={}, 
             code=status.HTTP_404_NOT_FOUND)
+    counted_in = summary_counters.user_keys(user.role_id, user.status)
 
     # Update name
     if user_in.name is not None:
@@ -160,6 +216,10 @@ def update_user(
                 code=status.HTTP_400_BAD_REQUEST)
 
     # Update role
+    roles_changed = user_in.role is not None or user_in.roles is not None
+    if roles_changed:
+        role_ids = set(user_role_ids(db, user_id))
+        role_ids.discard(user.role_id)
     if user_in.role is not None:
         user_role = db.exec(
             select(Role).where(Role.name == user_in.role)
@@ -170,12 +230,25 @@ def update_user(
                 error_messages={}, 
                 code=status.HTTP_400_BAD_REQUEST)
         user.role = user_role  # Assign the Role object directly
+    if user_in.roles is not None:
+        role_ids = set(resolve_additional_roles(db, user_in.roles))
+    if roles_changed:
+        if user.role is not None:
+            role_ids.add(user.role.id)
+        set_user_roles(db, user_id, role_ids)
+        refresh_users(db, [user_id])
 
     user.updated_at=datetime.now(UTC)
 
     db.add(user)
+    summary_counters.record(db, counted_in, summary_counters.user_keys(user.role.id if user.role else None, user.status))
+    if roles_changed:
+        bump_users_version(db)
+    change_feed.record(db, change_feed.USERS, [user_id])
     db.commit()
     db.refresh(user)
+    if roles_changed:
+        snapshot_store.publish_user(db, user.id, role_ids)
     pydantic_user = UserRead.model_validate(user)
     result = {"user": pydantic_user}
 
@@ -183,4 +256,45 @@ def update_user(
         result=result,
         message="User updated successfully",
         code=status.HTTP_200_OK
-    )
\ No newline at end of file
+    )
+@router.post("/{user_id}/roles", response_model=SuccessResponse)
+def grant_role(
+    user_id: int,
+    grant: UserRoleGrant,
+    db: Session = Depends(get_db_session),
+    has_perm: bool = Depends(user_has_permission("update_user")),
+):
+    """Give a user an additional role, optionally only until `expires_at`."""
+    user = db.get(User, user_id)
+    if not user:
+        return ResponseController.send_error(
+            error="User not found",
+            error_messages={},
+            code=status.HTTP_404_NOT_FOUND)
+    role = db.exec(select(Role).where(Role.name == grant.role)).first()
+    if not role:
+        return ResponseController.send_error(
+            error="Role not found, please create it first",
+            error_messages={},
+            code=status.HTTP_400_BAD_REQUEST)
+    expires_at = as_utc(grant.expires_at) if grant.expires_at is not None else None
+    if expires_at is not None and expires_at <= datetime.now(UTC):
+        return ResponseController.send_error(
+            error="expires_at must be in the future",
+            error_messages={},
+            code=status.HTTP_400_BAD_REQUEST)
+
+    if grant_user_role(db, user_id, role.id, expires_at):
+        refresh_users(db, [user_id])
+        bump_users_version(db)
+        change_feed.record(db, change_feed.USERS, [user_id])
+        db.commit()
+        snapshot_store.publish_user(db, user_id, user_role_ids(db, user_id))
+        if expires_at is not None:
+            grant_expiry_sweeper.schedule(expires_at)
+    db.refresh(user)
+
+    return ResponseController.send_response(
+        result={"user": UserRead.model_validate(user), "role": role.name, "expires_at": expires_at},
+        message="Role granted successfully",
+        code=status.HTTP_200_OK)
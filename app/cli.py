@@ -0,0 +1,191 @@
+import asyncio
+import csv
+import sys
+import typer
+from sqlmodel import Session
+from app.core.config import settings
+from app.db.database import engine
+from app.core.access_review import REPORTS, iter_report_csv, load_access_review
+from app.core.authz_snapshot import snapshot_store
+from app.core.dashboard_catalog import dashboard_catalog
+from app.core.rbac_config import FORMATS, apply_plan, config_errors, dump_config, export_config, load_config, plan_changes
+from app.core.rbac_graph import check_consistency
+from app.core.role_mining import find_role_merges
+from app.core.source_credentials import credential_reencryptor, keyring
+from app.core.source_health import DOWN, source_health_prober
+from app.core.summary_counters import reconcile
+from app.core.change_feed import prune_tombstones
+
+app = typer.Typer()
+
+@app.command()
+def check_rbac():
+    """
+    Diff the authorization state served by the API workers against the database.
+    """
+    with Session(engine) as session:
+        differences = check_consistency(session)
+    for difference in differences:
+        typer.echo(difference)
+    if differences:
+        typer.echo(f"{len(differences)} difference(s) found.")
+        raise typer.Exit(code=1)
+    typer.echo("Authorization state is consistent with the database.")
+
+@app.command()
+def access_review(
+    report: str = typer.Option("matrix", help="One of: " + ", ".join(REPORTS)),
+    output: str = typer.Option("-", help="File to write the CSV to; '-' for stdout."),
+):
+    """
+    Write an access-review report (users x permissions matrix or counts) as CSV.
+    """
+    if report not in REPORTS:
+        raise typer.BadParameter(f"must be one of: {', '.join(REPORTS)}", param_hint="--report")
+    with Session(engine) as session:
+        review = load_access_review(session)
+    stream = sys.stdout if output == "-" else open(output, "w", newline="")
+    try:
+        for chunk in iter_report_csv(review, report):
+            stream.write(chunk)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+@app.command()
+def mine_roles(
+    threshold: float = typer.Option(0.8, min=0.01, max=1.0, help="Minimum Jaccard similarity of similar roles."),
+):
+    """
+    Find duplicate, subset and near-duplicate roles and propose merges, as CSV.
+    """
+    with Session(engine) as session:
+        pairs, role_names = find_role_merges(session, threshold)
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow(["kind", "role_id", "role", "merge_into_id", "merge_into", "jaccard",
+                     "shared", "only_role", "only_merge_into", "affected_users"])
+    for pair in pairs:
+        writer.writerow([pair.kind, pair.role_a, role_names[pair.role_a], pair.role_b, role_names[pair.role_b],
+                         f"{pair.jaccard:.3f}", pair.shared, pair.only_a, pair.only_b, pair.affected_users])
+
+@app.command()
+def export_rbac(
+    format: str = typer.Option("yaml", help="One of: " + ", ".join(FORMATS)),
+    output: str = typer.Option("-", help="File to write the document to; '-' for stdout."),
+):
+    """
+    Export permissions, roles and their grants as a canonical JSON or YAML document.
+    """
+    if format not in FORMATS:
+        raise typer.BadParameter(f"must be one of: {', '.join(FORMATS)}", param_hint="--format")
+    with Session(engine) as session:
+        document = dump_config(export_config(session), format)
+    if output == "-":
+        sys.stdout.write(document)
+    else:
+        with open(output, "w") as stream:
+            stream.write(document)
+
+@app.command()
+def apply_rbac(
+    path: str = typer.Argument(..., help="JSON or YAML document written by export-rbac."),
+    dry_run: bool = typer.Option(False, help="Only print the planned changes."),
+    prune: bool = typer.Option(False, help="Delete roles and permissions missing from the document."),
+):
+    """
+    Apply a declarative RBAC document: only the difference is written, in one transaction.
+    """
+    with open(path) as stream:
+        config = load_config(stream.read())
+    with Session(engine) as session:
+        current = export_config(session)
+        errors = config_errors(current, config, prune)
+        for key, messages in errors.items():
+            for message in messages:
+                typer.echo(f"{key}: {message}")
+        if errors:
+            raise typer.Exit(code=1)
+
+        plan = plan_changes(current, config, prune)
+        for field, changes in plan.model_dump().items():
+            for change in changes:
+                typer.echo(f"{field}: {' -> '.join(change) if isinstance(change, tuple) else change}")
+        if plan.is_empty():
+            typer.echo("Nothing to change.")
+            return
+        if dry_run:
+            return
+
+        members_changed = apply_plan(session, plan)
+        session.commit()
+        if members_changed:
+            snapshot_store.publish_full(session)
+        else:
+            snapshot_store.publish_roles(session)
+    typer.echo("RBAC configuration applied.")
+
+@app.command()
+def probe_sources():
+    """
+    Probe every Grafana and Kibana source once, store the results and list the sources that are down.
+    """
+    results = asyncio.run(source_health_prober.probe_round())
+    down = [row for row in results if row["status"] == DOWN]
+    for row in down:
+        typer.echo(f"{row['source_type'].value} source {row['source_id']}: {row['error']}")
+    typer.echo(f"Probed {len(results)} source(s), {len(down)} down.")
+
+@app.command()
+def sync_dashboards():
+    """
+    List the dashboards of every Grafana source once and store what changed in the catalog.
+    """
+    stats = asyncio.run(dashboard_catalog.sync_round())
+    typer.echo(
+        f"Synced {stats['sources']} Grafana source(s), {stats['failed']} failed: "
+        f"{stats['added']} added, {stats['updated']} updated, {stats['removed']} removed."
+    )
+
+@app.command()
+def reencrypt_credentials():
+    """
+    Seal every stored source credential under the active key (plaintext ones included), in batches.
+    """
+    if not keyring.enabled:
+        typer.echo("No credential keys are configured (CREDENTIAL_KEYS).", err=True)
+        raise typer.Exit(code=1)
+    count = asyncio.run(credential_reencryptor.run())
+    typer.echo(f"Re-encrypted {count} credential(s) under key {keyring.active}.")
+
+@app.command()
+def reconcile_counters(
+    dry_run: bool = typer.Option(False, help="Only print the counters that drifted."),
+):
+    """
+    Recount users, data sources and sources and repair the summary counters that drifted.
+    """
+    with Session(engine) as session:
+        corrections = reconcile(session)
+        for counter, bucket, stored, actual in corrections:
+            typer.echo(f"{counter}[{bucket}]: {stored} -> {actual}")
+        if dry_run:
+            session.rollback()
+            typer.echo(f"{len(corrections)} counter(s) drifted.")
+            return
+        session.commit()
+    typer.echo(f"Corrected {len(corrections)} counter(s).")
+
+@app.command()
+def prune_change_feed(
+    days: int = typer.Option(settings.CHANGE_FEED_TOMBSTONE_DAYS, help="Keep the deletes of this many days."),
+):
+    """
+    Remove old deletes from the change feeds; mirrors with older cursors must resync.
+    """
+    with Session(engine) as session:
+        pruned = prune_tombstones(session, days)
+        session.commit()
+    typer.echo(f"Pruned {pruned} delete(s) from the change feeds.")
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,145 @@
+"""
+Access-review reports: who holds which permission.
+
+Everything is loaded with three bulk queries (role masks, users, role
+memberships) and computed on Python integers used as bitsets, one bit per
+permission. Users with the same roles share one "role set" whose mask and CSV
+row are computed once, so the users x permissions matrix is never held in
+memory; it is streamed one chunk of rows at a time.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+import csv
+import io
+from sqlmodel import Session, select
+from app.core.authz_snapshot import load_role_masks
+from app.core.effective_permissions import unexpired
+from app.models.role import Role
+from app.models.user import User
+from app.models.user_has_roles import UserHasRoles
+
+REPORTS = ("matrix", "permissions", "roles")
+CHUNK_ROWS = 1000
+
+
+@dataclass
+class AccessReview:
+    permission_names: List[str]
+    role_names: Dict[int, str]
+    role_masks: Dict[int, int]
+    # (id, email, name, status, role set) per user, ordered by id
+    users: List[Tuple[int, str, str, str, int]]
+    role_sets: List[Tuple[int, ...]]
+    role_set_masks: List[int]
+
+    def bits(self, mask: int) -> Iterator[int]:
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def users_per_role_set(self) -> List[int]:
+        counts = [0] * len(self.role_sets)
+        for *_, role_set in self.users:
+            counts[role_set] += 1
+        return counts
+
+    def permission_counts(self) -> List[int]:
+        """Number of users holding each permission."""
+        counts = [0] * len(self.permission_names)
+        for mask, users in zip(self.role_set_masks, self.users_per_role_set()):
+            for bit in self.bits(mask):
+                counts[bit] += users
+        return counts
+
+    def role_member_counts(self) -> Dict[int, int]:
+        counts = dict.fromkeys(self.role_names, 0)
+        for role_ids, users in zip(self.role_sets, self.users_per_role_set()):
+            for role_id in role_ids:
+                counts[role_id] += users
+        return counts
+
+
+def load_access_review(db: Session) -> AccessReview:
+    names, role_ids, packed_masks = load_role_masks(db)
+    mask_words = len(packed_masks) // len(role_ids) if role_ids else 1
+    role_masks = {
+        role_id: sum(packed_masks[index * mask_words + word] << (64 * word) for word in range(mask_words))
+        for index, role_id in enumerate(role_ids)
+    }
+    role_names = dict(db.exec(select(Role.id, Role.name)).all())
+
+    roles_by_user: Dict[int, List[int]] = {}
+    for user_id, role_id in db.exec(
+        select(UserHasRoles.user_id, UserHasRoles.role_id)
+        # Memberships past their expiry stay in the table until the sweeper runs
+        .where(unexpired(UserHasRoles.__table__))
+        .order_by(UserHasRoles.user_id, UserHasRoles.role_id)
+    ).all():
+        roles_by_user.setdefault(user_id, []).append(role_id)
+
+    role_set_index: Dict[Tuple[int, ...], int] = {}
+    role_sets: List[Tuple[int, ...]] = []
+    role_set_masks: List[int] = []
+    users = []
+    for user_id, email, name, status in db.exec(
+        select(User.id, User.email, User.name, User.status).order_by(User.id)
+    ).all():
+        role_set = tuple(roles_by_user.get(user_id, ()))
+        index = role_set_index.get(role_set)
+        if index is None:
+            index = role_set_index[role_set] = len(role_sets)
+            role_sets.append(role_set)
+            mask = 0
+            for role_id in role_set:
+                mask |= role_masks.get(role_id, 0)
+            role_set_masks.append(mask)
+        users.append((user_id, email, name, status, index))
+    return AccessReview(names, role_names, role_masks, users, role_sets, role_set_masks)
+
+
+def _csv_line(row) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(row)
+    return buffer.getvalue()
+
+def iter_matrix_csv(review: AccessReview) -> Iterator[str]:
+    """One row per user with a 0/1 column per permission."""
+    yield _csv_line(["user_id", "email", "name", "status", "roles", *review.permission_names])
+    # The permission columns only depend on the role set
+    columns = []
+    for role_set, mask in zip(review.role_sets, review.role_set_masks):
+        cells = ["0"] * len(review.permission_names)
+        for bit in review.bits(mask):
+            cells[bit] = "1"
+        roles = ";".join(review.role_names.get(role_id, str(role_id)) for role_id in role_set)
+        columns.append((roles, ",".join(cells)))
+
+    chunk = []
+    for user_id, email, name, status, role_set in review.users:
+        roles, cells = columns[role_set]
+        chunk.append(_csv_line([user_id, email, name, status, roles]).rstrip("\n") + "," + cells + "\n")
+        if len(chunk) >= CHUNK_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+def iter_permission_counts_csv(review: AccessReview) -> Iterator[str]:
+    yield _csv_line(["permission", "users"])
+    for name, users in zip(review.permission_names, review.permission_counts()):
+        yield _csv_line([name, users])
+
+def iter_role_counts_csv(review: AccessReview) -> Iterator[str]:
+    yield _csv_line(["role_id", "role", "members", "permissions"])
+    members = review.role_member_counts()
+    for role_id, name in sorted(review.role_names.items()):
+        yield _csv_line([role_id, name, members[role_id], review.role_masks.get(role_id, 0).bit_count()])
+
+def iter_report_csv(review: AccessReview, report: str) -> Iterator[str]:
+    if report == "permissions":
+        return iter_permission_counts_csv(review)
+    if report == "roles":
+        return iter_role_counts_csv(review)
+    return iter_matrix_csv(review)
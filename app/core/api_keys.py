@@ -0,0 +1,70 @@
+from datetime import datetime, UTC
+from typing import Dict
+import secrets
+import threading
+import time
+from sqlalchemy import bindparam, update
+from sqlmodel import Session
+from app.core.config import settings
+from app.db.database import engine
+from app.models.api_key import ApiKey
+
+API_KEY_PREFIX = "urm_"
+
+
+def generate_api_key() -> str:
+    """Create a high-entropy API key; the prefix makes keys recognisable in headers and logs."""
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+def is_api_key(token: str) -> bool:
+    return token.startswith(API_KEY_PREFIX)
+
+
+class LastUsedTracker:
+    """
+    Collects API key usage in memory and writes it back in batches.
+
+    Recording a use is a dict assignment; the database sees one executemany
+    UPDATE per flush instead of one write per authenticated request.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int = 500):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def touch(self, api_key_id: int) -> None:
+        """Record a use of the key and flush if the batch is due."""
+        with self._lock:
+            self._pending[api_key_id] = datetime.now(UTC)
+            due = (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all pending last-used timestamps with a single batched statement."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        statement = (
+            update(ApiKey.__table__)
+            .where(ApiKey.__table__.c.id == bindparam("b_id"))
+            .values(last_used_at=bindparam("b_last_used_at"))
+        )
+        with Session(engine) as session:
+            session.connection().execute(
+                statement,
+                [{"b_id": key_id, "b_last_used_at": used_at} for key_id, used_at in pending.items()],
+            )
+            session.commit()
+
+
+last_used_tracker = LastUsedTracker(flush_interval=settings.API_KEY_LAST_USED_FLUSH_SECONDS)
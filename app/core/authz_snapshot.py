@@ -0,0 +1,484 @@
+"""
+Compiled authorization snapshot shared by all workers on a host.
+
+The role -> permission matrix and the user -> roles mapping are compiled into a
+compact binary file which every worker memory-maps read-only. Publishing writes
+a new file next to the old one and atomically renames it over the old one, so
+readers either see the previous or the next generation, never a partial write.
+
+Users hold a set of roles. Every distinct set ("role set") is stored once with
+its effective permission mask precomputed, and each user points at its role
+set, so a check is one bisect plus one bit test however many roles a user has.
+Role set masks are recomputed on every publish, so changing a role's
+permissions never touches the per-user data.
+
+Layout (little-endian):
+
+    header          magic, format version, generation, role generation,
+                    users version, roles version (see app.core.authz_versions),
+                    n_perms, n_roles, n_users, mask_words, n_role_sets, n_role_set_roles
+    role_ids        int32[n_roles]                     sorted
+    role_masks      uint64[n_roles * mask_words]       bit i set => permission i granted
+    role_set_masks  uint64[n_role_sets * mask_words]   union of the set's role masks
+    user_ids        int32[n_users]                     sorted
+    user_role_sets  int32[n_users]                     role set index per user
+    role_set_starts int32[n_role_sets + 1]             CSR offsets into role_set_roles
+    role_set_roles  int32[n_role_set_roles]            role ids of each set, sorted
+    perm_names      utf-8, newline separated, permission i on line i
+"""
+
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import fcntl
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from sqlalchemy import and_
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.authz_versions import current_versions
+from app.core.effective_permissions import unexpired
+from app.core.permission_patterns import compile_patterns
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.role_closure import RoleClosure
+from app.models.role_has_permissions import RoleHasPermissions
+from app.models.role_permission_pattern import RolePermissionPattern
+from app.models.user import User
+from app.models.user_has_roles import UserHasRoles
+
+MAGIC = b"URMAUTHZ"
+FORMAT_VERSION = 4
+HEADER = struct.Struct("<8sIQQQQIIIIII4x")
+
+
+def _align8(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def _mask_words(permission_names: List[str]) -> int:
+    return max(1, (len(permission_names) + 63) // 64)
+
+def snapshot_path() -> str:
+    """Location of the snapshot; defaults to shared memory where available."""
+    if settings.AUTHZ_SNAPSHOT_PATH:
+        return settings.AUTHZ_SNAPSHOT_PATH
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"{settings.DATABASE_NAME}-authz.snapshot")
+
+
+@dataclass
+class SnapshotData:
+    """Mutable, decoded form of a snapshot used while compiling or patching one."""
+    permission_names: List[str]
+    role_ids: array
+    role_masks: array
+    user_ids: array
+    user_role_sets: array
+    role_sets: List[Tuple[int, ...]]
+    _role_set_index: Optional[Dict[Tuple[int, ...], int]] = field(default=None, init=False, repr=False)
+
+    def intern_role_set(self, role_ids: Sequence[int]) -> int:
+        """Index of the given role set, appending it if it is new."""
+        role_set = tuple(sorted(set(role_ids)))
+        if self._role_set_index is None:
+            self._role_set_index = {s: i for i, s in enumerate(self.role_sets)}
+        index = self._role_set_index.get(role_set)
+        if index is None:
+            index = len(self.role_sets)
+            self.role_sets.append(role_set)
+            self._role_set_index[role_set] = index
+        return index
+
+    def set_user(self, user_id: int, role_ids: Optional[Sequence[int]]) -> None:
+        """Set a user's roles; None removes the user."""
+        index = bisect_left(self.user_ids, user_id)
+        exists = index < len(self.user_ids) and self.user_ids[index] == user_id
+        if role_ids is None:
+            if exists:
+                del self.user_ids[index]
+                del self.user_role_sets[index]
+            return
+        role_set = self.intern_role_set(role_ids)
+        if exists:
+            self.user_role_sets[index] = role_set
+        else:
+            self.user_ids.insert(index, user_id)
+            self.user_role_sets.insert(index, role_set)
+
+    def compact(self) -> None:
+        """Drop role sets no user points at any more."""
+        used = sorted(set(self.user_role_sets))
+        if len(used) == len(self.role_sets):
+            return
+        remap = {old: new for new, old in enumerate(used)}
+        self.role_sets = [self.role_sets[old] for old in used]
+        self.user_role_sets = array("i", (remap[i] for i in self.user_role_sets))
+        self._role_set_index = None
+
+
+class AuthzSnapshot:
+    """Read-only view over one generation of the snapshot; all lookups are zero-copy."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        view = memoryview(buffer)
+        (magic, format_version, self.generation, self.role_generation, self.users_version,
+         self.roles_version, n_perms, n_roles, n_users, self.mask_words, n_role_sets,
+         n_role_set_roles) = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError("Not an authorization snapshot")
+
+        def section(offset: int, length: int, fmt: str):
+            size = length * struct.calcsize(fmt)
+            return view[offset:offset + size].cast(fmt), offset + size
+
+        self.role_ids, offset = section(HEADER.size, n_roles, "i")
+        offset = _align8(offset)
+        self.role_masks, offset = section(offset, n_roles * self.mask_words, "Q")
+        self.role_set_masks, offset = section(offset, n_role_sets * self.mask_words, "Q")
+        self.user_ids, offset = section(offset, n_users, "i")
+        self.user_role_sets, offset = section(offset, n_users, "i")
+        self.role_set_starts, offset = section(offset, n_role_sets + 1, "i")
+        self.role_set_roles, offset = section(offset, n_role_set_roles, "i")
+
+        names = bytes(view[offset:]).decode("utf-8").split("\n") if n_perms else []
+        self.permission_names = names
+        self.permission_bits = {name: bit for bit, name in enumerate(names)}
+
+    def _role_index(self, role_id: int) -> Optional[int]:
+        index = bisect_left(self.role_ids, role_id)
+        if index < len(self.role_ids) and self.role_ids[index] == role_id:
+            return index
+        return None
+
+    def _user_index(self, user_id: int) -> Optional[int]:
+        index = bisect_left(self.user_ids, user_id)
+        if index < len(self.user_ids) and self.user_ids[index] == user_id:
+            return index
+        return None
+
+    def _mask_names(self, masks, index: int) -> List[str]:
+        start = index * self.mask_words
+        return [
+            name for bit, name in enumerate(self.permission_names)
+            if masks[start + bit // 64] >> (bit % 64) & 1
+        ]
+
+    def _mask_has(self, masks, index: int, permission: str) -> bool:
+        bit = self.permission_bits.get(permission)
+        if bit is None:
+            return False
+        return bool(masks[index * self.mask_words + bit // 64] >> (bit % 64) & 1)
+
+    def has_user(self, user_id: int) -> bool:
+        return self._user_index(user_id) is not None
+
+    def role_set_of(self, user_id: int) -> Optional[int]:
+        """The interned role set of a user, for callers checking many permissions."""
+        index = self._user_index(user_id)
+        return None if index is None else self.user_role_sets[index]
+
+    def role_set_roles_of(self, role_set: int) -> Tuple[int, ...]:
+        return tuple(self.role_set_roles[self.role_set_starts[role_set]:self.role_set_starts[role_set + 1]])
+
+    def role_set_has_permission(self, role_set: int, permission: str) -> bool:
+        return self._mask_has(self.role_set_masks, role_set, permission)
+
+    def roles_of(self, user_id: int) -> Tuple[int, ...]:
+        role_set = self.role_set_of(user_id)
+        return () if role_set is None else self.role_set_roles_of(role_set)
+
+    def role_has_permission(self, role_id: int, permission: str) -> bool:
+        index = self._role_index(role_id)
+        return index is not None and self._mask_has(self.role_masks, index, permission)
+
+    def user_has_permission(self, user_id: int, permission: str) -> bool:
+        index = self._user_index(user_id)
+        return index is not None and self._mask_has(
+            self.role_set_masks, self.user_role_sets[index], permission)
+
+    def role_permissions(self, role_id: int) -> List[str]:
+        index = self._role_index(role_id)
+        return [] if index is None else self._mask_names(self.role_masks, index)
+
+    def user_permissions(self, user_id: int) -> List[str]:
+        index = self._user_index(user_id)
+        return [] if index is None else self._mask_names(self.role_set_masks, self.user_role_sets[index])
+
+    def data(self) -> SnapshotData:
+        """Decoded copy, used when publishing a patched generation."""
+        role_sets = [
+            tuple(self.role_set_roles[self.role_set_starts[i]:self.role_set_starts[i + 1]])
+            for i in range(len(self.role_set_starts) - 1)
+        ]
+        return SnapshotData(
+            permission_names=list(self.permission_names),
+            role_ids=array("i", self.role_ids.tobytes()),
+            role_masks=array("Q", self.role_masks.tobytes()),
+            user_ids=array("i", self.user_ids.tobytes()),
+            user_role_sets=array("i", self.user_role_sets.tobytes()),
+            role_sets=role_sets,
+        )
+
+
+def encode_snapshot(
+        generation: int,
+        role_generation: int,
+        versions: Tuple[int, int],
+        data: SnapshotData,
+) -> bytes:
+    """Serialise one generation of the snapshot, precomputing the role set masks."""
+    mask_words = _mask_words(data.permission_names)
+    role_index = {role_id: index for index, role_id in enumerate(data.role_ids)}
+
+    role_set_masks = array("Q", bytes(8 * len(data.role_sets) * mask_words))
+    role_set_starts = array("i", [0])
+    role_set_roles = array("i")
+    for set_index, role_set in enumerate(data.role_sets):
+        for role_id in role_set:
+            index = role_index.get(role_id)
+            if index is not None:
+                for word in range(mask_words):
+                    role_set_masks[set_index * mask_words + word] |= data.role_masks[index * mask_words + word]
+        role_set_roles.extend(role_set)
+        role_set_starts.append(len(role_set_roles))
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, generation, role_generation, *versions,
+                         len(data.permission_names), len(data.role_ids), len(data.user_ids),
+                         mask_words, len(data.role_sets), len(role_set_roles))
+    role_section = data.role_ids.tobytes()
+    padding = bytes(_align8(len(header) + len(role_section)) - len(header) - len(role_section))
+    return b"".join((
+        header,
+        role_section,
+        padding,
+        data.role_masks.tobytes(),
+        role_set_masks.tobytes(),
+        data.user_ids.tobytes(),
+        data.user_role_sets.tobytes(),
+        role_set_starts.tobytes(),
+        role_set_roles.tobytes(),
+        "\n".join(data.permission_names).encode("utf-8"),
+    ))
+
+
+class SnapshotStore:
+    """
+    Publishes and maps the snapshot file.
+
+    Mapping is refreshed whenever the file on disk has been replaced, which is
+    detected with a stat of the path (no DB access and no data copy).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[AuthzSnapshot] = None
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._persisted_generation: Optional[int] = None
+
+    def current(self) -> Optional[AuthzSnapshot]:
+        """The most recently published generation, or None if nothing was published yet."""
+        path = snapshot_path()
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        file_id = (stat.st_ino, stat.st_mtime_ns)
+        if file_id != self._file_id:
+            with self._lock:
+                if file_id != self._file_id:
+                    with open(path, "rb") as file:
+                        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        self._snapshot = AuthzSnapshot(buffer)
+                    except ValueError:
+                        # Left behind by an older release; it gets republished
+                        return None
+                    self._file_id = file_id
+        return self._snapshot
+
+    @contextmanager
+    def _publishing(self):
+        """Serialise publishers across processes so read-modify-write patches don't race."""
+        path = snapshot_path()
+        with open(path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield path
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, path: str, data: bytes) -> None:
+        directory = os.path.dirname(path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".authz-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def publish_full(self, db: Session) -> AuthzSnapshot:
+        """Compile the whole snapshot from the database."""
+        with self._publishing() as path:
+            current = self.current()
+            # Versions are read first, in the same transaction as the data
+            versions = current_versions(db)
+            names, role_ids, role_masks = load_role_masks(db)
+            data = SnapshotData(names, role_ids, role_masks, array("i"), array("i"), [])
+            _load_users(db, data)
+            self._write(path, encode_snapshot(
+                current.generation + 1 if current else 1,
+                current.role_generation + 1 if current else 1,
+                versions, data))
+            return self.current()
+
+    def publish_roles(self, db: Session) -> AuthzSnapshot:
+        """Recompile the role/permission matrix, keeping the user section as published."""
+        if self.current() is None:
+            return self.publish_full(db)
+        with self._publishing() as path:
+            current = self.current()
+            _, roles_version = current_versions(db)
+            data = current.data()
+            data.permission_names, data.role_ids, data.role_masks = load_role_masks(db)
+            self._write(path, encode_snapshot(
+                current.generation + 1, current.role_generation + 1,
+                (current.users_version, roles_version), data))
+            return self.current()
+
+    def publish_user(
+            self,
+            db: Session,
+            user_id: int,
+            role_ids: Optional[Sequence[int]],
+    ) -> AuthzSnapshot:
+        """Patch one user's roles (None removes the user) into a new generation."""
+        if self.current() is None:
+            return self.publish_full(db)
+        with self._publishing() as path:
+            current = self.current()
+            data = current.data()
+            data.set_user(user_id, role_ids)
+            data.compact()
+
+            # Only the user section changed, so the role generation is kept. Each
+            # user change bumps the users version exactly once, so counting patches
+            # can only under-state the version: a mismatch forces a rebuild, never
+            # a stale restore.
+            self._write(path, encode_snapshot(
+                current.generation + 1, current.role_generation,
+                (current.users_version + 1, current.roles_version), data))
+            return self.current()
+
+    def persist(self, path: str) -> bool:
+        """Copy the current generation to durable storage for the next cold start."""
+        snapshot = self.current()
+        if snapshot is None or snapshot.generation == self._persisted_generation:
+            return False
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._write(path, bytes(snapshot.buffer))
+        self._persisted_generation = snapshot.generation
+        return True
+
+    async def persist_periodically(self, path: str, interval: float) -> None:
+        """Background loop persisting the snapshot whenever a new generation was published."""
+        while True:
+            await asyncio.sleep(interval)
+            await run_in_threadpool(self.persist, path)
+
+    def restore(self, db: Session, path: str) -> Optional[AuthzSnapshot]:
+        """
+        Install a persisted snapshot if it still matches the database.
+
+        Validation is a single query for the current versions; on a mismatch (or
+        no usable file) nothing is installed and None is returned.
+        """
+        try:
+            with open(path, "rb") as file:
+                persisted = AuthzSnapshot(file.read())
+        except (OSError, ValueError, struct.error):
+            return None
+        if (persisted.users_version, persisted.roles_version) != current_versions(db):
+            return None
+
+        with self._publishing() as shared_path:
+            current = self.current()
+            self._write(shared_path, encode_snapshot(
+                current.generation + 1 if current else 1,
+                current.role_generation + 1 if current else 1,
+                (persisted.users_version, persisted.roles_version),
+                persisted.data()))
+            return self.current()
+
+    def is_current(self, db: Session) -> bool:
+        """Whether the shared snapshot matches the database's versions."""
+        snapshot = self.current()
+        return snapshot is not None and (
+            (snapshot.users_version, snapshot.roles_version) == current_versions(db))
+
+
+def _load_users(db: Session, data: SnapshotData) -> None:
+    """Fill the user section; one ordered query over users and their roles."""
+    rows = db.exec(
+        select(User.id, UserHasRoles.role_id)
+        .outerjoin(UserHasRoles, and_(UserHasRoles.user_id == User.id, unexpired(UserHasRoles.__table__)))
+        .order_by(User.id, UserHasRoles.role_id)
+    ).all()
+    roles_by_user: Dict[int, List[int]] = {}
+    for user_id, role_id in rows:
+        roles = roles_by_user.setdefault(user_id, [])
+        if role_id is not None:
+            roles.append(role_id)
+    for user_id, roles in roles_by_user.items():
+        data.user_ids.append(user_id)
+        data.user_role_sets.append(data.intern_role_set(roles))
+
+def load_role_masks(db: Session) -> Tuple[List[str], array, array]:
+    """
+    Permission names in bit order, role ids in ascending order and each role's
+    effective permission mask (`mask_words` words per role).
+    """
+    permissions = db.exec(select(Permission.id, Permission.name).order_by(Permission.id)).all()
+    names = [name for _, name in permissions]
+    bit_of = {permission_id: bit for bit, (permission_id, _) in enumerate(permissions)}
+    mask_words = _mask_words(names)
+
+    role_ids = array("i", db.exec(select(Role.id).order_by(Role.id)).all())
+    index_of = {role_id: index for index, role_id in enumerate(role_ids)}
+    role_masks = array("Q", bytes(8 * len(role_ids) * mask_words))
+    # A role's mask covers the permissions it inherits from the roles it includes
+    for role_id, permission_id in db.exec(
+        select(RoleClosure.ancestor_id, RoleHasPermissions.permission_id)
+        .join(RoleHasPermissions, RoleHasPermissions.role_id == RoleClosure.descendant_id)
+        .where(unexpired(RoleHasPermissions.__table__))
+        .distinct()
+    ).all():
+        bit = bit_of[permission_id]
+        role_masks[index_of[role_id] * mask_words + bit // 64] |= 1 << (bit % 64)
+
+    # Wildcard grants are expanded into the same bits, once per distinct pattern
+    pattern_bits = {}
+    for role_id, pattern in db.exec(
+        select(RoleClosure.ancestor_id, RolePermissionPattern.pattern)
+        .join(RolePermissionPattern, RolePermissionPattern.role_id == RoleClosure.descendant_id)
+        .distinct()
+    ).all():
+        if pattern not in pattern_bits:
+            matcher = compile_patterns([pattern])
+            pattern_bits[pattern] = [bit for bit, name in enumerate(names) if matcher.matches(name)]
+        offset = index_of[role_id] * mask_words
+        for bit in pattern_bits[pattern]:
+            role_masks[offset + bit // 64] |= 1 << (bit % 64)
+    return names, role_ids, role_masks
+
+
+snapshot_store = SnapshotStore()
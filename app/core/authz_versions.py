@@ -0,0 +1,38 @@
+from typing import Tuple
+from sqlalchemy import update
+from sqlmodel import Session, select
+from app.models.authz_version import AuthzVersion
+
+VERSION_ROW_ID = 1
+
+
+def bump_users_version(db: Session) -> None:
+    """Record a change of the user -> role mapping; call before committing it."""
+    db.exec(
+        update(AuthzVersion)
+        .where(AuthzVersion.id == VERSION_ROW_ID)
+        .values(users_version=AuthzVersion.users_version + 1)
+    )
+
+def bump_roles_version(db: Session) -> None:
+    """Record a change of the role -> permission matrix; call before committing it."""
+    db.exec(
+        update(AuthzVersion)
+        .where(AuthzVersion.id == VERSION_ROW_ID)
+        .values(roles_version=AuthzVersion.roles_version + 1)
+    )
+
+def current_versions(db: Session) -> Tuple[int, int]:
+    """(users_version, roles_version) as currently committed, in one query."""
+    row = db.exec(
+        select(AuthzVersion.users_version, AuthzVersion.roles_version)
+        .where(AuthzVersion.id == VERSION_ROW_ID)
+    ).first()
+    if row is None:
+        return 0, 0
+    return row[0], row[1]
+
+def ensure_version_row(db: Session) -> None:
+    """Create the counters row if missing; the caller commits."""
+    if db.get(AuthzVersion, VERSION_ROW_ID) is None:
+        db.add(AuthzVersion(id=VERSION_ROW_ID))
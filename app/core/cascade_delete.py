@@ -0,0 +1,202 @@
+"""
+Set-based deletes of sources, data sources and roles with everything that hangs off them.
+
+Instead of loading the children of a row through the ORM and deleting them one
+by one, each dependent table is cleared with one statement keyed on the parent,
+and the rows every statement touched are counted. The foreign keys carry the
+same rules as ON DELETE clauses, so rows deleted directly in the database do
+not leave dangling children either; the tables that refer to sources without
+a foreign key (dashboards and probe results) are only ever cleared here.
+
+A delete can also run as a background job, whose state is kept in
+`delete_jobs` so any worker can report it. Such a job deletes the sources of
+a data source in batches of `CASCADE_DELETE_BATCH`, each in its own
+transaction, so a huge data source never holds locks for long; the job's
+counts are updated in the transaction of every batch.
+"""
+
+from collections import Counter
+from datetime import datetime, UTC
+from typing import Callable, Dict, Optional
+from uuid import uuid4
+import logging
+from sqlalchemy import delete, func, update
+from sqlmodel import Session, select
+from app.core.authz_snapshot import snapshot_store
+from app.core.authz_versions import bump_roles_version, bump_users_version
+from app.core.config import settings
+from app.core.effective_permissions import refresh_users, remove_role_members, role_holder_ids
+from app.core.rbac_graph import rbac_graph_store
+from app.core import change_feed, role_hierarchy, summary_counters
+from app.db.database import engine
+from app.models.api_key import ApiKey
+from app.models.data_source import DataSource, SourceType
+from app.models.data_source_acl import DataSourceAcl
+from app.models.delete_job import DeleteJob
+from app.models.grafana_dashboard import GrafanaDashboard
+from app.models.role import Role
+from app.models.role_has_permissions import RoleHasPermissions
+from app.models.role_inheritance import RoleInheritance
+from app.models.role_permission_pattern import RolePermissionPattern
+from app.models.source import Source
+from app.models.source_health import SourceHealth
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+DATA_SOURCE = "data_source"
+ROLE = "role"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SOURCES = Source.__table__
+GD = GrafanaDashboard.__table__
+SH = SourceHealth.__table__
+ACLS = DataSourceAcl.__table__
+JOBS = DeleteJob.__table__
+
+Counts = Dict[str, int]
+
+
+def _delete_sources(db: Session, condition, counts: Counts) -> None:
+    """Delete the sources matching `condition` with their dashboards and probe results."""
+    deltas = Counter()
+    for source_type, data_source_id, n in db.exec(
+        select(SOURCES.c.type, SOURCES.c.data_source_id, func.count())
+        .where(condition).group_by(SOURCES.c.type, SOURCES.c.data_source_id)
+    ).all():
+        for key in summary_counters.source_keys(source_type, data_source_id):
+            deltas[key] -= n
+    summary_counters.apply(db, deltas)
+    change_feed.record_select(db, change_feed.SOURCES, select(SOURCES.c.id).where(condition), deleted=True)
+
+    grafana_ids = select(SOURCES.c.id).where(condition, SOURCES.c.type == SourceType.GRAFANA)
+    counts["grafana_dashboards"] += db.exec(delete(GD).where(GD.c.grafana_source_id.in_(grafana_ids))).rowcount
+    # Source ids are unique across types
+    counts["source_health"] += db.exec(delete(SH).where(SH.c.source_id.in_(select(SOURCES.c.id).where(condition)))).rowcount
+    counts["sources"] += db.exec(delete(SOURCES).where(condition)).rowcount
+
+def delete_source(db: Session, source_id: int) -> Counts:
+    """Delete a source with its dashboards and probe results; returns the rows deleted by table."""
+    counts = dict.fromkeys(("sources", "grafana_dashboards", "source_health"), 0)
+    _delete_sources(db, SOURCES.c.id == source_id, counts)
+    db.commit()
+    return counts
+
+def delete_data_source(
+        db: Session,
+        data_source_id: int,
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[Counts], None]] = None,
+) -> Counts:
+    """
+    Delete a data source with its sources, their dashboards and probe results,
+    and its grants; returns the rows deleted by table. Everything is one
+    transaction, unless `batch_size` is given: then the sources go that many at
+    a time, each batch committed on its own after `progress` saw the counts.
+    """
+    counts = dict.fromkeys(("sources", "grafana_dashboards", "source_health", "data_source_acls", "data_sources"), 0)
+    if batch_size:
+        while True:
+            batch = db.exec(
+                select(SOURCES.c.id).where(SOURCES.c.data_source_id == data_source_id)
+                .order_by(SOURCES.c.id).limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            _delete_sources(db, SOURCES.c.id.in_(batch), counts)
+            if progress is not None:
+                progress(counts)
+            db.commit()
+    else:
+        _delete_sources(db, SOURCES.c.data_source_id == data_source_id, counts)
+
+    counts["data_source_acls"] += db.exec(delete(ACLS).where(ACLS.c.data_source_id == data_source_id)).rowcount
+    data_sources = DataSource.__table__
+    source_type = db.exec(select(data_sources.c.type).where(data_sources.c.id == data_source_id)).first()
+    counts["data_sources"] += db.exec(delete(data_sources).where(data_sources.c.id == data_source_id)).rowcount
+    if source_type is not None:
+        summary_counters.record(db, summary_counters.data_source_keys(source_type), [])
+        summary_counters.drop_buckets(db, summary_counters.SOURCES_PER_DATA_SOURCE, [data_source_id])
+    if progress is not None:
+        progress(counts)
+    db.commit()
+    return counts
+
+def delete_role(db: Session, role_id: int) -> Counts:
+    """
+    Delete a role: take it away from its members and out of the hierarchy,
+    drop its grants, patterns, data source grants and the API keys scoped to
+    it, and unset it as the primary role of users; returns the rows affected
+    by table. Holders through a parent role lose what it granted too.
+    """
+    holders = role_holder_ids(db, role_id)
+    ancestors = role_hierarchy.ancestor_ids(db, role_id)
+    parents = db.exec(select(RoleInheritance.parent_role_id).where(RoleInheritance.child_role_id == role_id)).all()
+    members = remove_role_members(db, role_id)
+    role_hierarchy.remove_role(db, role_id)
+
+    users = User.__table__
+    counts = {
+        "user_has_roles": len(members),
+        "users": db.exec(update(users).where(users.c.role_id == role_id).values(role_id=None)).rowcount,
+    }
+    for table in (RoleHasPermissions.__table__, RolePermissionPattern.__table__, ACLS, ApiKey.__table__):
+        counts[table.name] = db.exec(delete(table).where(table.c.role_id == role_id)).rowcount
+    refresh_users(db, holders)
+    counts["roles"] = db.exec(delete(Role.__table__).where(Role.__table__.c.id == role_id)).rowcount
+    summary_counters.drop_buckets(db, summary_counters.USERS_PER_ROLE, [role_id])
+
+    bump_roles_version(db)
+    if members:
+        bump_users_version(db)
+    change_feed.record(db, change_feed.ROLES, [role_id], deleted=True)
+    change_feed.record(db, change_feed.ROLES, parents)
+    change_feed.record(db, change_feed.USERS, members)
+    db.commit()
+    if members:
+        snapshot_store.publish_full(db)
+    rbac_graph_store.role_changed(db, role_id, ancestors)
+    return counts
+
+
+def submit_job(db: Session, kind: str, target_id: int) -> DeleteJob:
+    """Record a pending delete job; run it with run_job."""
+    job = DeleteJob(id=uuid4().hex, kind=kind, target_id=target_id, status=PENDING)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def _set_job(db: Session, job_id: str, **values) -> None:
+    db.exec(update(JOBS).where(JOBS.c.id == job_id).values(**values))
+
+def run_job(job_id: str, batch_size: int = settings.CASCADE_DELETE_BATCH) -> None:
+    """Run a pending job in its own session; the outcome is recorded on the job, never raised."""
+    with Session(engine) as db:
+        job = db.get(DeleteJob, job_id)
+        if job is None or job.status != PENDING:
+            return
+        kind, target_id = job.kind, job.target_id
+        _set_job(db, job_id, status=RUNNING)
+        db.commit()
+
+        try:
+            if kind == DATA_SOURCE:
+                counts = delete_data_source(
+                    db, target_id, batch_size, lambda counts: _set_job(db, job_id, counts=dict(counts))
+                )
+            else:
+                counts = delete_role(db, target_id)
+        except Exception as exc:
+            logger.exception("Delete job %s (%s %d) failed", job_id, kind, target_id)
+            db.rollback()
+            # Batches committed before the failure stay deleted; the job keeps their counts
+            _set_job(db, job_id, status=FAILED, error=f"{type(exc).__name__}: {exc}"[:255],
+                     finished_at=datetime.now(UTC))
+        else:
+            _set_job(db, job_id, status=DONE, counts=counts, finished_at=datetime.now(UTC))
+        db.commit()
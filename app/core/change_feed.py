@@ -0,0 +1,199 @@
+"""
+Change feeds of users, roles and sources, for services that mirror them.
+
+Every change to one of these rows writes (entity, seq, id, deleted) to
+`change_log` in the transaction that makes it, replacing the previous entry of
+the same row; the log therefore holds the latest change of every row and
+reading it from the start is a full sync. Sequence numbers come from the
+single `change_sequence` row, which the writing transaction keeps locked until
+it commits: numbers become visible in the order they were handed out, so a
+reader never steps past a change that is still to commit with a smaller one.
+Record changes last, just before committing, so the row is locked briefly.
+
+A cursor is the (seq, id) of the last change returned and a page is one range
+scan of the primary key after it. Tombstones older than
+`CHANGE_FEED_TOMBSTONE_DAYS` are removed by `prune-change-feed`; a cursor
+from before the pruned ones could miss deletes and is refused, so the mirror
+starts over from an empty cursor.
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import binascii
+from fastapi import status
+from sqlalchemy import and_, delete, func, insert, literal, or_, update
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select
+from app.core.effective_permissions import unexpired
+from app.core.response_controller import ResponseController
+from app.models.change_log import ChangeLog
+from app.models.change_sequence import ChangeSequence
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.role_has_permissions import RoleHasPermissions
+from app.models.role_inheritance import RoleInheritance
+from app.models.role_permission_pattern import RolePermissionPattern
+from app.models.user import User
+from app.schemas.permission import PermissionRead
+from app.schemas.role import RoleRead
+from app.schemas.user import UserRead
+
+USERS = "users"
+ROLES = "roles"
+SOURCES = "sources"
+
+SEQUENCE_ROW_ID = 1
+
+CL = ChangeLog.__table__
+CS = ChangeSequence.__table__
+RHP = RoleHasPermissions.__table__
+RPP = RolePermissionPattern.__table__
+RI = RoleInheritance.__table__
+
+# (seq, entity id, deleted)
+Entry = Tuple[int, int, bool]
+
+
+def ensure_sequence_row(db: Session) -> None:
+    """Create the sequence row if missing; the caller commits."""
+    if db.get(ChangeSequence, SEQUENCE_ROW_ID) is None:
+        db.add(ChangeSequence(id=SEQUENCE_ROW_ID))
+
+def _next_seq(db: Session) -> int:
+    # Locks the row until the caller commits
+    db.exec(update(CS).where(CS.c.id == SEQUENCE_ROW_ID).values(seq=CS.c.seq + 1))
+    return db.exec(select(CS.c.seq).where(CS.c.id == SEQUENCE_ROW_ID)).one()
+
+def record(db: Session, entity: str, ids: Iterable[int], deleted: bool = False) -> None:
+    """Record changes (or deletes) of rows of `entity`; call last before committing them."""
+    ids = sorted(set(ids))
+    if not ids:
+        return
+    seq = _next_seq(db)
+    now = datetime.now(UTC)
+    db.exec(delete(CL).where(CL.c.entity == entity, CL.c.entity_id.in_(ids)))
+    db.connection().execute(insert(CL), [
+        {"entity": entity, "seq": seq, "entity_id": entity_id, "deleted": deleted, "changed_at": now}
+        for entity_id in ids
+    ])
+
+def record_select(db: Session, entity: str, ids: Select, deleted: bool = False) -> None:
+    """Like record, for the ids returned by a one-column select, without loading them."""
+    seq = _next_seq(db)
+    ids = ids.distinct().subquery()
+    id_column = list(ids.c)[0]
+    db.exec(delete(CL).where(CL.c.entity == entity, CL.c.entity_id.in_(select(id_column))))
+    db.exec(insert(CL).from_select(
+        ["entity", "seq", "entity_id", "deleted", "changed_at"],
+        select(literal(entity), literal(seq), id_column, literal(deleted), literal(datetime.now(UTC))),
+    ))
+
+
+def encode_cursor(seq: int, entity_id: int) -> str:
+    return urlsafe_b64encode(f"{seq}:{entity_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(seq, entity id) of a cursor, (0, 0) for none, or None if it is not one of ours."""
+    if not cursor:
+        return 0, 0
+    try:
+        seq, entity_id = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":")
+        return int(seq), int(entity_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+def read_changes(db: Session, entity: str, cursor: Optional[str], limit: int) -> Tuple[List[Entry], str, bool]:
+    """
+    Up to `limit` changes of `entity` after `cursor`, in order, with the
+    cursor to continue from and whether more changes are already waiting.
+    """
+    position = decode_cursor(cursor)
+    if position is None:
+        return ResponseController.send_error(
+            error="Invalid cursor",
+            error_messages={"cursor": "Not a cursor returned by this feed"},
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+    seq, after_id = position
+    pruned_seq = db.exec(select(CS.c.pruned_seq).where(CS.c.id == SEQUENCE_ROW_ID)).one()
+    if cursor and pruned_seq and seq <= pruned_seq:
+        return ResponseController.send_error(
+            error="Cursor expired",
+            error_messages={"cursor": "Deletes since this cursor were pruned; resync from an empty cursor"},
+            code=status.HTTP_410_GONE,
+        )
+
+    entries = [tuple(row) for row in db.exec(
+        select(CL.c.seq, CL.c.entity_id, CL.c.deleted)
+        .where(CL.c.entity == entity,
+               or_(CL.c.seq > seq, and_(CL.c.seq == seq, CL.c.entity_id > after_id)))
+        .order_by(CL.c.seq, CL.c.entity_id)
+        .limit(limit + 1)
+    ).all()]
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if entries:
+        seq, after_id = entries[-1][0], entries[-1][1]
+    return entries, encode_cursor(seq, after_id), has_more
+
+def feed_result(key: str, entries: List[Entry], loaded: Dict[int, Any], cursor: str, has_more: bool) -> dict:
+    """
+    The response of a feed: each change carries the row as it is now under
+    `key`, or is a delete if the row is gone (or not visible to the reader).
+    """
+    changes = []
+    for _, entity_id, deleted in entries:
+        row = None if deleted else loaded.get(entity_id)
+        changes.append({"id": entity_id, "deleted": row is None, key: row})
+    return {"changes": changes, "cursor": cursor, "has_more": has_more}
+
+def changed_ids(entries: List[Entry]) -> List[int]:
+    return [entity_id for _, entity_id, deleted in entries if not deleted]
+
+
+def load_users(db: Session, ids: List[int]) -> Dict[int, UserRead]:
+    if not ids:
+        return {}
+    users = db.exec(
+        select(User).options(selectinload(User.role), selectinload(User.roles)).where(User.id.in_(ids))
+    ).all()
+    return {user.id: UserRead.model_validate(user) for user in users}
+
+def load_roles(db: Session, ids: List[int]) -> Dict[int, RoleRead]:
+    """Roles as committed, with their direct grants, patterns and children, in four queries."""
+    if not ids:
+        return {}
+    roles = {role.id: RoleRead(id=role.id, name=role.name, created_at=role.created_at, updated_at=role.updated_at)
+             for role in db.exec(select(Role).where(Role.id.in_(ids))).all()}
+    for role_id, permission in db.exec(
+        select(RHP.c.role_id, Permission).join(Permission, Permission.id == RHP.c.permission_id)
+        .where(RHP.c.role_id.in_(ids), unexpired(RHP)).order_by(RHP.c.role_id, Permission.id)
+    ).all():
+        roles[role_id].permissions.append(PermissionRead.model_validate(permission))
+    for role_id, pattern in db.exec(
+        select(RPP.c.role_id, RPP.c.pattern).where(RPP.c.role_id.in_(ids)).order_by(RPP.c.role_id, RPP.c.pattern)
+    ).all():
+        roles[role_id].permission_patterns.append(pattern)
+    for parent_id, child_id in db.exec(
+        select(RI.c.parent_role_id, RI.c.child_role_id).where(RI.c.parent_role_id.in_(ids))
+        .order_by(RI.c.parent_role_id, RI.c.child_role_id)
+    ).all():
+        roles[parent_id].child_role_ids.append(child_id)
+    return roles
+
+
+def prune_tombstones(db: Session, days: int) -> int:
+    """
+    Remove the tombstones older than `days`, in the caller's transaction;
+    cursors from before them are refused from then on. Returns how many.
+    """
+    horizon = db.exec(
+        select(func.max(CL.c.seq)).where(CL.c.deleted.is_(True), CL.c.changed_at < datetime.now(UTC) - timedelta(days=days))
+    ).one()
+    if horizon is None:
+        return 0
+    pruned = db.exec(delete(CL).where(CL.c.deleted.is_(True), CL.c.seq <= horizon)).rowcount
+    db.exec(update(CS).where(CS.c.id == SEQUENCE_ROW_ID, CS.c.pruned_seq < horizon).values(pruned_seq=horizon))
+    return pruned
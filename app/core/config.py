@@ -8,6 +8,59 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+
+    # API keys
+    API_KEY_LAST_USED_FLUSH_SECONDS: int = 60
+
+    # Authorization snapshot shared by the workers; empty means /dev/shm (or the temp dir)
+    AUTHZ_SNAPSHOT_PATH: str = ""
+
+    # Durable copy of the snapshot used for warm restarts
+    AUTHZ_PERSIST_PATH: str = "var/authz.snapshot"
+    AUTHZ_PERSIST_INTERVAL_SECONDS: int = 300
+
+    # Health probing of Grafana and Kibana sources
+    SOURCE_HEALTH_PROBE_ENABLED: bool = True
+    SOURCE_HEALTH_INTERVAL_SECONDS: int = 60
+    SOURCE_HEALTH_CONCURRENCY: int = 100
+    SOURCE_HEALTH_CONNECTIONS_PER_HOST: int = 10
+    SOURCE_HEALTH_TIMEOUT_SECONDS: float = 5.0
+
+    # Reverse proxy to Grafana and Kibana sources; a TTL of 0 disables the GET cache
+    SOURCE_PROXY_CONNECTIONS_PER_HOST: int = 20
+    SOURCE_PROXY_TIMEOUT_SECONDS: float = 30.0
+    SOURCE_PROXY_CACHE_TTL_SECONDS: int = 0
+    SOURCE_PROXY_CACHE_MAX_BYTES: int = 1048576
+    SOURCE_PROXY_CACHE_ENTRIES: int = 1000
+
+    # Catalog of the dashboards of all Grafana sources, searched locally
+    DASHBOARD_SYNC_ENABLED: bool = True
+    DASHBOARD_SYNC_INTERVAL_SECONDS: int = 300
+    DASHBOARD_SYNC_CONCURRENCY: int = 20
+    DASHBOARD_SYNC_TIMEOUT_SECONDS: float = 30.0
+
+    # Federated search of Kibana saved objects; sources not done by the deadline are skipped
+    KIBANA_SEARCH_CONCURRENCY: int = 50
+    KIBANA_SEARCH_CONNECTIONS_PER_HOST: int = 4
+    KIBANA_SEARCH_TIMEOUT_SECONDS: float = 3.0
+    KIBANA_SEARCH_DEADLINE_SECONDS: float = 4.0
+    KIBANA_SEARCH_CACHE_TTL_SECONDS: int = 30
+    KIBANA_SEARCH_CACHE_ENTRIES: int = 10000
+
+    # Envelope encryption of source credentials: comma-separated "id:base64 32-byte key";
+    # the active key (the first one by default) seals new secrets, no keys disables encryption
+    CREDENTIAL_KEYS: str = ""
+    CREDENTIAL_ACTIVE_KEY: str = ""
+    CREDENTIAL_CACHE_TTL_SECONDS: int = 300
+    CREDENTIAL_CACHE_ENTRIES: int = 10000
+    CREDENTIAL_REENCRYPT_BATCH: int = 500
+
+    # Sources deleted per transaction by background (?async=true) data source deletes
+    CASCADE_DELETE_BATCH: int = 1000
+
+    # Deletes stay in the change feeds this long; mirrors polling less often must resync
+    CHANGE_FEED_TOMBSTONE_DAYS: int = 30
 
     # Database
     DATABASE_USER: str
@@ -0,0 +1,260 @@
+"""
+Catalog of the dashboards of all Grafana sources.
+
+A sync round lists the dashboards of every Grafana source concurrently through
+Grafana's search API, a few paged requests per source over the per-host
+connection pools of app.core.source_health, and writes only what changed:
+the listed fields of each dashboard are digested, and dashboards whose digest
+is unchanged are not rewritten. A source that cannot be reached keeps its
+dashboards until a later round succeeds.
+
+Each worker answers searches from an in-memory DashboardIndex, so searches
+never reach a Grafana instance. The index is rebuilt when the table changed
+(its row count or latest sync time) or a Grafana source did (moving to another
+data source changes who sees its dashboards), which is checked every sync
+interval. Searches apply the data source ACL to the rows they return as well,
+so a stale index never shows a dashboard to someone who may not see it.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import random
+import threading
+import httpx
+from sqlalchemy import bindparam, delete, func, insert, update
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.dashboard_index import DashboardIndex
+from app.core.data_source_acl import filter_visible, visible_ids
+from app.core.source_health import HostClients
+from app.core.source_credentials import credential_headers
+from app.db.database import engine
+from app.models.grafana_dashboard import GrafanaDashboard
+from app.models.data_source import SourceType
+from app.models.source import AuthType, Source
+from app.schemas.user import UserPermissions
+
+logger = logging.getLogger(__name__)
+
+# Largest page Grafana's search API returns
+SEARCH_PAGE = 5000
+WRITE_BATCH = 1000
+SYNCED_FIELDS = ("uid", "title", "tags", "folder_uid", "folder_title", "url")
+
+GD = GrafanaDashboard.__table__
+
+
+@dataclass
+class CatalogSource:
+    id: int
+    url: str
+    # Stored auth type, username, password and bearer token, opened when used
+    credentials: Tuple[AuthType, Optional[str], Optional[str], Optional[str]]
+
+def load_sources(db: Session) -> List[CatalogSource]:
+    return [
+        CatalogSource(source_id, url.rstrip("/"), (auth_type, username, password, token))
+        for source_id, url, auth_type, username, password, token in db.exec(select(
+            Source.id, Source.source_url, Source.auth_type,
+            Source.auth_username, Source.auth_password, Source.bearer_token,
+        ).where(Source.type == SourceType.GRAFANA)).all()
+    ]
+
+def fingerprint(row: dict) -> str:
+    data = json.dumps([row[field] for field in SYNCED_FIELDS], separators=(",", ":"))
+    return blake2b(data.encode(), digest_size=16).hexdigest()
+
+def _dashboard(item: dict) -> dict:
+    row = {
+        "uid": str(item["uid"])[:64],
+        "title": str(item.get("title") or "")[:255],
+        "tags": sorted({str(tag) for tag in item.get("tags") or ()}),
+        "folder_uid": item.get("folderUid") or None,
+        "folder_title": (item.get("folderTitle") or "")[:255] or None,
+        "url": str(item.get("url") or "")[:512],
+    }
+    row["fingerprint"] = fingerprint(row)
+    return row
+
+async def fetch_dashboards(clients: HostClients, source: CatalogSource) -> List[dict]:
+    """All dashboards of a source, by uid; raises httpx.HTTPError or ValueError."""
+    dashboards: Dict[str, dict] = {}
+    headers = credential_headers(*source.credentials)
+    page = 1
+    while True:
+        async with clients.slot(source.url) as client:
+            response = await client.get(
+                f"{source.url}/api/search",
+                params={"type": "dash-db", "limit": SEARCH_PAGE, "page": page},
+                headers=headers,
+            )
+        response.raise_for_status()
+        items = response.json()
+        for item in items:
+            if item.get("uid"):
+                row = _dashboard(item)
+                dashboards[row["uid"]] = row
+        if len(items) < SEARCH_PAGE:
+            return list(dashboards.values())
+        page += 1
+
+async def fetch_all(
+        sources: Iterable[CatalogSource],
+        concurrency: int,
+        timeout: float,
+) -> Dict[int, Optional[List[dict]]]:
+    """Dashboards by source id; None for the sources that could not be listed."""
+    semaphore = asyncio.Semaphore(concurrency)
+    clients = HostClients(2, timeout)
+
+    async def bounded(source: CatalogSource) -> Tuple[int, Optional[List[dict]]]:
+        async with semaphore:
+            try:
+                return source.id, await fetch_dashboards(clients, source)
+            except (httpx.HTTPError, ValueError, KeyError, TypeError) as exc:
+                logger.warning("Listing the dashboards of Grafana source %d failed: %s", source.id, exc)
+                return source.id, None
+
+    try:
+        return dict(await asyncio.gather(*(bounded(source) for source in sources)))
+    finally:
+        await clients.aclose()
+
+def write_changes(db: Session, fetched: Dict[int, Optional[List[dict]]], now: datetime) -> Dict[str, int]:
+    """
+    Bring the table in line with the listed dashboards in the caller's
+    transaction; returns the number of sources, failed sources and added,
+    updated and removed dashboards.
+    """
+    stored: Dict[int, Dict[str, Tuple[int, str]]] = {}
+    for source_id, uid, row_id, digest in db.exec(select(GD.c.grafana_source_id, GD.c.uid, GD.c.id, GD.c.fingerprint)).all():
+        stored.setdefault(source_id, {})[uid] = (row_id, digest)
+
+    added, updated, removed = [], [], []
+    for source_id, dashboards in fetched.items():
+        if dashboards is None:
+            continue
+        have = stored.get(source_id, {})
+        for row in dashboards:
+            current = have.pop(row["uid"], None)
+            if current is None:
+                added.append({**row, "grafana_source_id": source_id, "synced_at": now})
+            elif current[1] != row["fingerprint"]:
+                updated.append({**row, "b_id": current[0], "synced_at": now})
+        removed += [row_id for row_id, _ in have.values()]
+
+    for start in range(0, len(added), WRITE_BATCH):
+        db.connection().execute(insert(GD), added[start:start + WRITE_BATCH])
+    for start in range(0, len(updated), WRITE_BATCH):
+        db.connection().execute(update(GD).where(GD.c.id == bindparam("b_id")), updated[start:start + WRITE_BATCH])
+    for start in range(0, len(removed), WRITE_BATCH):
+        db.exec(delete(GD).where(GD.c.id.in_(removed[start:start + WRITE_BATCH])))
+    orphans = db.exec(delete(GD).where(GD.c.grafana_source_id.not_in(
+        select(Source.id).where(Source.type == SourceType.GRAFANA)))).rowcount
+    return {
+        "sources": len(fetched),
+        "failed": sum(1 for dashboards in fetched.values() if dashboards is None),
+        "added": len(added),
+        "updated": len(updated),
+        "removed": len(removed) + orphans,
+    }
+
+def catalog_signature(db: Session) -> Tuple[int, Optional[datetime], Optional[datetime]]:
+    dashboards = db.exec(select(func.count(), func.max(GD.c.synced_at)).select_from(GD)).one()
+    sources = db.exec(select(func.max(Source.updated_at)).where(Source.type == SourceType.GRAFANA)).one()
+    return (*dashboards, sources)
+
+def load_index(db: Session) -> DashboardIndex:
+    return DashboardIndex(db.exec(
+        select(GD.c.id, Source.data_source_id, GD.c.grafana_source_id, GD.c.title, GD.c.tags)
+        .join(Source, Source.id == GD.c.grafana_source_id)
+    ).all())
+
+
+class DashboardCatalog:
+    def __init__(self, sync_enabled: bool, interval: float, concurrency: int, timeout: float):
+        self.sync_enabled = sync_enabled
+        self.interval = interval
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.index = DashboardIndex([])
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Rebuild the index if the table changed; returns True if it was rebuilt."""
+        with self._lock, Session(engine) as db:
+            signature = catalog_signature(db)
+            if signature == self._signature:
+                return False
+            self.index = load_index(db)
+            self._signature = signature
+        return True
+
+    def _load_sources(self) -> List[CatalogSource]:
+        with Session(engine) as db:
+            return load_sources(db)
+
+    def _write(self, fetched: Dict[int, Optional[List[dict]]]) -> Dict[str, int]:
+        with Session(engine) as db:
+            stats = write_changes(db, fetched, datetime.now(UTC))
+            db.commit()
+        return stats
+
+    async def sync_round(self) -> Dict[str, int]:
+        sources = await run_in_threadpool(self._load_sources)
+        fetched = await fetch_all(sources, self.concurrency, self.timeout)
+        stats = await run_in_threadpool(self._write, fetched)
+        await run_in_threadpool(self.refresh)
+        return stats
+
+    async def run(self) -> None:
+        """Background loop: sync (if enabled) and refresh the index every jittered interval."""
+        await run_in_threadpool(self.refresh)
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            try:
+                if self.sync_enabled:
+                    stats = await self.sync_round()
+                    logger.info("Synced the dashboards of %(sources)d Grafana sources (%(failed)d failed): "
+                                "%(added)d added, %(updated)d updated, %(removed)d removed", stats)
+                else:
+                    await run_in_threadpool(self.refresh)
+            except Exception:
+                logger.exception("Syncing the dashboard catalog failed")
+            await asyncio.sleep(self.interval * random.uniform(0.9, 1.1))
+
+    def search(
+            self,
+            db: Session,
+            principal: UserPermissions,
+            query: str = "",
+            tags: Iterable[str] = (),
+            grafana_source_id: Optional[int] = None,
+            limit: int = 20,
+    ) -> List[GrafanaDashboard]:
+        """Dashboards of the sources visible to the principal, in title order."""
+        ids = self.index.search(query, tags, grafana_source_id, visible_ids(db, principal), limit)
+        if not ids:
+            return []
+        rows = {row.id: row for row in db.exec(filter_visible(
+            select(GrafanaDashboard)
+            .join(Source, Source.id == GrafanaDashboard.grafana_source_id)
+            .where(GrafanaDashboard.id.in_(ids)),
+            Source.data_source_id, principal,
+        )).all()}
+        return [rows[row_id] for row_id in ids if row_id in rows]
+
+
+dashboard_catalog = DashboardCatalog(
+    settings.DASHBOARD_SYNC_ENABLED,
+    settings.DASHBOARD_SYNC_INTERVAL_SECONDS,
+    settings.DASHBOARD_SYNC_CONCURRENCY,
+    settings.DASHBOARD_SYNC_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,131 @@
+"""
+In-memory search index over the Grafana dashboard catalog.
+
+Documents are numbered in title order, so every posting list (the documents
+containing a title word, or carrying a tag) is sorted by title as well. A
+search walks the shortest posting list that must match (merging the lists
+of all words starting with a prefix), checks the remaining conditions against
+the document, and stops as soon as `limit` documents matched: a query costs
+in the order of the results it returns, not of the size of the catalog.
+
+An index is immutable once built; refreshing the catalog builds a new one
+and swaps the reference.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+import heapq
+import re
+
+WORD = re.compile(r"[^\W_]+")
+
+# (grafana_dashboards id, data source id, grafana source id, title, tags)
+IndexedDashboard = Tuple[int, int, int, str, Sequence[str]]
+
+
+def words(text: str) -> List[str]:
+    return WORD.findall(text.lower())
+
+
+class DashboardIndex:
+    def __init__(self, dashboards: Iterable[IndexedDashboard]):
+        dashboards = sorted(dashboards, key=lambda d: (d[3].lower(), d[0]))
+        self.row_ids = array("q", (d[0] for d in dashboards))
+        self.data_source_ids = array("q", (d[1] for d in dashboards))
+        self.source_ids = array("q", (d[2] for d in dashboards))
+        # The title words, each preceded by a space: " word" in it is a prefix match
+        self.titles: List[str] = []
+        self.tags: List[FrozenSet[str]] = []
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        tag_postings: Dict[str, List[int]] = defaultdict(list)
+        # Few distinct tag combinations are shared by many dashboards
+        tag_sets: Dict[Tuple[str, ...], FrozenSet[str]] = {}
+        for doc, (_, _, _, title, tags) in enumerate(dashboards):
+            title_words = words(title)
+            tags = tuple(tags)
+            tag_set = tag_sets.get(tags)
+            if tag_set is None:
+                tag_set = tag_sets[tags] = frozenset(tag.lower() for tag in tags)
+            self.titles.append(" " + " ".join(title_words))
+            self.tags.append(tag_set)
+            for word in set(title_words):
+                postings[word].append(doc)
+            for tag in tag_set:
+                tag_postings[tag].append(doc)
+        self.postings = {word: array("I", docs) for word, docs in postings.items()}
+        self.tag_postings = {tag: array("I", docs) for tag, docs in tag_postings.items()}
+        self.vocabulary = sorted(self.postings)
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    def _prefix_postings(self, prefix: str) -> List[array]:
+        matches = []
+        position = bisect_left(self.vocabulary, prefix)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(prefix):
+            matches.append(self.postings[self.vocabulary[position]])
+            position += 1
+        return matches
+
+    @staticmethod
+    def _merged(lists: List[array]) -> Iterator[int]:
+        """Union of sorted posting lists, in order and without duplicates."""
+        if len(lists) == 1:
+            yield from lists[0]
+            return
+        last = -1
+        for doc in heapq.merge(*lists):
+            if doc != last:
+                yield doc
+                last = doc
+
+    def search(
+            self,
+            query: str = "",
+            tags: Iterable[str] = (),
+            grafana_source_id: Optional[int] = None,
+            data_source_ids: Optional[Set[int]] = None,
+            limit: int = 20,
+    ) -> List[int]:
+        """
+        Ids of the dashboards, in title order, whose title has a word starting
+        with every word of `query` and that carry all `tags` (case-insensitive).
+        `data_source_ids`, when given, restricts the result to those data sources.
+        """
+        prefixes = list(dict.fromkeys(words(query)))
+        needles = [" " + prefix for prefix in prefixes]
+        tags = {tag.lower() for tag in tags}
+
+        # The most selective condition drives the scan
+        candidates: List[Tuple[int, List[array]]] = []
+        for prefix in prefixes:
+            lists = self._prefix_postings(prefix)
+            candidates.append((sum(map(len, lists)), lists))
+        for tag in tags:
+            lists = [self.tag_postings[tag]] if tag in self.tag_postings else []
+            candidates.append((sum(map(len, lists)), lists))
+        if candidates:
+            size, lists = min(candidates, key=lambda c: c[0])
+            if not size:
+                return []
+            docs: Iterable[int] = self._merged(lists)
+        else:
+            docs = range(len(self))
+
+        results = []
+        for doc in docs:
+            if grafana_source_id is not None and self.source_ids[doc] != grafana_source_id:
+                continue
+            if data_source_ids is not None and self.data_source_ids[doc] not in data_source_ids:
+                continue
+            if tags and not tags <= self.tags[doc]:
+                continue
+            if needles and not all(needle in self.titles[doc] for needle in needles):
+                continue
+            results.append(self.row_ids[doc])
+            if len(results) == limit:
+                break
+        return results
@@ -0,0 +1,51 @@
+"""
+Per-data-source access control.
+
+A principal holding `bypass_data_source_acl` sees every data source. Anyone
+else sees the data sources they created and those granted to them, directly
+or through one of their roles (including the roles those inherit). The check
+is expressed as a subquery over the ACL indexes so list endpoints can filter
+and paginate in SQL.
+"""
+
+from typing import Optional, Set
+from sqlalchemy import union
+from sqlmodel import Session, select
+from app.models.data_source import DataSource
+from app.models.data_source_acl import DataSourceAcl
+from app.models.role_closure import RoleClosure
+from app.schemas.user import UserPermissions
+
+BYPASS_DATA_SOURCE_ACL = "bypass_data_source_acl"
+
+
+def sees_all(principal: UserPermissions) -> bool:
+    return BYPASS_DATA_SOURCE_ACL in principal.permissions
+
+def visible_data_source_ids(principal: UserPermissions):
+    """Subquery of the ids of the data sources the principal may see."""
+    roles = select(RoleClosure.descendant_id).where(RoleClosure.ancestor_id.in_(principal.role_ids))
+    return union(
+        select(DataSourceAcl.data_source_id).where(DataSourceAcl.user_id == principal.id),
+        select(DataSourceAcl.data_source_id).where(DataSourceAcl.role_id.in_(roles)),
+        select(DataSource.id).where(DataSource.created_by_id == principal.id),
+    )
+
+def filter_visible(statement, data_source_id_column, principal: UserPermissions):
+    """Restrict a statement to rows of data sources the principal may see."""
+    if sees_all(principal):
+        return statement
+    return statement.where(data_source_id_column.in_(visible_data_source_ids(principal)))
+
+def can_see(db: Session, principal: UserPermissions, data_source_id: int) -> bool:
+    if sees_all(principal):
+        return True
+    statement = filter_visible(
+        select(DataSource.id).where(DataSource.id == data_source_id), DataSource.id, principal)
+    return db.exec(statement).first() is not None
+
+def visible_ids(db: Session, principal: UserPermissions) -> Optional[Set[int]]:
+    """Ids of the data sources the principal may see, or None when it sees all of them."""
+    if sees_all(principal):
+        return None
+    return set(db.connection().execute(visible_data_source_ids(principal)).scalars())
@@ -0,0 +1,187 @@
+"""
+Maintenance of the materialized `user_effective_permissions` table.
+
+Every change is applied with set-based statements scoped to the users it can
+affect: a user's own rows when their roles change, and the holders of a role
+(its members and the members of every role including it) when the role's
+permissions or place in the hierarchy change. Inherited permissions come from
+one join with the role closure table; wildcard grants are expanded in the same
+statement by matching them against the permission names.
+"""
+
+from datetime import datetime, UTC
+from typing import Iterable, List, Optional
+from sqlalchemy import delete, exists, insert, or_, union, update
+from sqlmodel import Session, select
+from app.core.permission_patterns import sql_matches
+from app.models.permission import Permission
+from app.models.role_closure import RoleClosure
+from app.models.role_has_permissions import RoleHasPermissions
+from app.models.role_permission_pattern import RolePermissionPattern
+from app.models.user import User
+from app.models.user_effective_permission import UserEffectivePermission
+from app.models.user_has_roles import UserHasRoles
+
+UEP = UserEffectivePermission.__table__
+UHR = UserHasRoles.__table__
+RHP = RoleHasPermissions.__table__
+RC = RoleClosure.__table__
+RPP = RolePermissionPattern.__table__
+PERMISSIONS = Permission.__table__
+
+
+def as_utc(value: datetime) -> datetime:
+    """Datetimes come back from the database naive; they are stored in UTC."""
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+def unexpired(table, now: Optional[datetime] = None):
+    """Condition excluding grants of `table` that have expired but not been swept yet."""
+    return or_(table.c.expires_at.is_(None), table.c.expires_at > (now or datetime.now(UTC)))
+
+def user_role_ids(db: Session, user_id: int) -> List[int]:
+    return list(db.exec(
+        select(UHR.c.role_id).where(UHR.c.user_id == user_id, unexpired(UHR)).order_by(UHR.c.role_id)
+    ).all())
+
+def role_member_ids(db: Session, role_id: int) -> List[int]:
+    return list(db.exec(select(UserHasRoles.user_id).where(UserHasRoles.role_id == role_id)).all())
+
+def role_holder_ids(db: Session, role_id: int) -> List[int]:
+    """Users holding the role directly or through a role that includes it."""
+    return holder_ids_of(db, [role_id])
+
+def holder_ids_of(db: Session, role_ids: Iterable[int]) -> List[int]:
+    """Users holding any of the roles, directly or through a role that includes it."""
+    role_ids = list(role_ids)
+    if not role_ids:
+        return []
+    ancestors = select(RC.c.ancestor_id).where(RC.c.descendant_id.in_(role_ids))
+    return list(db.exec(select(UHR.c.user_id).where(UHR.c.role_id.in_(ancestors)).distinct()).all())
+
+def _granted(user_ids: Optional[List[int]] = None):
+    """(user_id, permission_id) over all roles of a user and the roles they include."""
+    explicit = (
+        select(UHR.c.user_id, RHP.c.permission_id)
+        .join(RC, RC.c.ancestor_id == UHR.c.role_id)
+        .join(RHP, RHP.c.role_id == RC.c.descendant_id)
+        .where(unexpired(UHR), unexpired(RHP))
+    )
+    wildcard = (
+        select(UHR.c.user_id, PERMISSIONS.c.id)
+        .join(RC, RC.c.ancestor_id == UHR.c.role_id)
+        .join(RPP, RPP.c.role_id == RC.c.descendant_id)
+        .join(PERMISSIONS, sql_matches(PERMISSIONS.c.name, RPP.c.pattern))
+        .where(unexpired(UHR))
+    )
+    if user_ids is not None:
+        explicit = explicit.where(UHR.c.user_id.in_(user_ids))
+        wildcard = wildcard.where(UHR.c.user_id.in_(user_ids))
+    # UNION also removes the duplicates
+    return union(explicit, wildcard)
+
+def user_permission_names(db: Session, user_id: int) -> List[str]:
+    """A user's effective permissions: one lookup on the materialized table."""
+    return list(db.exec(
+        select(Permission.name)
+        .join(UserEffectivePermission, UserEffectivePermission.permission_id == Permission.id)
+        .where(UserEffectivePermission.user_id == user_id)
+    ).all())
+
+def set_user_roles(db: Session, user_id: int, role_ids: Iterable[int]) -> None:
+    """
+    Replace a user's roles; roles the user keeps keep their expiry. The caller
+    refreshes effective permissions.
+    """
+    role_ids = set(role_ids)
+    current = set(db.exec(select(UHR.c.role_id).where(UHR.c.user_id == user_id)).all())
+    if current - role_ids:
+        db.exec(delete(UHR).where(UHR.c.user_id == user_id, UHR.c.role_id.in_(current - role_ids)))
+    rows = [{"user_id": user_id, "role_id": role_id} for role_id in sorted(role_ids - current)]
+    if rows:
+        db.exec(insert(UHR), params=rows)
+
+def grant_user_role(db: Session, user_id: int, role_id: int, expires_at: Optional[datetime]) -> bool:
+    """
+    Give a user a role, until `expires_at` if given. An earlier expiry is
+    extended, a permanent membership is left alone; returns whether anything
+    changed. The caller refreshes effective permissions.
+    """
+    row = db.exec(select(UHR.c.expires_at).where(UHR.c.user_id == user_id, UHR.c.role_id == role_id)).first()
+    if row is None:
+        db.exec(insert(UHR), params=[{"user_id": user_id, "role_id": role_id, "expires_at": expires_at}])
+        return True
+    current = row[0]
+    if current is None or (expires_at is not None and as_utc(expires_at) <= as_utc(current)):
+        return False
+    db.exec(update(UHR).where(UHR.c.user_id == user_id, UHR.c.role_id == role_id).values(expires_at=expires_at))
+    return True
+
+def remove_role_members(db: Session, role_id: int) -> List[int]:
+    """Take a role away from all its members; returns the affected user ids."""
+    members = role_member_ids(db, role_id)
+    if members:
+        db.exec(delete(UHR).where(UHR.c.role_id == role_id))
+    return members
+
+def link_primary_roles(db: Session) -> None:
+    """Make sure every user is a member of their primary role."""
+    users = User.__table__
+    missing = (
+        select(users.c.id, users.c.role_id)
+        .where(users.c.role_id.is_not(None))
+        .where(~exists().where(UHR.c.user_id == users.c.id, UHR.c.role_id == users.c.role_id))
+    )
+    db.exec(insert(UHR).from_select(["user_id", "role_id"], missing))
+
+def clear_user(db: Session, user_id: int) -> None:
+    """Remove a user's roles and effective permissions ahead of deleting the user."""
+    db.exec(delete(UEP).where(UEP.c.user_id == user_id))
+    db.exec(delete(UHR).where(UHR.c.user_id == user_id))
+
+def refresh_users(db: Session, user_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recompute the effective permissions of the given users (everyone if None)
+    with one DELETE and one INSERT ... SELECT.
+    """
+    deleted = delete(UEP)
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        deleted = deleted.where(UEP.c.user_id.in_(user_ids))
+    granted = _granted(user_ids)
+    db.exec(deleted)
+    db.exec(insert(UEP).from_select(["user_id", "permission_id"], granted))
+
+def refresh_role_members(db: Session, role_id: int) -> None:
+    """Recompute the effective permissions of every holder of a role."""
+    holders = role_holder_ids(db, role_id)
+    refresh_users(db, holders)
+
+def grant_to_role_members(db: Session, role_id: int, permission_ids: Iterable[int]) -> None:
+    """
+    Add newly granted permissions of a role to its holders' effective set.
+
+    Cheaper than a refresh because nothing can be lost by a grant; only missing
+    rows are inserted.
+    """
+    grant_to_holders_of(db, [role_id], permission_ids)
+
+def grant_to_holders_of(db: Session, role_ids: Iterable[int], permission_ids: Iterable[int]) -> None:
+    """Like grant_to_role_members, for permissions granted to several roles at once."""
+    role_ids, permission_ids = list(role_ids), list(permission_ids)
+    if not role_ids or not permission_ids:
+        return
+    missing = (
+        select(UHR.c.user_id, RHP.c.permission_id)
+        .join(RC, RC.c.ancestor_id == UHR.c.role_id)
+        .join(RHP, RHP.c.role_id == RC.c.descendant_id)
+        .where(RC.c.descendant_id.in_(role_ids), RHP.c.permission_id.in_(permission_ids))
+        .where(unexpired(UHR), unexpired(RHP))
+        .distinct()
+        .where(~exists().where(
+            UEP.c.user_id == UHR.c.user_id,
+            UEP.c.permission_id == RHP.c.permission_id,
+        ))
+    )
+    db.exec(insert(UEP).from_select(["user_id", "permission_id"], missing))
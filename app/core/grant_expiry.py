@@ -0,0 +1,141 @@
+"""
+Expiry of temporary grants (role permissions and role memberships with an
+`expires_at`).
+
+Each worker keeps the upcoming deadlines in a min-heap and sleeps until the
+earliest one, instead of polling the tables on a timer. At a deadline every
+grant that is due is revoked with one indexed DELETE per table, the affected
+users' effective permissions are recomputed and the authorization snapshot and
+RBAC graph are republished. Revoking is idempotent, so several workers
+sweeping the same deadline is harmless.
+"""
+
+from datetime import datetime, timedelta, UTC
+from typing import List, Optional, Tuple
+import asyncio
+import heapq
+import logging
+import threading
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from app.core import change_feed
+from app.core.authz_snapshot import snapshot_store
+from app.core.authz_versions import bump_roles_version, bump_users_version
+from app.core.effective_permissions import as_utc, holder_ids_of, refresh_users
+from app.core.rbac_graph import rbac_graph_store
+from app.core.role_hierarchy import ancestor_ids_of
+from app.db.database import engine
+from app.models.role_has_permissions import RoleHasPermissions
+from app.models.user_has_roles import UserHasRoles
+
+logger = logging.getLogger(__name__)
+
+# A failed sweep is retried after this delay
+RETRY_DELAY = timedelta(seconds=30)
+
+RHP = RoleHasPermissions.__table__
+UHR = UserHasRoles.__table__
+
+
+def revoke_expired(db: Session, now: datetime) -> Tuple[List[int], List[int]]:
+    """
+    Delete the grants due at `now` in the caller's transaction and refresh the
+    affected users; returns the roles whose permissions changed and the users
+    whose roles changed.
+    """
+    roles = list(db.exec(select(RHP.c.role_id).where(RHP.c.expires_at <= now).distinct()).all())
+    members = list(db.exec(select(UHR.c.user_id).where(UHR.c.expires_at <= now).distinct()).all())
+    if not roles and not members:
+        return [], []
+
+    users = set(members) | set(holder_ids_of(db, roles))
+    db.exec(delete(RHP).where(RHP.c.expires_at <= now))
+    db.exec(delete(UHR).where(UHR.c.expires_at <= now))
+    refresh_users(db, users)
+    if roles:
+        bump_roles_version(db)
+    if members:
+        bump_users_version(db)
+    change_feed.record(db, change_feed.ROLES, roles)
+    change_feed.record(db, change_feed.USERS, members)
+    return roles, members
+
+def pending_deadlines(db: Session) -> List[datetime]:
+    deadlines = set()
+    for table in (RHP, UHR):
+        deadlines.update(db.exec(select(table.c.expires_at).where(table.c.expires_at.is_not(None)).distinct()).all())
+    return [as_utc(deadline) for deadline in deadlines]
+
+
+class GrantExpirySweeper:
+    """Min-heap of upcoming deadlines and the task that sweeps them."""
+
+    def __init__(self):
+        self._deadlines: List[datetime] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def load(self, db: Session) -> None:
+        """Schedule the deadlines of all temporary grants, e.g. at startup."""
+        deadlines = pending_deadlines(db)
+        heapq.heapify(deadlines)
+        with self._lock:
+            self._deadlines = deadlines
+        self._wake()
+
+    def schedule(self, expires_at: datetime) -> None:
+        """Register the deadline of a new temporary grant; safe from any thread."""
+        expires_at = as_utc(expires_at)
+        with self._lock:
+            heapq.heappush(self._deadlines, expires_at)
+            earliest = self._deadlines[0] == expires_at
+        # Only a new earliest deadline shortens the current sleep
+        if earliest:
+            self._wake()
+
+    def _wake(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def sweep(self, now: datetime) -> None:
+        with Session(engine) as db:
+            roles, members = revoke_expired(db, now)
+            if not roles and not members:
+                return
+            db.commit()
+            if members:
+                snapshot_store.publish_full(db)
+            if roles:
+                # Republishes the role section of the snapshot as well
+                rbac_graph_store.role_changed(db, roles[0], ancestor_ids_of(db, roles))
+        logger.info("Revoked expired grants of %d role(s) and %d user(s)", len(roles), len(members))
+
+    async def run(self) -> None:
+        """Sleep until the earliest deadline (or a new earlier one), then sweep."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            with self._lock:
+                earliest = self._deadlines[0] if self._deadlines else None
+            now = datetime.now(UTC)
+            if earliest is None or earliest > now:
+                timeout = None if earliest is None else (earliest - now).total_seconds()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            with self._lock:
+                while self._deadlines and self._deadlines[0] <= now:
+                    heapq.heappop(self._deadlines)
+            try:
+                await asyncio.to_thread(self.sweep, now)
+            except Exception:
+                logger.exception("Sweeping expired grants failed")
+                self.schedule(now + RETRY_DELAY)
+
+
+grant_expiry_sweeper = GrantExpirySweeper()
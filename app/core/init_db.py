@@ -5,15 +5,31 @@ from app.models.role import Role
 from app.models.permission import Permission
 from app.models.user import User
 from app.models.data_source import DataSource
-from app.models.kibana_source import KibanaSource
-from app.models.grafana_source import GrafanaSource
+from app.models.data_source_acl import DataSourceAcl
+from app.models.source import Source
+from app.models.refresh_token import RefreshToken
+from app.models.api_key import ApiKey
 from app.models.role_has_permissions import RoleHasPermissions
+from app.models.user_has_roles import UserHasRoles
+from app.models.user_effective_permission import UserEffectivePermission
+from app.models.role_inheritance import RoleInheritance
+from app.models.role_closure import RoleClosure
+from app.models.role_permission_pattern import RolePermissionPattern
 from app.core.hashing import hash_password
+from app.core.authz_snapshot import snapshot_store
+from app.core.effective_permissions import link_primary_roles, refresh_users
+from app.core.role_hierarchy import rebuild_closure
+from app.core.authz_versions import bump_roles_version, bump_users_version, ensure_version_row
+from app.models.authz_version import AuthzVersion
+from app.core.summary_counters import reconcile
+from app.core import change_feed
 
 app = typer.Typer()
 
 def seed_db():
     with Session(engine) as session:
+        ensure_version_row(session)
+        change_feed.ensure_sequence_row(session)
 
         # Seed permissions
         permissions = [
@@ -32,14 +48,28 @@ def seed_db():
             {"name": "read_data_source"},
             {"name": "update_data_source"},
             {"name": "delete_data_source"},
+            {"name": "bypass_data_source_acl"},
+            {"name": "manage_data_source_acl"},
             {"name": "create_kibana_source"},
             {"name": "read_kibana_source"},
             {"name": "update_kibana_source"},
             {"name": "delete_kibana_source"},
+            {"name": "proxy_kibana_source"},
             {"name": "create_grafana_source"},
             {"name": "read_grafana_source"},
             {"name": "update_grafana_source"},
             {"name": "delete_grafana_source"},
+            {"name": "proxy_grafana_source"},
+            {"name": "create_api_key"},
+            {"name": "read_api_key"},
+            {"name": "delete_api_key"},
+            {"name": "manage_api_keys"},
+            {"name": "manage_role_hierarchy"},
+            {"name": "check_authorization"},
+            {"name": "read_access_review"},
+            {"name": "export_rbac_config"},
+            {"name": "apply_rbac_config"},
+            {"name": "read_summary"},
         ]
 
         for perm_data in permissions:
@@ -65,11 +95,13 @@ def seed_db():
         roles = [
             {
                 "name": "admin",
-                "permissions": [perm[p["name"]] for p in permissions],
+                "permissions": [],
+                "patterns": ["*"],
             },
             {
                 "name": "editor",
                 "permissions": [],
+                "patterns": [],
             },
         ]
 
@@ -89,6 +121,18 @@ def seed_db():
 
         session.commit()
 
+        # Wildcard grants are a single row each
+        for role_data in roles:
+            role = session.exec(select(Role).where(Role.name == role_data["name"])).first()
+            for pattern in role_data["patterns"]:
+                if not session.get(RolePermissionPattern, (role.id, pattern)):
+                    session.add(RolePermissionPattern(role_id=role.id, pattern=pattern))
+
+        session.commit()
+
+        # Seeded roles need their closure rows
+        rebuild_closure(session)
+
         # Fetch admin role for user assignment
         admin_role = session.exec(select(Role).where(Role.name == "admin")).first()
 
@@ -104,9 +148,25 @@ def seed_db():
                 role=admin_role,
             )
             session.add(admin_user)
+        session.flush()
 
+        # Every user holds their primary role; recompute effective permissions
+        link_primary_roles(session)
+        refresh_users(session)
+
+        # Seeding may have changed roles and users behind the API's back
+        bump_roles_version(session)
+        bump_users_version(session)
+        # Seeded rows bypass the summary counters
+        reconcile(session)
+        # Mirrors resync what seeding may have changed
+        change_feed.record_select(session, change_feed.ROLES, select(Role.id))
+        change_feed.record_select(session, change_feed.USERS, select(User.id))
         session.commit()
 
+        # Publish the authorization snapshot used by the API workers
+        snapshot_store.publish_full(session)
+
 @app.command()
 def seed():
     """
@@ -0,0 +1,231 @@
+"""
+Federated search of saved objects (index patterns, saved searches,
+dashboards, visualizations) across Kibana sources.
+
+A search fans out to the sources the caller may see through Kibana's saved
+objects API, with at most `KIBANA_SEARCH_CONCURRENCY` requests in flight, a
+few per host over keep-alive pools that outlive the request, and a timeout
+per request. Results are yielded per source as they arrive; sources still
+pending at the deadline are reported as timed out instead of holding up the
+response. The results of each source are cached by query for a short TTL,
+so repeated searches, by any caller, only reach the sources not cached yet.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+import asyncio
+import time
+import httpx
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.core.dashboard_index import words
+from app.core.data_source_acl import filter_visible
+from app.core.source_health import HostClients
+from app.core.source_credentials import credential_headers
+from app.models.data_source import SourceType
+from app.models.source import AuthType, Source
+from app.schemas.user import UserPermissions
+
+OK = "ok"
+ERROR = "error"
+TIMEOUT = "timeout"
+DEFAULT_TYPES = ("index-pattern", "search", "dashboard", "visualization")
+
+CacheKey = Tuple[int, str, Tuple[str, ...], int]
+
+
+@dataclass
+class KibanaTarget:
+    id: int
+    url: str
+    # Stored auth type, username, password and bearer token, opened when used
+    credentials: Tuple[AuthType, Optional[str], Optional[str], Optional[str]]
+
+def load_targets(db: Session, principal: UserPermissions) -> List[KibanaTarget]:
+    """The Kibana sources of the data sources the principal may see."""
+    statement = filter_visible(select(
+        Source.id, Source.source_url, Source.auth_type,
+        Source.auth_username, Source.auth_password, Source.bearer_token,
+    ).where(Source.type == SourceType.KIBANA), Source.data_source_id, principal)
+    return [
+        KibanaTarget(source_id, url.rstrip("/"), (auth_type, username, password, token))
+        for source_id, url, auth_type, username, password, token in db.exec(statement.order_by(Source.id)).all()
+    ]
+
+def rank_key(saved_object: dict, query: str) -> tuple:
+    """
+    Sort key across sources, whose scores are not comparable: exact title
+    matches first, then titles containing every query word as a whole word,
+    then titles starting with the query; Kibana's score breaks ties.
+    """
+    title = (saved_object["title"] or "").lower()
+    query = query.lower().strip()
+    whole_words = set(words(query)) <= set(words(title))
+    return (title != query, not whole_words, not title.startswith(query), -(saved_object["score"] or 0),
+            title, saved_object["kibana_source_id"], saved_object["id"])
+
+def merge_results(results: Iterable[dict], query: str, limit: int) -> List[dict]:
+    saved_objects = [obj for result in results for obj in result["saved_objects"]]
+    return sorted(saved_objects, key=lambda obj: rank_key(obj, query))[:limit]
+
+
+class ResultCache:
+    """LRU of per-source results, each kept for `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[float, List[dict]]]" = OrderedDict()
+
+    def get(self, key: CacheKey) -> Optional[List[dict]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: CacheKey, saved_objects: List[dict]) -> None:
+        if not self.ttl:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, saved_objects)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class KibanaSearch:
+    def __init__(
+            self,
+            concurrency: int,
+            connections_per_host: int,
+            timeout: float,
+            deadline: float,
+            cache: ResultCache,
+    ):
+        self.concurrency = concurrency
+        self.connections_per_host = connections_per_host
+        self.timeout = timeout
+        self.deadline = deadline
+        self.cache = cache
+        self._clients: Optional[HostClients] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, None
+        if clients is not None:
+            await clients.aclose()
+
+    @staticmethod
+    def _result(target: KibanaTarget, status: str, saved_objects: List[dict], started: float,
+                error: Optional[str] = None, cached: bool = False) -> dict:
+        return {
+            "kibana_source_id": target.id,
+            "status": status,
+            "error": error,
+            "cached": cached,
+            "took_ms": round((time.perf_counter() - started) * 1000),
+            "saved_objects": saved_objects,
+        }
+
+    async def _search_source(self, target: KibanaTarget, query: str, types: Tuple[str, ...], per_page: int) -> dict:
+        """Search one source; never raises."""
+        if self._clients is None:
+            self._clients = HostClients(self.connections_per_host, self.timeout)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        params = [
+            ("search", " ".join(f"{word}*" for word in words(query))),
+            ("search_fields", "title"),
+            ("default_search_operator", "AND"),
+            ("per_page", per_page),
+        ] + [("type", t) for t in types]
+        try:
+            async with self._clients.slot(target.url) as client, self._semaphore:
+                response = await client.get(f"{target.url}/api/saved_objects/_find", params=params,
+                                            headers=credential_headers(*target.credentials))
+            response.raise_for_status()
+            saved_objects = [
+                {
+                    "kibana_source_id": target.id,
+                    "id": obj["id"],
+                    "type": obj["type"],
+                    "title": (obj.get("attributes") or {}).get("title"),
+                    "updated_at": obj.get("updated_at"),
+                    "score": obj.get("score"),
+                }
+                for obj in response.json()["saved_objects"]
+            ]
+        except httpx.TimeoutException:
+            return self._result(target, TIMEOUT, [], started, "The source did not answer in time")
+        except httpx.HTTPStatusError as exc:
+            return self._result(target, ERROR, [], started, f"HTTP {exc.response.status_code}")
+        except (httpx.HTTPError, ValueError, KeyError, TypeError) as exc:
+            return self._result(target, ERROR, [], started, f"{type(exc).__name__}: {exc}"[:255])
+        self.cache.put((target.id, query, types, per_page), saved_objects)
+        return self._result(target, OK, saved_objects, started)
+
+    async def iter_results(
+            self,
+            targets: List[KibanaTarget],
+            query: str,
+            types: Iterable[str] = DEFAULT_TYPES,
+            per_page: int = 20,
+    ) -> AsyncIterator[dict]:
+        """
+        One result per source: cached ones first, then the others as they
+        arrive, and finally those still pending at the deadline as timed out.
+        """
+        query, types = " ".join(words(query)), tuple(sorted(set(types)))
+        started = time.perf_counter()
+        misses = []
+        for target in targets:
+            saved_objects = self.cache.get((target.id, query, types, per_page))
+            if saved_objects is None:
+                misses.append(target)
+            else:
+                yield self._result(target, OK, saved_objects, started, cached=True)
+
+        tasks = {asyncio.create_task(self._search_source(t, query, types, per_page)): t for t in misses}
+        deadline = asyncio.get_running_loop().time() + self.deadline
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            for task in sorted(pending, key=lambda t: tasks[t].id):
+                yield self._result(tasks[task], TIMEOUT, [], started, "The source did not answer before the deadline")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def search(
+            self,
+            targets: List[KibanaTarget],
+            query: str,
+            types: Iterable[str] = DEFAULT_TYPES,
+            limit: int = 20,
+    ) -> dict:
+        """The best `limit` saved objects across sources and the status of every source."""
+        results = [result async for result in self.iter_results(targets, query, types, limit)]
+        return {
+            "saved_objects": merge_results(results, query, limit),
+            "sources": [{k: v for k, v in result.items() if k != "saved_objects"}
+                        for result in sorted(results, key=lambda r: r["kibana_source_id"])],
+        }
+
+
+kibana_search = KibanaSearch(
+    settings.KIBANA_SEARCH_CONCURRENCY,
+    settings.KIBANA_SEARCH_CONNECTIONS_PER_HOST,
+    settings.KIBANA_SEARCH_TIMEOUT_SECONDS,
+    settings.KIBANA_SEARCH_DEADLINE_SECONDS,
+    ResultCache(settings.KIBANA_SEARCH_CACHE_TTL_SECONDS, settings.KIBANA_SEARCH_CACHE_ENTRIES),
+)
@@ -0,0 +1,25 @@
+"""
+Keyset pagination on an integer primary key.
+
+Pages are ordered by id and continue after the last id of the previous page,
+so every page is an index range scan however deep the client pages, unlike
+OFFSET which reads and discards all earlier rows.
+"""
+
+from typing import Optional, Sequence
+from app.schemas.pagination import Pagination
+
+
+def paginate(statement, id_column, page: Pagination):
+    if page.after_id is not None:
+        statement = statement.where(id_column > page.after_id)
+    # One extra row tells whether there is a next page
+    return statement.order_by(id_column).limit(page.limit + 1)
+
+def split_page(rows: Sequence, page: Pagination) -> tuple[list, Optional[int]]:
+    """The rows of the page and the cursor of the next page (None on the last page)."""
+    rows = list(rows)
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    return rows, rows[-1].id
@@ -0,0 +1,70 @@
+"""
+Wildcard permission grants.
+
+Permission names follow a verb_resource convention (`read_user`,
+`update_grafana_source`), so a role can be granted `read_*`, `*_grafana_source`
+or `*` instead of linking each permission. Patterns are compiled into a
+matcher when roles are (re)loaded and expanded into the same permission-id
+sets and bitmasks as explicit grants, so a permission check never evaluates a
+pattern.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Pattern, Set
+import re
+from sqlalchemy import func
+
+WILDCARD = "*"
+_PATTERN = re.compile(r"[a-z0-9_*]+")
+# LIKE escape character; '!' never occurs in a permission name
+_LIKE_ESCAPE = "!"
+
+
+def is_pattern(name: str) -> bool:
+    return WILDCARD in name
+
+def validate_pattern(pattern: str) -> Optional[str]:
+    """Returns an error message, or None if the pattern is valid."""
+    if not _PATTERN.fullmatch(pattern):
+        return "Patterns may only contain lowercase letters, digits, '_' and '*'"
+    if not is_pattern(pattern):
+        return "A pattern must contain at least one '*'"
+    return None
+
+
+@dataclass(frozen=True)
+class PermissionMatcher:
+    """The patterns of a role compiled into a single regular expression."""
+    regex: Optional[Pattern[str]]
+
+    def matches(self, name: str) -> bool:
+        return self.regex is not None and self.regex.fullmatch(name) is not None
+
+    def expand(self, permission_ids_by_name: Mapping[str, int]) -> Set[int]:
+        """Ids of all known permissions matched by the patterns."""
+        if self.regex is None:
+            return set()
+        return {pid for name, pid in permission_ids_by_name.items() if self.regex.fullmatch(name)}
+
+
+def pattern_errors(patterns: Iterable[str]) -> Dict[str, List[str]]:
+    """Validation errors keyed by pattern, in the shape of `error_messages`."""
+    errors = {}
+    for pattern in patterns:
+        error = validate_pattern(pattern)
+        if error:
+            errors[pattern] = [error]
+    return errors
+
+
+def compile_patterns(patterns: Iterable[str]) -> PermissionMatcher:
+    alternatives = sorted({".*".join(re.escape(part) for part in p.split(WILDCARD)) for p in patterns})
+    if not alternatives:
+        return PermissionMatcher(None)
+    return PermissionMatcher(re.compile("|".join(f"(?:{a})" for a in alternatives)))
+
+def sql_matches(name_column, pattern_column):
+    """SQL condition for a permission name matching a stored pattern."""
+    like = func.replace(
+        func.replace(pattern_column, "_", _LIKE_ESCAPE + "_"), WILDCARD, "%")
+    return name_column.like(like, escape=_LIKE_ESCAPE)
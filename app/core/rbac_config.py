@@ -0,0 +1,223 @@
+"""
+Declarative RBAC configuration: export the permissions, roles and grants to a
+canonical JSON/YAML document and apply such a document back.
+
+Applying loads the current state with the RBAC graph queries, computes the
+difference by name in memory, and executes it with one executemany statement
+per kind of change inside the caller's transaction, however many roles are
+involved. Roles and permissions missing from the document are only deleted
+with `prune`; the grants of every role in the document are replaced exactly.
+"""
+
+from datetime import datetime, UTC
+from typing import Dict, Iterable, List, Set, Tuple
+import json
+import yaml
+from sqlalchemy import bindparam, delete, insert, or_, update
+from sqlmodel import Session, select
+from app.core import change_feed, summary_counters
+from app.core.authz_versions import bump_roles_version, bump_users_version
+from app.core.effective_permissions import holder_ids_of, refresh_users
+from app.core.permission_patterns import pattern_errors
+from app.core.rbac_graph import load_graph
+from app.core.role_hierarchy import rebuild_closure
+from app.models.data_source_acl import DataSourceAcl
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.role_closure import RoleClosure
+from app.models.role_has_permissions import RoleHasPermissions
+from app.models.role_inheritance import RoleInheritance
+from app.models.role_permission_pattern import RolePermissionPattern
+from app.models.user import User
+from app.models.user_effective_permission import UserEffectivePermission
+from app.models.user_has_roles import UserHasRoles
+from app.schemas.rbac_config import RbacConfig, RbacPlan, RoleConfig
+
+FORMATS = ("json", "yaml")
+
+PERMISSIONS = Permission.__table__
+ROLES = Role.__table__
+RHP = RoleHasPermissions.__table__
+RPP = RolePermissionPattern.__table__
+RI = RoleInheritance.__table__
+RC = RoleClosure.__table__
+UHR = UserHasRoles.__table__
+UEP = UserEffectivePermission.__table__
+ACL = DataSourceAcl.__table__
+USERS = User.__table__
+
+
+def export_config(db: Session) -> RbacConfig:
+    """The current state, with every list sorted so equal states export identically."""
+    graph = load_graph(db)
+    role_names = {role.id: role.name for role in graph.roles.values()}
+    return RbacConfig(
+        permissions=sorted(p.name for p in graph.permissions.values()),
+        roles={
+            role.name: RoleConfig(
+                permissions=sorted(graph.permissions[p].name for p in role.permission_ids),
+                patterns=sorted(role.permission_patterns),
+                children=sorted(role_names[c] for c in role.child_ids),
+            )
+            for role in sorted(graph.roles.values(), key=lambda r: r.name)
+        },
+    )
+
+def dump_config(config: RbacConfig, fmt: str = "json") -> str:
+    data = config.model_dump()
+    if fmt == "yaml":
+        return yaml.safe_dump(data, sort_keys=True, default_flow_style=False)
+    return json.dumps(data, indent=2, sort_keys=True) + "\n"
+
+def load_config(text: str) -> RbacConfig:
+    """Parse a JSON or YAML document (JSON documents are valid YAML)."""
+    return RbacConfig.model_validate(yaml.safe_load(text) or {})
+
+
+def _diff(role: str, have: Iterable[str], want: Iterable[str]) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    have, want = set(have), set(want)
+    return [(role, name) for name in sorted(want - have)], [(role, name) for name in sorted(have - want)]
+
+def plan_changes(current: RbacConfig, desired: RbacConfig, prune: bool = False) -> RbacPlan:
+    """The minimal set of changes turning `current` into `desired`."""
+    plan = RbacPlan()
+    plan.permissions_created = sorted(set(desired.permissions) - set(current.permissions))
+    plan.roles_created = sorted(set(desired.roles) - set(current.roles))
+    if prune:
+        plan.permissions_deleted = sorted(set(current.permissions) - set(desired.permissions))
+        plan.roles_deleted = sorted(set(current.roles) - set(desired.roles))
+
+    for name, role in sorted(desired.roles.items()):
+        have = current.roles.get(name, RoleConfig())
+        added, removed = _diff(name, have.permissions, role.permissions)
+        plan.grants_added += added
+        plan.grants_removed += removed
+        added, removed = _diff(name, have.patterns, role.patterns)
+        plan.patterns_added += added
+        plan.patterns_removed += removed
+        added, removed = _diff(name, have.children, role.children)
+        plan.children_added += added
+        plan.children_removed += removed
+    return plan
+
+def config_errors(current: RbacConfig, desired: RbacConfig, prune: bool = False) -> Dict[str, List[str]]:
+    """Validation errors keyed by role, in the shape of `error_messages`."""
+    permissions = set(desired.permissions) | (set() if prune else set(current.permissions))
+    # The hierarchy once applied: roles left out of the document keep their children
+    children: Dict[str, Set[str]] = {} if prune else {n: set(r.children) for n, r in current.roles.items()}
+    children.update((n, set(r.children)) for n, r in desired.roles.items())
+
+    errors: Dict[str, List[str]] = {}
+    for name, role in sorted(desired.roles.items()):
+        messages = [f"Unknown permission: {p}" for p in sorted(set(role.permissions) - permissions)]
+        messages += [f"Invalid pattern {p}: {m[0]}" for p, m in sorted(pattern_errors(role.patterns).items())]
+        messages += [f"Unknown child role: {c}" for c in sorted(set(role.children) - set(children))]
+        if messages:
+            errors[f"roles.{name}"] = messages
+
+    # Kahn's algorithm: whatever cannot be ordered children first sits on a cycle
+    pending = {name: len(kids & children.keys()) for name, kids in children.items()}
+    parents: Dict[str, List[str]] = {}
+    for name, kids in children.items():
+        for kid in kids & children.keys():
+            parents.setdefault(kid, []).append(name)
+    ready = [name for name, count in pending.items() if not count]
+    while ready:
+        for parent in parents.get(ready.pop(), ()):
+            pending[parent] -= 1
+            if not pending[parent]:
+                ready.append(parent)
+    cyclic = sorted(name for name, count in pending.items() if count)
+    if cyclic:
+        errors["roles"] = [f"Role hierarchy cannot contain cycles: {', '.join(cyclic)}"]
+    return errors
+
+
+def _insert_pairs(db: Session, table, left: str, right: str, pairs: List[Tuple[int, int]]) -> None:
+    if pairs:
+        db.connection().execute(insert(table), [{left: a, right: b} for a, b in pairs])
+
+def _delete_pairs(db: Session, table, left: str, right: str, pairs: List[Tuple[int, int]]) -> None:
+    if pairs:
+        db.connection().execute(
+            delete(table).where(table.c[left] == bindparam("b_left"), table.c[right] == bindparam("b_right")),
+            [{"b_left": a, "b_right": b} for a, b in pairs],
+        )
+
+def apply_plan(db: Session, plan: RbacPlan) -> bool:
+    """
+    Execute a plan in the caller's transaction and bump the authorization
+    versions; returns True if role memberships changed (pruned roles).
+    """
+    now = datetime.now(UTC)
+    if plan.permissions_created:
+        db.connection().execute(insert(PERMISSIONS), [
+            {"name": name, "created_at": now, "updated_at": now} for name in plan.permissions_created
+        ])
+    if plan.roles_created:
+        db.connection().execute(insert(ROLES), [
+            {"name": name, "created_at": now, "updated_at": now} for name in plan.roles_created
+        ])
+    permission_ids = dict(db.exec(select(PERMISSIONS.c.name, PERMISSIONS.c.id)).all())
+    role_ids = dict(db.exec(select(ROLES.c.name, ROLES.c.id)).all())
+    summary_counters.open_buckets(db, summary_counters.USERS_PER_ROLE, (role_ids[name] for name in plan.roles_created))
+
+    def role_pairs(pairs, right_ids=None):
+        return [(role_ids[a], right_ids[b] if right_ids is not None else b) for a, b in pairs]
+
+    deleted_roles = [role_ids[name] for name in plan.roles_deleted]
+    changed_roles = {role_ids[name] for name, _ in (
+        plan.grants_added + plan.grants_removed + plan.patterns_added + plan.patterns_removed
+        + plan.children_added + plan.children_removed
+    )}
+    # Holders before the change may lose permissions, holders after may gain some
+    holders = set(holder_ids_of(db, changed_roles | set(deleted_roles)))
+
+    _delete_pairs(db, RHP, "role_id", "permission_id", role_pairs(plan.grants_removed, permission_ids))
+    _delete_pairs(db, RPP, "role_id", "pattern", role_pairs(plan.patterns_removed))
+    _delete_pairs(db, RI, "parent_role_id", "child_role_id", role_pairs(plan.children_removed, role_ids))
+    # Grants past expires_at but not swept yet are not in the current state, so
+    # a document keeping them adds them again: their rows go before the insert
+    _delete_pairs(db, RHP, "role_id", "permission_id", role_pairs(plan.grants_added, permission_ids))
+    _insert_pairs(db, RHP, "role_id", "permission_id", role_pairs(plan.grants_added, permission_ids))
+    _insert_pairs(db, RPP, "role_id", "pattern", role_pairs(plan.patterns_added))
+    _insert_pairs(db, RI, "parent_role_id", "child_role_id", role_pairs(plan.children_added, role_ids))
+
+    # Roles read differently by the change feed: parents of deleted roles lose a child
+    feed_roles = changed_roles | {role_ids[name] for name in plan.roles_created}
+    members = []
+    if deleted_roles:
+        feed_roles |= set(db.exec(select(RI.c.parent_role_id).where(RI.c.child_role_id.in_(deleted_roles))).all())
+        members = list(db.exec(select(UHR.c.user_id).where(UHR.c.role_id.in_(deleted_roles)).distinct()).all())
+        holders |= set(members)
+        db.exec(delete(UHR).where(UHR.c.role_id.in_(deleted_roles)))
+        db.exec(delete(RHP).where(RHP.c.role_id.in_(deleted_roles)))
+        db.exec(delete(RPP).where(RPP.c.role_id.in_(deleted_roles)))
+        db.exec(delete(ACL).where(ACL.c.role_id.in_(deleted_roles)))
+        db.exec(delete(RI).where(or_(RI.c.parent_role_id.in_(deleted_roles), RI.c.child_role_id.in_(deleted_roles))))
+        db.exec(delete(RC).where(or_(RC.c.ancestor_id.in_(deleted_roles), RC.c.descendant_id.in_(deleted_roles))))
+        db.exec(update(USERS).where(USERS.c.role_id.in_(deleted_roles)).values(role_id=None))
+        db.exec(delete(ROLES).where(ROLES.c.id.in_(deleted_roles)))
+        summary_counters.drop_buckets(db, summary_counters.USERS_PER_ROLE, deleted_roles)
+    if plan.permissions_deleted:
+        deleted_permissions = [permission_ids[name] for name in plan.permissions_deleted]
+        feed_roles |= set(db.exec(select(RHP.c.role_id).where(RHP.c.permission_id.in_(deleted_permissions))).all())
+        db.exec(delete(RHP).where(RHP.c.permission_id.in_(deleted_permissions)))
+        db.exec(delete(UEP).where(UEP.c.permission_id.in_(deleted_permissions)))
+        db.exec(delete(PERMISSIONS).where(PERMISSIONS.c.id.in_(deleted_permissions)))
+
+    if plan.children_added or plan.children_removed or plan.roles_created or deleted_roles:
+        rebuild_closure(db)
+    holders |= set(holder_ids_of(db, changed_roles - set(deleted_roles)))
+    if plan.permissions_created:
+        # New permissions may match the wildcard grants of untouched roles
+        holders |= set(holder_ids_of(db, db.exec(select(RPP.c.role_id).distinct()).all()))
+    refresh_users(db, holders)
+
+    bump_roles_version(db)
+    if members:
+        bump_users_version(db)
+    change_feed.record(db, change_feed.ROLES, feed_roles - set(deleted_roles))
+    change_feed.record(db, change_feed.ROLES, deleted_roles, deleted=True)
+    change_feed.record(db, change_feed.USERS, members)
+    return bool(members)
@@ -0,0 +1,340 @@
+"""
+In-process, immutable model of roles and permissions.
+
+Each worker holds one `RbacGraph`. A graph is never mutated: a change builds a
+new graph that shares every untouched node with the old one, and the store
+swaps its single reference to it. Readers just take that reference, so they
+never lock and never see a half-applied change.
+
+The user -> roles index is the shared authorization snapshot, which is already
+memory-mapped by every worker, so the graph itself only holds the (small) role
+and permission data. The database remains the source of truth; the graph is
+reloaded whenever the snapshot's role generation shows that another process
+changed roles.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set
+import threading
+from sqlmodel import Session, select
+from app.core.authz_snapshot import snapshot_store
+from app.core.effective_permissions import unexpired
+from app.core.permission_patterns import compile_patterns
+from app.core.role_hierarchy import ancestor_ids
+from app.db.database import engine
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.role_closure import RoleClosure
+from app.models.role_has_permissions import RoleHasPermissions
+from app.models.role_inheritance import RoleInheritance
+from app.models.role_permission_pattern import RolePermissionPattern
+from app.models.user import User
+from app.models.user_effective_permission import UserEffectivePermission
+from app.models.user_has_roles import UserHasRoles
+
+
+@dataclass(frozen=True)
+class PermissionNode:
+    id: int
+    name: str
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True)
+class RoleNode:
+    id: int
+    name: str
+    created_at: datetime
+    updated_at: datetime
+    permission_ids: FrozenSet[int] = frozenset()
+    # Roles this role includes directly
+    child_ids: FrozenSet[int] = frozenset()
+    # Own permissions plus those inherited through the hierarchy, with
+    # wildcard grants expanded
+    effective_permission_ids: FrozenSet[int] = frozenset()
+    # Wildcard grants made to this role directly, e.g. `read_*`
+    permission_patterns: FrozenSet[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class RbacGraph:
+    permissions: Mapping[int, PermissionNode]
+    roles: Mapping[int, RoleNode]
+    role_generation: int = 0
+    permission_ids_by_name: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+
+    @classmethod
+    def build(
+            cls,
+            permissions: Dict[int, PermissionNode],
+            roles: Dict[int, RoleNode],
+            role_generation: int,
+    ) -> "RbacGraph":
+        return cls(
+            permissions=MappingProxyType(permissions),
+            roles=MappingProxyType(roles),
+            role_generation=role_generation,
+            permission_ids_by_name=MappingProxyType({p.name: p.id for p in permissions.values()}),
+        )
+
+    def with_roles(
+            self,
+            changed: Iterable[RoleNode],
+            removed: Iterable[int],
+            role_generation: int,
+    ) -> "RbacGraph":
+        """New graph with some roles added, replaced or removed; the rest is shared as is."""
+        roles = dict(self.roles)
+        for role_id in removed:
+            roles.pop(role_id, None)
+        for role in changed:
+            roles[role.id] = role
+        return RbacGraph(self.permissions, MappingProxyType(roles), role_generation,
+                         self.permission_ids_by_name)
+
+    def role_permissions(self, role_id: int) -> List[PermissionNode]:
+        role = self.roles.get(role_id)
+        if role is None:
+            return []
+        return sorted((self.permissions[p] for p in role.permission_ids), key=lambda p: p.id)
+
+    def role_effective_permissions(self, role_id: int) -> List[PermissionNode]:
+        role = self.roles.get(role_id)
+        if role is None:
+            return []
+        return sorted((self.permissions[p] for p in role.effective_permission_ids), key=lambda p: p.id)
+
+    def descendant_role_ids(self, role_ids: Iterable[int]) -> Set[int]:
+        """The given roles and every role they include, directly or not."""
+        seen: Set[int] = set()
+        stack = list(role_ids)
+        while stack:
+            role_id = stack.pop()
+            if role_id in seen:
+                continue
+            seen.add(role_id)
+            role = self.roles.get(role_id)
+            if role is not None:
+                stack.extend(role.child_ids)
+        return seen
+
+    def role_has_permission(self, role_id: int, permission: str) -> bool:
+        role = self.roles.get(role_id)
+        permission_id = self.permission_ids_by_name.get(permission)
+        return role is not None and permission_id in role.effective_permission_ids
+
+
+def load_graph(db: Session, role_generation: int = 0) -> RbacGraph:
+    """Build a graph from the database with six queries."""
+    permissions = {
+        p.id: PermissionNode(p.id, p.name, p.created_at, p.updated_at)
+        for p in db.exec(select(Permission)).all()
+    }
+    permission_ids_by_name = {p.name: p.id for p in permissions.values()}
+    roles = {role.id: role for role in _load_roles(db, select(Role), permission_ids_by_name)}
+    return RbacGraph.build(permissions, roles, role_generation)
+
+def load_roles(db: Session, role_ids: Iterable[int]) -> List[RoleNode]:
+    """Nodes of the given roles that still exist."""
+    role_ids = list(role_ids)
+    if not role_ids:
+        return []
+    permission_ids_by_name = dict(db.exec(select(Permission.name, Permission.id)).all())
+    return _load_roles(db, select(Role).where(Role.id.in_(role_ids)), permission_ids_by_name, role_ids)
+
+def _load_roles(
+        db: Session,
+        statement,
+        permission_ids_by_name: Mapping[str, int],
+        role_ids: Optional[List[int]] = None,
+) -> List[RoleNode]:
+    # Expired grants are left out even before the sweeper has deleted them
+    grants = (
+        select(RoleHasPermissions.role_id, RoleHasPermissions.permission_id)
+        .where(unexpired(RoleHasPermissions.__table__))
+    )
+    edges = select(RoleInheritance.parent_role_id, RoleInheritance.child_role_id)
+    inherited = (
+        select(RoleClosure.ancestor_id, RoleHasPermissions.permission_id)
+        .join(RoleHasPermissions, RoleHasPermissions.role_id == RoleClosure.descendant_id)
+        .where(unexpired(RoleHasPermissions.__table__))
+    )
+    patterns = (
+        select(RoleClosure.ancestor_id, RoleClosure.descendant_id, RolePermissionPattern.pattern)
+        .join(RolePermissionPattern, RolePermissionPattern.role_id == RoleClosure.descendant_id)
+    )
+    if role_ids is not None:
+        grants = grants.where(RoleHasPermissions.role_id.in_(role_ids))
+        edges = edges.where(RoleInheritance.parent_role_id.in_(role_ids))
+        inherited = inherited.where(RoleClosure.ancestor_id.in_(role_ids))
+        patterns = patterns.where(RoleClosure.ancestor_id.in_(role_ids))
+
+    direct: Dict[int, set] = {}
+    for role_id, permission_id in db.exec(grants).all():
+        direct.setdefault(role_id, set()).add(permission_id)
+    children: Dict[int, set] = {}
+    for parent_id, child_id in db.exec(edges).all():
+        children.setdefault(parent_id, set()).add(child_id)
+    effective: Dict[int, set] = {}
+    for role_id, permission_id in db.exec(inherited).all():
+        effective.setdefault(role_id, set()).add(permission_id)
+    own_patterns: Dict[int, set] = {}
+    all_patterns: Dict[int, set] = {}
+    for role_id, granting_role_id, pattern in db.exec(patterns).all():
+        all_patterns.setdefault(role_id, set()).add(pattern)
+        if granting_role_id == role_id:
+            own_patterns.setdefault(role_id, set()).add(pattern)
+    for role_id, role_patterns in all_patterns.items():
+        effective.setdefault(role_id, set()).update(
+            compile_patterns(role_patterns).expand(permission_ids_by_name))
+    return [
+        RoleNode(r.id, r.name, r.created_at, r.updated_at,
+                 frozenset(direct.get(r.id, ())),
+                 frozenset(children.get(r.id, ())),
+                 frozenset(effective.get(r.id, ())),
+                 frozenset(own_patterns.get(r.id, ())))
+        for r in db.exec(statement).all()
+    ]
+
+
+class RbacGraphStore:
+    """Holds the current graph and swaps it atomically on change."""
+
+    def __init__(self):
+        self._graph: Optional[RbacGraph] = None
+        self._reload_lock = threading.Lock()
+
+    def load(self, db: Session) -> RbacGraph:
+        """(Re)build the graph from the database and make it current."""
+        snapshot = snapshot_store.current()
+        if snapshot is None:
+            snapshot = snapshot_store.publish_full(db)
+        self._graph = load_graph(db, snapshot.role_generation)
+        return self._graph
+
+    def current(self) -> RbacGraph:
+        """
+        The current graph.
+
+        If another worker changed roles since this graph was built, the graph is
+        reloaded once; concurrent readers keep using the old graph meanwhile.
+        """
+        graph = self._graph
+        snapshot = snapshot_store.current()
+        stale = graph is None or (snapshot is not None and snapshot.role_generation != graph.role_generation)
+        if stale and self._reload_lock.acquire(blocking=graph is None):
+            try:
+                if self._graph is graph:
+                    with Session(engine) as db:
+                        self.load(db)
+            finally:
+                self._reload_lock.release()
+        return self._graph
+
+    def role_changed(self, db: Session, role_id: int, affected_role_ids: Iterable[int] = ()) -> None:
+        """
+        Apply a committed change of one role (created, renamed, deleted, its
+        permissions or children changed) and publish it to the other workers.
+
+        Only the role and the roles including it are reloaded, since nothing
+        else can inherit the change. A deleted role has left the closure, so
+        the caller passes its former ancestors as `affected_role_ids`.
+        """
+        snapshot = snapshot_store.publish_roles(db)
+        graph = self._graph
+        if graph is None or snapshot.role_generation != graph.role_generation + 1:
+            # Missed changes made elsewhere; an incremental update would not be enough
+            self._graph = load_graph(db, snapshot.role_generation)
+            return
+
+        affected = {role_id, *affected_role_ids, *ancestor_ids(db, role_id)}
+        changed = load_roles(db, affected)
+        removed = affected - {role.id for role in changed}
+        self._graph = graph.with_roles(changed, removed, snapshot.role_generation)
+
+    def user_has_permission(self, user_id: int, permission: str) -> Optional[bool]:
+        """Authorization check for a user; None if the user is not in the published index."""
+        snapshot = snapshot_store.current()
+        if snapshot is None or not snapshot.has_user(user_id):
+            return None
+        # Keep the graph fresh; the mask of the user's role set is precomputed
+        # in the snapshot, so this is one bit test however many roles they have
+        self.current()
+        return snapshot.user_has_permission(user_id, permission)
+
+
+def check_consistency(db: Session) -> List[str]:
+    """
+    Diff the published authorization state against the database.
+
+    Compares each role's permission set and each user's roles as the workers
+    see them (the shared snapshot their graphs are built on) with what the
+    database holds, and the materialized effective permissions with what the
+    user's roles grant. Returns human-readable differences; empty means
+    consistent.
+    """
+    snapshot = snapshot_store.current()
+    if snapshot is None:
+        return ["no authorization snapshot has been published"]
+
+    differences = []
+    expected = load_graph(db)
+    published_role_ids = set(snapshot.role_ids)
+    for role_id in sorted(published_role_ids | expected.roles.keys()):
+        role = expected.roles.get(role_id)
+        if role is None:
+            differences.append(f"role {role_id}: published but not in the database")
+            continue
+        if role_id not in published_role_ids:
+            differences.append(f"role {role_id} ({role.name}): in the database but not published")
+            continue
+        want = {p.name for p in expected.role_effective_permissions(role_id)}
+        got = set(snapshot.role_permissions(role_id))
+        if want != got:
+            differences.append(
+                f"role {role_id} ({role.name}): missing permissions {sorted(want - got)}, "
+                f"extra permissions {sorted(got - want)}")
+
+    user_roles: Dict[int, set] = {user_id: set() for user_id in db.exec(select(User.id)).all()}
+    for user_id, role_id in db.exec(
+        select(UserHasRoles.user_id, UserHasRoles.role_id).where(unexpired(UserHasRoles.__table__))
+    ).all():
+        user_roles.setdefault(user_id, set()).add(role_id)
+    published_users = set(snapshot.user_ids)
+    for user_id, role_ids in sorted(user_roles.items()):
+        if user_id not in published_users:
+            differences.append(f"user {user_id}: in the database but not published")
+            continue
+        published_users.discard(user_id)
+        published = set(snapshot.roles_of(user_id))
+        if published != role_ids:
+            differences.append(
+                f"user {user_id}: published roles {sorted(published)}, database roles {sorted(role_ids)}")
+    for user_id in sorted(published_users):
+        differences.append(f"user {user_id}: published but not in the database")
+
+    materialized: Dict[int, set] = {}
+    for user_id, permission_id in db.exec(
+        select(UserEffectivePermission.user_id, UserEffectivePermission.permission_id)
+    ).all():
+        materialized.setdefault(user_id, set()).add(permission_id)
+    for user_id, role_ids in sorted(user_roles.items()):
+        want = set()
+        for role_id in role_ids:
+            role = expected.roles.get(role_id)
+            if role is not None:
+                want |= role.effective_permission_ids
+        got = materialized.pop(user_id, set())
+        if want != got:
+            differences.append(
+                f"user {user_id}: effective permissions missing {sorted(want - got)}, "
+                f"extra {sorted(got - want)}")
+    for user_id in sorted(materialized):
+        differences.append(f"user {user_id}: effective permissions for a user not in the database")
+    return differences
+
+
+rbac_graph_store = RbacGraphStore()
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, UTC
+from typing import Optional, Tuple
+from fastapi import status
+from sqlalchemy import update
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.core.response_controller import ResponseController
+from app.core.security import generate_refresh_token, generate_token_family, hash_token
+from app.models.refresh_token import RefreshToken
+
+
+def _as_utc(value: datetime) -> datetime:
+    """MySQL DATETIME columns come back naive; they are always written in UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+def issue_refresh_token(
+        db: Session,
+        user_id: int,
+        family_id: Optional[str] = None
+) -> Tuple[str, RefreshToken]:
+    """
+    Create a refresh token for a user and add it to the session.
+
+    Returns the raw token (only ever handed to the client) and the stored row.
+    The caller is responsible for committing.
+    """
+    raw_token = generate_refresh_token()
+    refresh_token = RefreshToken(
+        user_id=user_id,
+        token_hash=hash_token(raw_token),
+        family_id=family_id or generate_token_family(),
+        expires_at=datetime.now(UTC) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(refresh_token)
+    db.flush()
+    return raw_token, refresh_token
+
+def revoke_token_family(db: Session, family_id: str) -> None:
+    """Revoke every still-active refresh token of a family with one statement."""
+    db.exec(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(UTC))
+    )
+
+def rotate_refresh_token(db: Session, raw_token: str) -> Tuple[str, RefreshToken]:
+    """
+    Exchange a refresh token for a new one of the same family.
+
+    Presenting a token that was already rotated means it leaked (either the client
+    or an attacker is replaying it), so the whole family is revoked.
+    """
+    stored = db.exec(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_token(raw_token))
+    ).first()
+    if not stored:
+        return ResponseController.send_error(
+            error="Invalid refresh token.",
+            error_messages={},
+            code=status.HTTP_401_UNAUTHORIZED)
+
+    now = datetime.now(UTC)
+    if stored.revoked_at is None and _as_utc(stored.expires_at) <= now:
+        return ResponseController.send_error(
+            error="Refresh token has expired.",
+            error_messages={},
+            code=status.HTTP_401_UNAUTHORIZED)
+
+    # Conditional update so two concurrent refreshes with the same token
+    # cannot both succeed; the loser is treated as a reuse
+    result = db.exec(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    if result.rowcount != 1:
+        revoke_token_family(db, stored.family_id)
+        db.commit()
+        return ResponseController.send_error(
+            error="Refresh token has been revoked.",
+            error_messages={},
+            code=status.HTTP_401_UNAUTHORIZED)
+
+    new_raw_token, new_token = issue_refresh_token(db, stored.user_id, stored.family_id)
+    db.exec(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id)
+        .values(replaced_by_id=new_token.id)
+    )
+    return new_raw_token, new_token
@@ -0,0 +1,149 @@
+"""
+Maintenance of the role hierarchy and its transitive closure.
+
+A parent role includes all permissions of its child roles, recursively. The
+`role_closure` table holds every (ancestor, descendant) pair together with the
+number of distinct paths between them, so a role's effective permissions are
+one join and adding or removing an edge only touches the pairs running through
+that edge: the ancestors of the parent times the descendants of the child.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import and_, bindparam, delete, insert, update
+from sqlmodel import Session, select
+from app.models.role import Role
+from app.models.role_closure import RoleClosure
+from app.models.role_inheritance import RoleInheritance
+
+RC = RoleClosure.__table__
+RI = RoleInheritance.__table__
+
+
+def add_role(db: Session, role_id: int) -> None:
+    """Every role is its own descendant; call once when a role is created."""
+    db.exec(insert(RC), params=[{"ancestor_id": role_id, "descendant_id": role_id, "paths": 1}])
+
+def ancestor_ids(db: Session, role_id: int) -> List[int]:
+    """Roles that include the role, the role itself included."""
+    return list(db.exec(select(RoleClosure.ancestor_id).where(RoleClosure.descendant_id == role_id)).all())
+
+def ancestor_ids_of(db: Session, role_ids: Iterable[int]) -> List[int]:
+    role_ids = list(role_ids)
+    if not role_ids:
+        return []
+    return list(db.exec(
+        select(RoleClosure.ancestor_id).where(RoleClosure.descendant_id.in_(role_ids)).distinct()
+    ).all())
+
+def descendant_ids(db: Session, role_id: int) -> List[int]:
+    """Roles included by the role, the role itself included."""
+    return list(db.exec(select(RoleClosure.descendant_id).where(RoleClosure.ancestor_id == role_id)).all())
+
+def child_ids(db: Session, role_id: int) -> List[int]:
+    return list(db.exec(
+        select(RoleInheritance.child_role_id).where(RoleInheritance.parent_role_id == role_id)
+    ).all())
+
+def has_edge(db: Session, parent_id: int, child_id: int) -> bool:
+    return db.get(RoleInheritance, (parent_id, child_id)) is not None
+
+def creates_cycle(db: Session, parent_id: int, child_id: int) -> bool:
+    """True if making `child_id` a child of `parent_id` would close a cycle."""
+    # A cycle needs a path back from the child to the parent; the self rows
+    # cover parent == child
+    return db.get(RoleClosure, (child_id, parent_id)) is not None
+
+def add_edge(db: Session, parent_id: int, child_id: int) -> None:
+    """Make `parent_id` include `child_id`; the caller has ruled out cycles and duplicates."""
+    db.exec(insert(RI), params=[{"parent_role_id": parent_id, "child_role_id": child_id}])
+    _apply_paths(db, parent_id, child_id, 1)
+
+def remove_edge(db: Session, parent_id: int, child_id: int) -> None:
+    db.exec(delete(RI).where(RI.c.parent_role_id == parent_id, RI.c.child_role_id == child_id))
+    _apply_paths(db, parent_id, child_id, -1)
+
+def remove_role(db: Session, role_id: int) -> None:
+    """Detach a role from the hierarchy ahead of deleting it."""
+    for parent_id in db.exec(
+        select(RoleInheritance.parent_role_id).where(RoleInheritance.child_role_id == role_id)
+    ).all():
+        remove_edge(db, parent_id, role_id)
+    for child_id in child_ids(db, role_id):
+        remove_edge(db, role_id, child_id)
+    db.exec(delete(RC).where(RC.c.ancestor_id == role_id, RC.c.descendant_id == role_id))
+
+def _apply_paths(db: Session, parent_id: int, child_id: int, sign: int) -> None:
+    """
+    Add (sign=1) or subtract (sign=-1) the paths that run through one edge.
+
+    Every path through the edge is a path from an ancestor of the parent to the
+    parent, the edge, then a path from the child to one of its descendants, so
+    the change for each pair is the product of the two path counts.
+    """
+    ancestors = db.exec(
+        select(RoleClosure.ancestor_id, RoleClosure.paths).where(RoleClosure.descendant_id == parent_id)
+    ).all()
+    descendants = db.exec(
+        select(RoleClosure.descendant_id, RoleClosure.paths).where(RoleClosure.ancestor_id == child_id)
+    ).all()
+    delta: Dict[Tuple[int, int], int] = {
+        (ancestor, descendant): sign * up * down
+        for ancestor, up in ancestors
+        for descendant, down in descendants
+    }
+    if not delta:
+        return
+
+    in_pairs = and_(
+        RC.c.ancestor_id.in_([a for a, _ in ancestors]),
+        RC.c.descendant_id.in_([d for d, _ in descendants]),
+    )
+    existing = set(db.exec(select(RC.c.ancestor_id, RC.c.descendant_id).where(in_pairs)).all())
+    updated = [{"b_ancestor": a, "b_descendant": d, "b_delta": n} for (a, d), n in delta.items()
+               if (a, d) in existing]
+    inserted = [{"ancestor_id": a, "descendant_id": d, "paths": n} for (a, d), n in delta.items()
+                if (a, d) not in existing]
+
+    if updated:
+        db.connection().execute(
+            update(RC)
+            .where(RC.c.ancestor_id == bindparam("b_ancestor"), RC.c.descendant_id == bindparam("b_descendant"))
+            .values(paths=RC.c.paths + bindparam("b_delta")),
+            updated,
+        )
+    if inserted and sign > 0:
+        db.exec(insert(RC), params=inserted)
+    if sign < 0:
+        db.exec(delete(RC).where(in_pairs, RC.c.paths <= 0))
+
+def rebuild_closure(db: Session) -> None:
+    """Recompute the whole closure from the edges, e.g. after seeding roles."""
+    children: Dict[int, List[int]] = {}
+    for parent_id, child_id in db.exec(select(RI.c.parent_role_id, RI.c.child_role_id)).all():
+        children.setdefault(parent_id, []).append(child_id)
+
+    # Path counts from each role to its descendants, children before parents
+    counts: Dict[int, Dict[int, int]] = {}
+    for role_id in db.exec(select(Role.id)).all():
+        stack = [role_id]
+        while stack:
+            current = stack[-1]
+            if current in counts:
+                stack.pop()
+                continue
+            pending = [c for c in children.get(current, ()) if c not in counts]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            paths = {current: 1}
+            for child_id in children.get(current, ()):
+                for descendant, n in counts[child_id].items():
+                    paths[descendant] = paths.get(descendant, 0) + n
+            counts[current] = paths
+
+    db.exec(delete(RC))
+    rows = [{"ancestor_id": a, "descendant_id": d, "paths": n}
+            for a, paths in counts.items() for d, n in paths.items()]
+    if rows:
+        db.exec(insert(RC), params=rows)
@@ -0,0 +1,192 @@
+"""
+Role mining: find redundant and overlapping roles.
+
+Each role's own grants (explicit permissions plus its expanded wildcard
+patterns, not what it inherits) are a bitset over permissions, and each
+permission has a posting bitset over roles. Both are Python integers, so set
+operations on whole rows run in C:
+
+- the roles containing all permissions of role A are the AND of A's postings,
+  which finds every superset of A without comparing A to each role;
+- the overlap of role A with every other role is counted at once by adding
+  A's postings into bit-sliced counters, so similar pairs are found without
+  comparing A to each role; only roles of a compatible size are counted.
+"""
+
+from dataclasses import dataclass
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Tuple
+import math
+from sqlalchemy import func
+from sqlmodel import Session, select
+from app.core.permission_patterns import compile_patterns
+from app.core.rbac_graph import load_graph
+from app.models.user_has_roles import UserHasRoles
+
+DUPLICATE = "duplicate"
+SUBSET = "subset"
+SIMILAR = "similar"
+
+
+@dataclass(frozen=True)
+class RolePair:
+    kind: str
+    # For subsets, `role_a` is the smaller role; the proposal merges `role_a` into `role_b`
+    role_a: int
+    role_b: int
+    jaccard: float
+    shared: int
+    only_a: int
+    only_b: int
+    # Members of `role_a`, whose permissions would change with the merge
+    affected_users: int
+
+
+@dataclass
+class RoleBitsets:
+    role_ids: List[int]
+    role_names: Dict[int, str]
+    # Permission bitset per role, in `role_ids` order
+    masks: List[int]
+    # Role bitset per permission bit
+    postings: Dict[int, int]
+    members: Dict[int, int]
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def load_role_bitsets(db: Session) -> RoleBitsets:
+    graph = load_graph(db)
+    bit_of = {permission_id: bit for bit, permission_id in enumerate(sorted(graph.permissions))}
+
+    roles = list(graph.roles.values())
+    role_ids, masks = [], []
+    for role in roles:
+        permission_ids = set(role.permission_ids)
+        if role.permission_patterns:
+            permission_ids |= compile_patterns(role.permission_patterns).expand(graph.permission_ids_by_name)
+        mask = 0
+        for permission_id in permission_ids:
+            mask |= 1 << bit_of[permission_id]
+        role_ids.append(role.id)
+        masks.append(mask)
+
+    # Ordered by size so a size range is a contiguous range of role bits
+    order = sorted(range(len(role_ids)), key=lambda i: (masks[i].bit_count(), role_ids[i]))
+    role_ids = [role_ids[i] for i in order]
+    masks = [masks[i] for i in order]
+
+    postings: Dict[int, int] = {}
+    for index, mask in enumerate(masks):
+        for bit in _bits(mask):
+            postings[bit] = postings.get(bit, 0) | (1 << index)
+
+    members = dict(db.exec(
+        select(UserHasRoles.role_id, func.count()).group_by(UserHasRoles.role_id)
+    ).all())
+    return RoleBitsets(role_ids, {r.id: r.name for r in roles}, masks, postings, members)
+
+
+def _pair(kind: str, data: RoleBitsets, a: int, b: int) -> RolePair:
+    shared = (data.masks[a] & data.masks[b]).bit_count()
+    only_a = data.masks[a].bit_count() - shared
+    only_b = data.masks[b].bit_count() - shared
+    union = shared + only_a + only_b
+    role_a, role_b = data.role_ids[a], data.role_ids[b]
+    return RolePair(kind, role_a, role_b, shared / union if union else 1.0,
+                    shared, only_a, only_b, data.members.get(role_a, 0))
+
+def find_subsets(data: RoleBitsets) -> List[RolePair]:
+    """Roles whose permissions are all held by another role (equal sets are duplicates)."""
+    everyone = (1 << len(data.role_ids)) - 1
+    pairs = []
+    for a, mask in enumerate(data.masks):
+        if not mask:
+            continue
+        supersets = everyone
+        for bit in _bits(mask):
+            supersets &= data.postings[bit]
+        supersets &= ~(1 << a)
+        for b in _bits(supersets):
+            if data.masks[b] == mask:
+                # Report each duplicate pair once, merging the later role into the earlier
+                if data.role_ids[b] < data.role_ids[a]:
+                    pairs.append(_pair(DUPLICATE, data, a, b))
+            else:
+                pairs.append(_pair(SUBSET, data, a, b))
+    return pairs
+
+def _add(planes: List[int], bits: int) -> None:
+    """Add 1 to the bit-sliced counter of every role set in `bits`."""
+    for plane, value in enumerate(planes):
+        planes[plane], bits = value ^ bits, value & bits
+        if not bits:
+            return
+    planes.append(bits)
+
+def _at_least(planes: List[int], minimum: int, everyone: int) -> int:
+    """Roles whose bit-sliced counter is >= minimum."""
+    if minimum <= 0:
+        return everyone
+    if minimum.bit_length() > len(planes):
+        return 0
+    greater, equal = 0, everyone
+    for plane in reversed(range(len(planes))):
+        if minimum >> plane & 1:
+            equal &= planes[plane]
+        else:
+            greater |= equal & planes[plane]
+            equal &= ~planes[plane]
+    return greater | equal
+
+def find_similar(data: RoleBitsets, threshold: float) -> List[RolePair]:
+    """
+    Pairs that are neither subsets nor duplicates with Jaccard similarity >= threshold.
+
+    For each role A, the overlap with every later role is counted at once by
+    adding A's permission postings into bit-sliced counters (one integer per
+    counter bit), and compared against the overlap each candidate size needs.
+    """
+    sizes = [mask.bit_count() for mask in data.masks]
+    pairs = []
+    for a, mask in enumerate(data.masks):
+        size = sizes[a]
+        if not size:
+            continue
+        # Compare each pair once, from the smaller role (or the earlier of equal
+        # size), and only against roles no larger than size / threshold
+        upper = bisect_right(sizes, math.floor(size / threshold))
+        width = upper - a - 1
+        if width <= 0:
+            continue
+        window = (1 << width) - 1
+
+        planes: List[int] = []
+        for bit in _bits(mask):
+            _add(planes, (data.postings[bit] >> (a + 1)) & window)
+        # Holding all of A's permissions makes it a subset, reported by find_subsets
+        similar = window & ~_at_least(planes, size, window)
+
+        matches = 0
+        lo = a + 1
+        while lo < upper:
+            other_size = sizes[lo]
+            hi = bisect_right(sizes, other_size, lo, upper)
+            # J >= t  <=>  shared >= t * (|A| + |B|) / (1 + t)
+            needed = math.ceil(threshold * (size + other_size) / (1 + threshold) - 1e-9)
+            size_range = ((1 << (hi - a - 1)) - 1) & ~((1 << (lo - a - 1)) - 1)
+            matches |= _at_least(planes, needed, window) & size_range
+            lo = hi
+        for b in _bits(matches & similar):
+            pairs.append(_pair(SIMILAR, data, a, a + 1 + b))
+    return pairs
+
+def find_role_merges(db: Session, threshold: float = 0.8) -> Tuple[List[RolePair], Dict[int, str]]:
+    """Duplicates, subsets and similar pairs, most similar first, with the role names."""
+    data = load_role_bitsets(db)
+    pairs = find_subsets(data) + find_similar(data, threshold)
+    return sorted(pairs, key=lambda p: (-p.jaccard, p.role_a, p.role_b)), data.role_names
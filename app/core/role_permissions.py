@@ -0,0 +1,84 @@
+"""
+Set-based changes of role permissions.
+
+Granting or revoking many permissions on many roles costs one SELECT of the
+existing links and one executemany INSERT or one DELETE per batch of roles,
+however many pairs are involved; the caller commits once.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, delete, insert, update
+from sqlmodel import Session, select
+from app.core.effective_permissions import as_utc
+from app.models.role_has_permissions import RoleHasPermissions
+
+RHP = RoleHasPermissions.__table__
+# Upper bound on the (role, permission) pairs handled by one statement
+BATCH_PAIRS = 10000
+
+
+def _role_batches(role_ids: List[int], permission_count: int) -> Iterable[List[int]]:
+    size = max(1, BATCH_PAIRS // max(1, permission_count))
+    for start in range(0, len(role_ids), size):
+        yield role_ids[start:start + size]
+
+def _existing(db: Session, role_ids: List[int], permission_ids: List[int]) -> List[Tuple[int, int, Optional[datetime]]]:
+    return list(db.exec(
+        select(RHP.c.role_id, RHP.c.permission_id, RHP.c.expires_at)
+        .where(RHP.c.role_id.in_(role_ids), RHP.c.permission_id.in_(permission_ids))
+    ).all())
+
+def assign_permissions(
+        db: Session,
+        role_ids: Iterable[int],
+        permission_ids: Iterable[int],
+        expires_at: Optional[datetime] = None,
+) -> Dict[int, int]:
+    """
+    Grant every permission to every role, until `expires_at` if given; returns
+    the links added per role. Existing temporary links are extended to the new
+    deadline (or made permanent), never shortened.
+    """
+    role_ids, permission_ids = sorted(set(role_ids)), sorted(set(permission_ids))
+    expires_at = as_utc(expires_at) if expires_at is not None else None
+    added = dict.fromkeys(role_ids, 0)
+    if not permission_ids:
+        return added
+    for batch in _role_batches(role_ids, len(permission_ids)):
+        existing = {
+            (role_id, permission_id): expiry
+            for role_id, permission_id, expiry in _existing(db, batch, permission_ids)
+        }
+        rows = [{"role_id": role_id, "permission_id": permission_id, "expires_at": expires_at}
+                for role_id in batch for permission_id in permission_ids
+                if (role_id, permission_id) not in existing]
+        extended = [{"b_role": role_id, "b_permission": permission_id}
+                    for (role_id, permission_id), expiry in existing.items()
+                    if expiry is not None and (expires_at is None or expires_at > as_utc(expiry))]
+        if rows:
+            db.connection().execute(insert(RHP), rows)
+        if extended:
+            db.connection().execute(
+                update(RHP)
+                .where(RHP.c.role_id == bindparam("b_role"), RHP.c.permission_id == bindparam("b_permission"))
+                .values(expires_at=expires_at),
+                extended,
+            )
+        for row in rows:
+            added[row["role_id"]] += 1
+    return added
+
+def remove_permissions(db: Session, role_ids: Iterable[int], permission_ids: Iterable[int]) -> Dict[int, int]:
+    """Revoke every permission from every role; returns the links removed per role."""
+    role_ids, permission_ids = sorted(set(role_ids)), sorted(set(permission_ids))
+    removed = dict.fromkeys(role_ids, 0)
+    if not permission_ids:
+        return removed
+    for batch in _role_batches(role_ids, len(permission_ids)):
+        existing = _existing(db, batch, permission_ids)
+        if existing:
+            db.exec(delete(RHP).where(RHP.c.role_id.in_(batch), RHP.c.permission_id.in_(permission_ids)))
+        for role_id, _, _ in existing:
+            removed[role_id] += 1
+    return removed
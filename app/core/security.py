@@ -1,15 +1,18 @@
 from datetime import datetime, timedelta, UTC
 from typing import Optional
+import hashlib
+import secrets
 from jose import jwt
 from app.core.config import settings
 from fastapi import status
 from app.core.response_controller import ResponseController
 
-BLACKLIST = set()
+ACCESS_TOKEN_TYPE = "access"
 
 
-def create_access_token(username: str, 
-                     expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(username: str,
+                     expires_delta: Optional[timedelta] = None,
+                     user_id: Optional[int] = None) -> str:
     """Create a JWT token with an expiration."""
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
@@ -17,41 +20,68 @@ def create_access_token(username: str,
         expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {
         "sub": str(username),
+        "typ": ACCESS_TOKEN_TYPE,
         "exp": expire
     }
+    if user_id is not None:
+        payload["uid"] = user_id
     encoded_jwt = jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def decode_token(token: str) -> str:
-    """Decodes & validates the JWT; returns the username if valid."""
+def decode_access_token(token: str) -> dict:
+    """
+    Decodes & validates the JWT; returns its payload if valid.
+
+    Access tokens are short-lived, so only the signature and expiry are checked;
+    there is no revocation lookup on this path.
+    """
     if not token:
         return ResponseController.send_error(
-            error="Token is missing", 
-            error_messages={}, 
+            error="Token is missing",
+            error_messages={},
             code=status.HTTP_401_UNAUTHORIZED)
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return ResponseController.send_error(
-                error="Token payload is invalid: missing 'sub'.", 
-                error_messages={}, 
-                code=status.HTTP_401_UNAUTHORIZED)
-        # Check if token is blacklisted
-        if token in BLACKLIST:
-            return ResponseController.send_error(
-                error="Token has been revoked.", 
-                error_messages={}, 
-                code=status.HTTP_401_UNAUTHORIZED)
-        return username
     except jwt.ExpiredSignatureError:
         return ResponseController.send_error(
-            error="Token has expired.", 
-            error_messages={}, 
+            error="Token has expired.",
+            error_messages={},
             code=status.HTTP_401_UNAUTHORIZED)
     except jwt.JWTError:
         return ResponseController.send_error(
-            error="Could not validate token.", 
-            error_messages={}, 
+            error="Could not validate token.",
+            error_messages={},
+            code=status.HTTP_401_UNAUTHORIZED)
+
+    if payload.get("sub") is None:
+        return ResponseController.send_error(
+            error="Token payload is invalid: missing 'sub'.",
+            error_messages={},
+            code=status.HTTP_401_UNAUTHORIZED)
+    if payload.get("typ") != ACCESS_TOKEN_TYPE:
+        return ResponseController.send_error(
+            error="Token is not an access token.",
+            error_messages={},
             code=status.HTTP_401_UNAUTHORIZED)
+    return payload
+
+def decode_token(token: str) -> str:
+    """Decodes & validates the JWT; returns the username if valid."""
+    return decode_access_token(token)["sub"]
+
+def generate_refresh_token() -> str:
+    """Create an opaque, high-entropy refresh token."""
+    return secrets.token_urlsafe(48)
+
+def generate_token_family() -> str:
+    """Create an identifier shared by all refresh tokens descending from one login."""
+    return secrets.token_hex(16)
+
+def hash_token(token: str) -> str:
+    """
+    SHA-256 digest of an opaque token.
 
+    Refresh tokens carry enough entropy that a fast digest is sufficient,
+    which keeps lookups a single indexed equality match.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
@@ -0,0 +1,209 @@
+"""
+Bulk creation and update of Grafana and Kibana sources.
+
+A batch is validated as a whole before anything is written: every item
+against the create or update schema, then all the data sources the items
+refer to, and for updates all the sources they change, are loaded with one
+query each; those of data sources the caller may not see count as missing. The valid items are written in the caller's transaction: the
+new sources in a single flush and the changes with one executemany UPDATE.
+In atomic mode nothing is written unless every item is valid. The summary
+counters take the net change of the whole batch in one write.
+"""
+
+from collections import Counter
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, Type
+import re
+from fastapi import status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import bindparam, update
+from sqlmodel import Session, select
+from app.core import change_feed, summary_counters
+from app.core.data_source_acl import filter_visible
+from app.core.response_controller import ResponseController
+from app.core.source_credentials import encrypt_secret
+from app.models.data_source import DataSource, SourceType
+from app.models.source import AuthType, Source
+from app.schemas.source_bulk import SourceBulkResult
+from app.schemas.user import UserPermissions
+
+CREATED = "created"
+UPDATED = "updated"
+FAILED = "failed"
+
+SOURCE_URL = re.compile(r'^https?://')
+# Columns an update may change, besides updated_at
+UPDATED_COLUMNS = ("source_url", "data_source_id", "auth_type", "auth_username", "auth_password", "bearer_token")
+
+
+def _validate(schema: Type[BaseModel], item: Dict[str, Any], result: SourceBulkResult) -> Optional[BaseModel]:
+    """The item parsed with the schema and its URL formatted, or None with the errors recorded."""
+    try:
+        source_in = schema.model_validate(item)
+    except ValidationError as exc:
+        result.errors = [error["msg"] for error in exc.errors()]
+        return None
+    if source_in.source_url is not None:
+        if not SOURCE_URL.match(source_in.source_url):
+            result.errors.append("Invalid URL format. URL must start with 'http://' or 'https://'.")
+            return None
+        source_in.source_url = source_in.source_url.rstrip("/")
+    return source_in
+
+def _check_data_sources(
+        db: Session,
+        principal: UserPermissions,
+        source_type: SourceType,
+        valid: Dict[int, BaseModel],
+        results: List[SourceBulkResult],
+) -> None:
+    """Drop the items whose data source is missing, hidden from the principal or of another type, with one query."""
+    ids = {source_in.data_source_id for source_in in valid.values() if source_in.data_source_id is not None}
+    statement = filter_visible(select(DataSource.id, DataSource.type).where(DataSource.id.in_(ids)),
+                               DataSource.id, principal)
+    types = dict(db.exec(statement).all()) if ids else {}
+    for index, source_in in list(valid.items()):
+        if source_in.data_source_id is None:
+            continue
+        if source_in.data_source_id not in types:
+            results[index].errors.append("Associated DataSource not found")
+        elif SourceType(types[source_in.data_source_id]) != source_type:
+            results[index].errors.append(f"Associated DataSource is not a {source_type.value.capitalize()} source")
+        else:
+            continue
+        del valid[index]
+
+def bulk_create(
+        db: Session,
+        principal: UserPermissions,
+        source_type: SourceType,
+        schema: Type[BaseModel],
+        items: List[Dict[str, Any]],
+        atomic: bool,
+) -> List[SourceBulkResult]:
+    """Create the valid items in the caller's transaction; nothing when atomic and any item is invalid."""
+    results = [SourceBulkResult(index=index, status=FAILED) for index in range(len(items))]
+    valid = {}
+    for index, item in enumerate(items):
+        source_in = _validate(schema, item, results[index])
+        if source_in is not None:
+            valid[index] = source_in
+    _check_data_sources(db, principal, source_type, valid, results)
+    if atomic and len(valid) < len(items):
+        return results
+
+    sources = {
+        index: Source(
+            type=source_type,
+            data_source_id=source_in.data_source_id,
+            source_url=source_in.source_url,
+            auth_type=source_in.auth_type,
+            auth_username=source_in.auth_username,
+            auth_password=encrypt_secret(source_in.auth_password),
+            bearer_token=encrypt_secret(source_in.bearer_token),
+        )
+        for index, source_in in valid.items()
+    }
+    db.add_all(sources.values())
+    db.flush()
+    deltas = Counter()
+    for source in sources.values():
+        summary_counters.shift(deltas, [], summary_counters.source_keys(source_type, source.data_source_id))
+    summary_counters.apply(db, deltas)
+    change_feed.record(db, change_feed.SOURCES, (source.id for source in sources.values()))
+    for index, source in sources.items():
+        results[index].status, results[index].id = CREATED, source.id
+    return results
+
+def _updated_values(current: Dict[str, Any], source_in: BaseModel) -> Dict[str, Any]:
+    """The columns of a source after the update, as the single update endpoint applies it."""
+    values = dict(current)
+    if source_in.auth_type is not None and source_in.auth_type != AuthType(current["auth_type"]):
+        if source_in.auth_type == AuthType.BEARER:
+            # Switching from basic to bearer, remove username and password
+            values["auth_username"] = values["auth_password"] = None
+        else:
+            # Switching from bearer to basic, remove bearer token
+            values["bearer_token"] = None
+    for column in ("source_url", "data_source_id", "auth_type", "auth_username"):
+        if getattr(source_in, column) is not None:
+            values[column] = getattr(source_in, column)
+    for column in ("auth_password", "bearer_token"):
+        if getattr(source_in, column) is not None:
+            values[column] = encrypt_secret(getattr(source_in, column))
+    return values
+
+def bulk_update(
+        db: Session,
+        principal: UserPermissions,
+        source_type: SourceType,
+        schema: Type[BaseModel],
+        items: List[Dict[str, Any]],
+        atomic: bool,
+) -> List[SourceBulkResult]:
+    """
+    Apply the valid items, each carrying the `id` of the source it changes,
+    in the caller's transaction; nothing when atomic and any item is invalid.
+    """
+    results = [SourceBulkResult(index=index, status=FAILED) for index in range(len(items))]
+    valid, seen = {}, set()
+    for index, item in enumerate(items):
+        source_in = _validate(schema, item, results[index])
+        if source_in is None:
+            continue
+        if source_in.id in seen:
+            results[index].errors.append("The source is updated by an earlier item")
+            continue
+        seen.add(source_in.id)
+        valid[index] = source_in
+
+    table = Source.__table__
+    current = {
+        row["id"]: row for row in db.exec(filter_visible(
+            select(table.c.id, *(table.c[column] for column in UPDATED_COLUMNS))
+            .where(table.c.id.in_(seen), table.c.type == source_type),
+            table.c.data_source_id, principal,
+        )).mappings().all()
+    } if seen else {}
+    for index, source_in in list(valid.items()):
+        if source_in.id not in current:
+            results[index].errors.append(f"{source_type.value.capitalize()} source not found")
+            del valid[index]
+    _check_data_sources(db, principal, source_type, valid, results)
+    if atomic and len(valid) < len(items):
+        return results
+
+    now = datetime.now(UTC)
+    rows = [
+        {**_updated_values({column: current[source_in.id][column] for column in UPDATED_COLUMNS}, source_in),
+         "updated_at": now, "b_id": source_in.id}
+        for source_in in valid.values()
+    ]
+    if rows:
+        db.connection().execute(update(table).where(table.c.id == bindparam("b_id")), rows)
+    deltas = Counter()
+    for row in rows:
+        summary_counters.shift(deltas, summary_counters.source_keys(source_type, current[row["b_id"]]["data_source_id"]),
+                               summary_counters.source_keys(source_type, row["data_source_id"]))
+    summary_counters.apply(db, deltas)
+    change_feed.record(db, change_feed.SOURCES, (row["b_id"] for row in rows))
+    for index, source_in in valid.items():
+        results[index].status, results[index].id = UPDATED, source_in.id
+    return results
+
+def bulk_response(db: Session, results: List[SourceBulkResult], atomic: bool, message: str):
+    """Commit and report the per-item results, or roll back when an atomic batch has invalid items."""
+    failed = [result for result in results if result.errors]
+    if atomic and failed:
+        db.rollback()
+        return ResponseController.send_error(
+            error=f"Nothing was written: {len(failed)} of {len(results)} item(s) are invalid",
+            error_messages={"items": [result.model_dump() for result in failed]},
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+    db.commit()
+    return ResponseController.send_response(
+        result={"items": results, "written": len(results) - len(failed), "failed": len(failed)},
+        message=message,
+        code=status.HTTP_200_OK,
+    )
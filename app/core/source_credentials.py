@@ -0,0 +1,259 @@
+"""
+Envelope encryption of the Grafana and Kibana source credentials.
+
+Every secret is encrypted with its own random data key (AES-256-GCM), and the
+data key is stored next to it wrapped by a key-encryption key from
+`CREDENTIAL_KEYS`. Stored values read `enc:v1:<key id>:<wrapped data key>:<ciphertext>`;
+values without the prefix are legacy plaintext and are used as they are until
+the re-encryption job has sealed them. Rotating keys only rewraps the data
+keys: add the new key, make it `CREDENTIAL_ACTIVE_KEY`, let the job run, then
+drop the old one.
+
+Nothing is decrypted when sources are read or listed; a secret is opened only
+when a request to the source is about to be made, and the opened value is
+kept in a bounded TTL cache keyed by the stored value, so hot paths pay the
+crypto cost once per TTL.
+"""
+
+from base64 import b64decode, b64encode, urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import threading
+import time
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from sqlalchemy import and_, bindparam, not_, or_, update
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import engine
+from app.models.source import AuthType, Source
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "enc:v1"
+NONCE_BYTES = 12
+SECRET_COLUMNS = ("auth_password", "bearer_token")
+SOURCE_TABLES = (Source.__table__,)
+
+
+class CredentialError(ValueError):
+    """A stored secret cannot be opened (unknown key or tampered value)."""
+
+
+def _encode(data: bytes) -> str:
+    return urlsafe_b64encode(data).decode().rstrip("=")
+
+def _decode(text: str) -> bytes:
+    return urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _seal(key: AESGCM, data: bytes, aad: Optional[bytes] = None) -> bytes:
+    nonce = os.urandom(NONCE_BYTES)
+    return nonce + key.encrypt(nonce, data, aad)
+
+def _open(key: AESGCM, sealed: bytes, aad: Optional[bytes] = None) -> bytes:
+    return key.decrypt(sealed[:NONCE_BYTES], sealed[NONCE_BYTES:], aad)
+
+
+class Keyring:
+    """Key-encryption keys by id; the active one wraps the data keys of new secrets."""
+
+    def __init__(self, keys: Dict[str, bytes], active: Optional[str] = None):
+        self._keys = {key_id: AESGCM(key) for key_id, key in keys.items()}
+        self.active = active or next(iter(keys), None)
+        if self.active is not None and self.active not in self._keys:
+            raise ValueError(f"Unknown active credential key: {self.active}")
+
+    @classmethod
+    def from_setting(cls, spec: str, active: str = "") -> "Keyring":
+        """Parse `id:base64key,id:base64key` (keys of 32 bytes)."""
+        keys = {}
+        for entry in filter(None, (part.strip() for part in spec.split(","))):
+            key_id, _, encoded = entry.partition(":")
+            key = b64decode(encoded)
+            if not key_id or len(key) != 32:
+                raise ValueError(f"Invalid credential key: {key_id or entry[:8]}")
+            keys[key_id] = key
+        return cls(keys, active or None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.active is not None
+
+    def is_current(self, value: str) -> bool:
+        return value.startswith(f"{PREFIX}:{self.active}:")
+
+    def encrypt(self, plaintext: str) -> str:
+        """Seal a secret under a new data key; returns it unchanged when no key is configured."""
+        if not self.enabled:
+            return plaintext
+        data_key = AESGCM.generate_key(bit_length=256)
+        wrapped = _seal(self._keys[self.active], data_key, self.active.encode())
+        ciphertext = _seal(AESGCM(data_key), plaintext.encode())
+        return f"{PREFIX}:{self.active}:{_encode(wrapped)}:{_encode(ciphertext)}"
+
+    def _parts(self, value: str) -> Tuple[str, bytes, bytes]:
+        try:
+            _, _, key_id, wrapped, ciphertext = value.split(":")
+            return key_id, _decode(wrapped), _decode(ciphertext)
+        except ValueError:
+            raise CredentialError("Malformed encrypted credential") from None
+
+    def _data_key(self, key_id: str, wrapped: bytes) -> bytes:
+        if key_id not in self._keys:
+            raise CredentialError(f"Unknown credential key: {key_id}")
+        try:
+            return _open(self._keys[key_id], wrapped, key_id.encode())
+        except InvalidTag:
+            raise CredentialError("Encrypted credential failed authentication") from None
+
+    def decrypt(self, value: str) -> str:
+        if not value.startswith(f"{PREFIX}:"):
+            return value
+        key_id, wrapped, ciphertext = self._parts(value)
+        try:
+            return _open(AESGCM(self._data_key(key_id, wrapped)), ciphertext).decode()
+        except InvalidTag:
+            raise CredentialError("Encrypted credential failed authentication") from None
+
+    def rewrap(self, value: str) -> str:
+        """The value sealed under the active key: plaintext is encrypted, data keys are rewrapped."""
+        if not value.startswith(f"{PREFIX}:"):
+            return self.encrypt(value)
+        key_id, wrapped, ciphertext = self._parts(value)
+        wrapped = _seal(self._keys[self.active], self._data_key(key_id, wrapped), self.active.encode())
+        return f"{PREFIX}:{self.active}:{_encode(wrapped)}:{_encode(ciphertext)}"
+
+
+class SecretCache:
+    """Opened secrets by stored value, each kept for `ttl` seconds, at most `max_entries`."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, value: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(value)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[value]
+                return None
+            self._entries.move_to_end(value)
+            return entry[1]
+
+    def put(self, value: str, secret: str) -> None:
+        if not self.ttl:
+            return
+        with self._lock:
+            self._entries[value] = (time.monotonic() + self.ttl, secret)
+            self._entries.move_to_end(value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+keyring = Keyring.from_setting(settings.CREDENTIAL_KEYS, settings.CREDENTIAL_ACTIVE_KEY)
+secret_cache = SecretCache(settings.CREDENTIAL_CACHE_TTL_SECONDS, settings.CREDENTIAL_CACHE_ENTRIES)
+
+def encrypt_secret(value: Optional[str]) -> Optional[str]:
+    return keyring.encrypt(value) if value is not None else None
+
+def reveal_secret(value: Optional[str]) -> Optional[str]:
+    """The plaintext of a stored secret; raises CredentialError."""
+    if value is None or not value.startswith(f"{PREFIX}:"):
+        return value
+    secret = secret_cache.get(value)
+    if secret is None:
+        secret = keyring.decrypt(value)
+        secret_cache.put(value, secret)
+    return secret
+
+def credential_headers(
+        auth_type: AuthType,
+        username: Optional[str],
+        password: Optional[str],
+        bearer_token: Optional[str],
+) -> Dict[str, str]:
+    """The Authorization header for a source, from its stored (encrypted) credentials."""
+    if AuthType(auth_type) == AuthType.BEARER:
+        return {"Authorization": f"Bearer {reveal_secret(bearer_token)}"}
+    basic = b64encode(f"{username or ''}:{reveal_secret(password) or ''}".encode()).decode()
+    return {"Authorization": f"Basic {basic}"}
+
+
+def _stale(table):
+    current = f"{PREFIX}:{keyring.active}:%"
+    return or_(*(and_(table.c[column].is_not(None), not_(table.c[column].like(current)))
+                 for column in SECRET_COLUMNS))
+
+def reencrypt_batch(db: Session, table, after_id: int, batch_size: int) -> Tuple[int, Optional[int]]:
+    """
+    Seal the next batch of rows not yet under the active key, in the caller's
+    transaction; returns the values rewritten and the id to continue after
+    (None when done). A value changed concurrently is left for its writer.
+    """
+    rows = db.exec(
+        select(table.c.id, *(table.c[column] for column in SECRET_COLUMNS))
+        .where(table.c.id > after_id, _stale(table))
+        .order_by(table.c.id)
+        .limit(batch_size)
+    ).all()
+    rewritten = 0
+    for position, column in enumerate(SECRET_COLUMNS, start=1):
+        changes = []
+        for row in rows:
+            if row[position] is None or keyring.is_current(row[position]):
+                continue
+            try:
+                changes.append({"b_id": row[0], "b_old": row[position], "b_new": keyring.rewrap(row[position])})
+            except CredentialError as exc:
+                logger.warning("Cannot re-encrypt %s of %s %d: %s", column, table.name, row[0], exc)
+        if changes:
+            db.connection().execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"), table.c[column] == bindparam("b_old"))
+                .values({column: bindparam("b_new")}),
+                changes,
+            )
+            rewritten += len(changes)
+    return rewritten, (rows[-1][0] if len(rows) == batch_size else None)
+
+
+class CredentialReencryptor:
+    """Brings every stored secret under the active key, one committed batch at a time."""
+
+    def __init__(self, batch_size: int, pause: float):
+        self.batch_size = batch_size
+        self.pause = pause
+
+    def _batch(self, table, after_id: int) -> Tuple[int, Optional[int]]:
+        with Session(engine) as db:
+            result = reencrypt_batch(db, table, after_id, self.batch_size)
+            db.commit()
+        return result
+
+    async def run(self) -> int:
+        """Returns the number of values rewritten; a no-op when encryption is disabled."""
+        if not keyring.enabled:
+            return 0
+        total = 0
+        for table in SOURCE_TABLES:
+            after_id: Optional[int] = 0
+            while after_id is not None:
+                rewritten, after_id = await run_in_threadpool(self._batch, table, after_id)
+                total += rewritten
+                if after_id is not None:
+                    # Leave room for regular traffic between batches
+                    await asyncio.sleep(self.pause)
+        if total:
+            logger.info("Re-encrypted %d source credential(s) under key %s", total, keyring.active)
+        return total
+
+
+credential_reencryptor = CredentialReencryptor(settings.CREDENTIAL_REENCRYPT_BATCH, 0.1)
@@ -0,0 +1,229 @@
+"""
+Health probing of Grafana and Kibana sources.
+
+Every round probes all sources concurrently with pooled `httpx.AsyncClient`s,
+one small pool per host so connections to the same host are reused, with a
+semaphore bounding the requests in flight and a timeout per request. Results
+are written to the `source_health` table in batches and kept in an in-process
+cache, which the source read endpoints serve from; workers that do not probe
+reload the cache from the table once it is older than a probe interval. Rounds
+are spaced by a jittered interval so that several workers do not probe in
+lockstep.
+"""
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import random
+import threading
+import time
+import httpx
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.source_credentials import CredentialError, credential_headers
+from app.db.database import engine
+from app.models.data_source import SourceType
+from app.models.source import AuthType, Source
+from app.models.source_health import SourceHealth
+from app.schemas.source_health import SourceHealthRead
+
+logger = logging.getLogger(__name__)
+
+UP = "up"
+DOWN = "down"
+PROBE_PATHS = {SourceType.GRAFANA: "/api/health", SourceType.KIBANA: "/api/status"}
+WRITE_BATCH = 500
+
+SH = SourceHealth.__table__
+
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    source_type: SourceType
+    source_id: int
+    url: str
+    auth_type: AuthType
+    username: Optional[str]
+    password: Optional[str]
+    bearer_token: Optional[str]
+
+    def headers(self) -> Dict[str, str]:
+        return credential_headers(self.auth_type, self.username, self.password, self.bearer_token)
+
+
+def load_targets(db: Session) -> List[ProbeTarget]:
+    """All sources of the types with a probe path, with one query."""
+    return [
+        ProbeTarget(
+            SourceType(source_type), source_id, url.rstrip("/") + PROBE_PATHS[source_type],
+            AuthType(auth_type), username, password, token,
+        )
+        for source_type, source_id, url, auth_type, username, password, token in db.exec(select(
+            Source.type, Source.id, Source.source_url,
+            Source.auth_type, Source.auth_username, Source.auth_password, Source.bearer_token,
+        ).where(Source.type.in_(PROBE_PATHS))).all()
+    ]
+
+async def probe(client: httpx.AsyncClient, target: ProbeTarget) -> dict:
+    """Probe one source; never raises."""
+    started = time.perf_counter()
+    http_status, error = None, None
+    try:
+        response = await client.get(target.url, headers=target.headers())
+        http_status = response.status_code
+        if response.status_code >= 400:
+            error = f"HTTP {response.status_code}"
+    except (httpx.HTTPError, CredentialError) as exc:
+        error = f"{type(exc).__name__}: {exc}"[:255]
+    return {
+        "source_type": target.source_type,
+        "source_id": target.source_id,
+        "status": DOWN if error else UP,
+        "http_status": http_status,
+        "latency_ms": round((time.perf_counter() - started) * 1000),
+        "error": error,
+        "checked_at": datetime.now(UTC),
+    }
+
+class HostClients:
+    """
+    One small keep-alive connection pool per host, with at most as many
+    requests in flight per host as its pool has connections: connections are
+    reused between the sources of a host, and handing one out never scans
+    other hosts' connections or a backlog of waiting requests (the pool's
+    scheduling is linear in both).
+    """
+
+    def __init__(self, connections_per_host: int, timeout: float):
+        self.connections_per_host = connections_per_host
+        self.limits = httpx.Limits(max_connections=connections_per_host, max_keepalive_connections=connections_per_host)
+        self.timeout = timeout
+        self._hosts: Dict[str, Tuple[httpx.AsyncClient, asyncio.Semaphore]] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[httpx.AsyncClient]:
+        """The client of the url's host, once one of its connections is free."""
+        parsed = httpx.URL(url)
+        origin = f"{parsed.scheme}://{parsed.host}:{parsed.port}"
+        if origin not in self._hosts:
+            self._hosts[origin] = (httpx.AsyncClient(limits=self.limits, timeout=self.timeout),
+                                   asyncio.Semaphore(self.connections_per_host))
+        client, host_slots = self._hosts[origin]
+        async with host_slots:
+            yield client
+
+    async def aclose(self) -> None:
+        hosts, self._hosts = list(self._hosts.values()), {}
+        for client, _ in hosts:
+            await client.aclose()
+
+async def probe_all(
+        targets: Iterable[ProbeTarget],
+        concurrency: int,
+        timeout: float,
+        connections_per_host: int = 10,
+) -> List[dict]:
+    """Probe all targets with at most `concurrency` requests in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    clients = HostClients(connections_per_host, timeout)
+
+    async def bounded(target: ProbeTarget) -> dict:
+        async with clients.slot(target.url) as client, semaphore:
+            return await probe(client, target)
+
+    try:
+        return await asyncio.gather(*(bounded(target) for target in targets))
+    finally:
+        await clients.aclose()
+
+def write_results(db: Session, results: List[dict]) -> None:
+    """
+    Replace the stored results, one DELETE and one executemany INSERT per
+    batch, and drop the rows of sources that no longer exist.
+    """
+    for start in range(0, len(results), WRITE_BATCH):
+        batch = results[start:start + WRITE_BATCH]
+        for source_type in PROBE_PATHS:
+            ids = [row["source_id"] for row in batch if row["source_type"] == source_type]
+            if ids:
+                db.exec(delete(SH).where(SH.c.source_type == source_type, SH.c.source_id.in_(ids)))
+        db.connection().execute(insert(SH), batch)
+    db.exec(delete(SH).where(SH.c.source_id.not_in(select(Source.id))))
+
+
+class SourceHealthCache:
+    """Latest probe results by (source type, source id)."""
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._entries: Dict[Tuple[SourceType, int], SourceHealthRead] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def replace(self, results: Iterable[dict]) -> None:
+        entries = {(SourceType(row["source_type"]), row["source_id"]): SourceHealthRead.model_validate(row)
+                   for row in results}
+        with self._lock:
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+
+    def _reload_if_stale(self, db: Session) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.max_age:
+            return
+        rows = db.connection().execute(select(SH)).mappings().all()
+        self.replace(rows)
+
+    def get(self, db: Session, source_type: SourceType, source_id: int) -> Optional[SourceHealthRead]:
+        self._reload_if_stale(db)
+        return self._entries.get((source_type, source_id))
+
+
+class SourceHealthProber:
+    def __init__(self, interval: float, concurrency: int, timeout: float, connections_per_host: int):
+        self.interval = interval
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.connections_per_host = connections_per_host
+        self.cache = SourceHealthCache(interval)
+
+    def _load_targets(self) -> List[ProbeTarget]:
+        with Session(engine) as db:
+            return load_targets(db)
+
+    def _write(self, results: List[dict]) -> None:
+        with Session(engine) as db:
+            write_results(db, results)
+            db.commit()
+
+    async def probe_round(self) -> List[dict]:
+        targets = await run_in_threadpool(self._load_targets)
+        results = await probe_all(targets, self.concurrency, self.timeout, self.connections_per_host)
+        await run_in_threadpool(self._write, results)
+        self.cache.replace(results)
+        return results
+
+    async def run(self) -> None:
+        """Background loop; the first round starts at a random point of the first interval."""
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            try:
+                results = await self.probe_round()
+                down = sum(1 for row in results if row["status"] == DOWN)
+                logger.info("Probed %d sources, %d down", len(results), down)
+            except Exception:
+                logger.exception("Probing sources failed")
+            await asyncio.sleep(self.interval * random.uniform(0.9, 1.1))
+
+
+source_health_prober = SourceHealthProber(
+    settings.SOURCE_HEALTH_INTERVAL_SECONDS,
+    settings.SOURCE_HEALTH_CONCURRENCY,
+    settings.SOURCE_HEALTH_TIMEOUT_SECONDS,
+    settings.SOURCE_HEALTH_CONNECTIONS_PER_HOST,
+)
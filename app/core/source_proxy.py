@@ -0,0 +1,194 @@
+"""
+Streaming reverse proxy to Grafana and Kibana sources.
+
+Requests are forwarded with the source's stored credentials injected server
+side, so the credentials never reach the browser; the caller's own
+credentials and cookies are not forwarded. Each upstream (scheme, host and
+port) gets a keep-alive connection pool that lives as long as the worker, and
+request and response bodies are streamed through chunk by chunk.
+
+Successful GET responses of known length up to `SOURCE_PROXY_CACHE_MAX_BYTES`
+can be cached for `SOURCE_PROXY_CACHE_TTL_SECONDS` (0, the default, disables
+the cache). The cache is shared by everyone allowed to use a source, which is
+sound because every request to a source carries the same credentials.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import time
+import httpx
+from fastapi import Request, status
+from fastapi.responses import Response, StreamingResponse
+from sqlmodel import Session
+from app.core.config import settings
+from app.core.data_source_acl import can_see
+from app.core.response_controller import ResponseController
+from app.core.source_credentials import credential_headers
+from app.models.data_source import SourceType
+from app.models.source import Source
+from app.schemas.user import UserPermissions
+
+PROXY_METHODS = ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+
+# Connection-level headers (RFC 9110 section 7.6.1) are never forwarded
+HOP_BY_HOP = frozenset({
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade",
+})
+# Neither are the caller's credentials, nor the upstream's session cookies
+REQUEST_DROPPED = HOP_BY_HOP | {"host", "authorization", "cookie", "x-api-key"}
+RESPONSE_DROPPED = HOP_BY_HOP | {"set-cookie"}
+
+Headers = List[Tuple[str, str]]
+CacheKey = Tuple[SourceType, int, str, str, str]
+
+
+@dataclass
+class Upstream:
+    source_type: SourceType
+    source_id: int
+    base_url: str
+    credentials: Dict[str, str]
+
+def load_upstream(
+        db: Session,
+        principal: UserPermissions,
+        source_type: SourceType,
+        source_id: int,
+) -> Optional[Upstream]:
+    """The source to proxy to, or None if it is missing or not visible to the principal."""
+    source = db.get(Source, source_id)
+    if source is None or source.type != source_type or not can_see(db, principal, source.data_source_id):
+        return None
+    return Upstream(
+        source_type, source_id, source.source_url.rstrip("/"),
+        credential_headers(source.auth_type, source.auth_username, source.auth_password, source.bearer_token),
+    )
+
+
+class ResponseCache:
+    """LRU of small GET responses, each kept for `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_bytes: int, max_entries: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[float, int, Headers, bytes]]" = OrderedDict()
+
+    def get(self, key: CacheKey) -> Optional[Tuple[int, Headers, bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, status_code, headers, body = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return status_code, headers, body
+
+    def put(self, key: CacheKey, status_code: int, headers: Headers, body: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, status_code, headers, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def cacheable(self, method: str, response: httpx.Response) -> bool:
+        if not self.ttl or method != "GET" or response.status_code != status.HTTP_200_OK:
+            return False
+        if "no-store" in response.headers.get("cache-control", "").lower():
+            return False
+        length = response.headers.get("content-length")
+        return length is not None and length.isdigit() and int(length) <= self.max_bytes
+
+
+def _raw_response(response: Response, status_code: int, headers: Headers) -> Response:
+    response.status_code = status_code
+    response.raw_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+    return response
+
+class SourceProxy:
+    def __init__(self, connections_per_host: int, timeout: float, cache: ResponseCache):
+        self.limits = httpx.Limits(max_connections=connections_per_host, max_keepalive_connections=connections_per_host)
+        self.timeout = timeout
+        self.cache = cache
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _client(self, url: httpx.URL) -> httpx.AsyncClient:
+        origin = f"{url.scheme}://{url.host}:{url.port}"
+        client = self._clients.get(origin)
+        if client is None:
+            client = self._clients[origin] = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+    async def forward(self, request: Request, upstream: Upstream, path: str) -> Response:
+        """Forward the request to `path` under the source URL and stream the answer back."""
+        if ".." in path.split("/"):
+            return ResponseController.send_error(
+                error="Invalid proxy path",
+                error_messages={},
+                code=status.HTTP_400_BAD_REQUEST,
+            )
+        query = request.url.query
+        url = httpx.URL(f"{upstream.base_url}/{path}" + (f"?{query}" if query else ""))
+        headers = [(name, value) for name, value in request.headers.items() if name not in REQUEST_DROPPED]
+        headers += list(upstream.credentials.items())
+
+        key = None
+        if request.method == "GET" and self.cache.ttl:
+            key = (upstream.source_type, upstream.source_id, path, query, request.headers.get("accept-encoding", ""))
+            cached = self.cache.get(key)
+            if cached is not None:
+                status_code, response_headers, body = cached
+                return _raw_response(Response(body), status_code, response_headers)
+
+        has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+        client = self._client(url)
+        try:
+            upstream_response = await client.send(
+                client.build_request(request.method, url, headers=headers, content=request.stream() if has_body else None),
+                stream=True,
+            )
+        except httpx.HTTPError as exc:
+            return ResponseController.send_error(
+                error="The source could not be reached",
+                error_messages={"upstream": [f"{type(exc).__name__}: {exc}"]},
+                code=status.HTTP_502_BAD_GATEWAY,
+            )
+
+        response_headers = [(name, value) for name, value in upstream_response.headers.multi_items()
+                            if name.lower() not in RESPONSE_DROPPED]
+        if key is not None and self.cache.cacheable(request.method, upstream_response):
+            try:
+                # Raw bytes: the body stays encoded as the upstream sent it
+                body = b"".join([chunk async for chunk in upstream_response.aiter_raw()])
+            finally:
+                await upstream_response.aclose()
+            self.cache.put(key, upstream_response.status_code, response_headers, body)
+            return _raw_response(Response(body), upstream_response.status_code, response_headers)
+
+        async def body() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in upstream_response.aiter_raw():
+                    yield chunk
+            finally:
+                # Also when the caller disconnects, so the connection returns to the pool
+                await upstream_response.aclose()
+
+        return _raw_response(StreamingResponse(body()), upstream_response.status_code, response_headers)
+
+
+source_proxy = SourceProxy(
+    settings.SOURCE_PROXY_CONNECTIONS_PER_HOST,
+    settings.SOURCE_PROXY_TIMEOUT_SECONDS,
+    ResponseCache(
+        settings.SOURCE_PROXY_CACHE_TTL_SECONDS,
+        settings.SOURCE_PROXY_CACHE_MAX_BYTES,
+        settings.SOURCE_PROXY_CACHE_ENTRIES,
+    ),
+)
@@ -0,0 +1,182 @@
+"""
+Counters behind the admin summary: users per primary role and per status,
+data sources per type, and sources per type and per data source.
+
+Every change to the counted rows records its deltas here in its own
+transaction, so the counters are exactly as current as the rows they count
+and a summary is read from the counter rows alone, however large the counted
+tables grow. Buckets of a role or a data source are inserted by the
+transaction that creates it and dropped by the one that deletes it; updates
+touch their rows in key order so concurrent writers cannot deadlock on them.
+Counters that drifted anyway (rows changed outside the API) are repaired by
+`reconcile`, which recounts everything with a few GROUP BY queries.
+
+The counters with a bucket per role or data source grow with those tables, so
+they are read a page of buckets at a time; the others have a bucket per type
+or status and are read whole.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, delete, func, insert, update
+from sqlmodel import Session, select
+from app.models.data_source import DataSource, SourceType
+from app.models.role import Role
+from app.models.source import Source
+from app.models.summary_counter import SummaryCounter
+from app.models.user import User
+
+USERS_PER_ROLE = "users_per_role"
+USERS_PER_STATUS = "users_per_status"
+DATA_SOURCES_PER_TYPE = "data_sources_per_type"
+SOURCES_PER_TYPE = "sources_per_type"
+SOURCES_PER_DATA_SOURCE = "sources_per_data_source"
+COUNTERS = (USERS_PER_ROLE, USERS_PER_STATUS, DATA_SOURCES_PER_TYPE, SOURCES_PER_TYPE, SOURCES_PER_DATA_SOURCE)
+# Counters with a few buckets, however many rows there are
+FIXED_COUNTERS = (USERS_PER_STATUS, DATA_SOURCES_PER_TYPE, SOURCES_PER_TYPE)
+
+SC = SummaryCounter.__table__
+
+# (counter, bucket)
+Key = Tuple[str, str]
+
+
+def user_keys(role_id: Optional[int], status: str) -> List[Key]:
+    """The buckets a user counts in."""
+    keys = [(USERS_PER_STATUS, status)]
+    if role_id is not None:
+        keys.append((USERS_PER_ROLE, str(role_id)))
+    return keys
+
+def data_source_keys(source_type: SourceType) -> List[Key]:
+    return [(DATA_SOURCES_PER_TYPE, SourceType(source_type).value)]
+
+def source_keys(source_type: SourceType, data_source_id: int) -> List[Key]:
+    return [(SOURCES_PER_TYPE, SourceType(source_type).value), (SOURCES_PER_DATA_SOURCE, str(data_source_id))]
+
+def shift(deltas: Counter, before: Iterable[Key], after: Iterable[Key]) -> Counter:
+    """Add the move of one row from the `before` buckets to the `after` ones (none for an insert or a delete)."""
+    for key in before:
+        deltas[key] -= 1
+    for key in after:
+        deltas[key] += 1
+    return deltas
+
+def apply(db: Session, deltas: Counter) -> None:
+    """Add the deltas to their counters in the caller's transaction."""
+    changes = sorted((key, delta) for key, delta in deltas.items() if delta)
+    if not changes:
+        return
+    result = db.connection().execute(
+        update(SC)
+        .where(SC.c.counter == bindparam("b_counter"), SC.c.bucket == bindparam("b_bucket"))
+        .values(value=SC.c.value + bindparam("b_delta")),
+        [{"b_counter": counter, "b_bucket": bucket, "b_delta": delta} for (counter, bucket), delta in changes],
+    )
+    if result.rowcount == len(changes):
+        return
+    # Some buckets do not exist yet (e.g. a status seen for the first time)
+    existing = {tuple(row) for row in db.exec(
+        select(SC.c.counter, SC.c.bucket).where(SC.c.counter.in_({counter for (counter, _), _ in changes}))
+    ).all()}
+    missing = [
+        {"counter": counter, "bucket": bucket, "value": delta}
+        for (counter, bucket), delta in changes if (counter, bucket) not in existing
+    ]
+    if missing:
+        db.connection().execute(insert(SC), missing)
+
+def record(db: Session, before: Iterable[Key], after: Iterable[Key]) -> None:
+    """Count the move of one row, in the caller's transaction."""
+    apply(db, shift(Counter(), before, after))
+
+def open_buckets(db: Session, counter: str, buckets: Iterable) -> None:
+    """Insert the empty buckets of new roles or data sources, in the transaction that creates them."""
+    rows = [{"counter": counter, "bucket": str(bucket), "value": 0} for bucket in buckets]
+    if rows:
+        db.connection().execute(insert(SC), rows)
+
+def drop_buckets(db: Session, counter: str, buckets: Iterable) -> None:
+    """Remove the buckets of deleted roles or data sources, in the transaction that deletes them."""
+    buckets = [str(bucket) for bucket in buckets]
+    if buckets:
+        db.exec(delete(SC).where(SC.c.counter == counter, SC.c.bucket.in_(buckets)))
+
+
+def load_counters(db: Session, counters: Iterable[str] = FIXED_COUNTERS) -> Dict[str, Dict[str, int]]:
+    """The counters as {bucket: value}, in one query over their rows."""
+    loaded: Dict[str, Dict[str, int]] = {counter: {} for counter in counters}
+    for counter, bucket, value in db.exec(
+        select(SC.c.counter, SC.c.bucket, SC.c.value).where(SC.c.counter.in_(list(loaded)))
+    ).all():
+        loaded[counter][bucket] = value
+    return loaded
+
+def load_buckets(db: Session, counter: str, ids: Iterable[int]) -> Dict[int, int]:
+    """The buckets of `counter` for some role or data source ids, in one primary key lookup."""
+    ids = list(ids)
+    values = dict(db.exec(
+        select(SC.c.bucket, SC.c.value).where(SC.c.counter == counter, SC.c.bucket.in_([str(i) for i in ids]))
+    ).all()) if ids else {}
+    return {i: values.get(str(i), 0) for i in ids}
+
+def actual_counts(db: Session) -> Dict[Key, int]:
+    """What the counters should read, counted from the tables."""
+    users, data_sources, sources = User.__table__, DataSource.__table__, Source.__table__
+    counts: Dict[Key, int] = {}
+    # Roles and data sources without rows still have their (empty) bucket
+    counts.update(((USERS_PER_ROLE, str(role_id)), 0) for role_id in db.exec(select(Role.__table__.c.id)).all())
+    counts.update(((SOURCES_PER_DATA_SOURCE, str(ds_id)), 0) for ds_id in db.exec(select(data_sources.c.id)).all())
+    for source_type in SourceType:
+        counts[(DATA_SOURCES_PER_TYPE, source_type.value)] = 0
+        counts[(SOURCES_PER_TYPE, source_type.value)] = 0
+
+    for role_id, n in db.exec(
+        select(users.c.role_id, func.count()).where(users.c.role_id.is_not(None)).group_by(users.c.role_id)
+    ).all():
+        counts[(USERS_PER_ROLE, str(role_id))] = n
+    for status, n in db.exec(select(users.c.status, func.count()).group_by(users.c.status)).all():
+        counts[(USERS_PER_STATUS, status)] = n
+    for source_type, n in db.exec(select(data_sources.c.type, func.count()).group_by(data_sources.c.type)).all():
+        counts[(DATA_SOURCES_PER_TYPE, SourceType(source_type).value)] = n
+    for source_type, n in db.exec(select(sources.c.type, func.count()).group_by(sources.c.type)).all():
+        counts[(SOURCES_PER_TYPE, SourceType(source_type).value)] = n
+    for ds_id, n in db.exec(select(sources.c.data_source_id, func.count()).group_by(sources.c.data_source_id)).all():
+        counts[(SOURCES_PER_DATA_SOURCE, str(ds_id))] = n
+    return counts
+
+def reconcile(db: Session) -> List[Tuple[str, str, Optional[int], Optional[int]]]:
+    """
+    Recount everything and correct the counters that drifted, in the caller's
+    transaction; returns (counter, bucket, stored, actual) of every correction.
+    """
+    # Lock the counter rows first, so writers wait on their counter updates
+    # until the corrections are committed instead of having them overwritten
+    stored = {(counter, bucket): value for counter, bucket, value in db.exec(
+        select(SC.c.counter, SC.c.bucket, SC.c.value).with_for_update()
+    ).all()}
+    actual = actual_counts(db)
+
+    corrections = sorted(
+        (counter, bucket, stored.get((counter, bucket)), actual.get((counter, bucket)))
+        for counter, bucket in stored.keys() | actual.keys()
+        if stored.get((counter, bucket)) != actual.get((counter, bucket))
+    )
+    changed = [{"b_counter": c, "b_bucket": b, "b_value": a} for c, b, s, a in corrections if s is not None and a is not None]
+    if changed:
+        db.connection().execute(
+            update(SC)
+            .where(SC.c.counter == bindparam("b_counter"), SC.c.bucket == bindparam("b_bucket"))
+            .values(value=bindparam("b_value")),
+            changed,
+        )
+    missing = [{"counter": c, "bucket": b, "value": a} for c, b, s, a in corrections if s is None]
+    if missing:
+        db.connection().execute(insert(SC), missing)
+    stale = [{"b_counter": c, "b_bucket": b} for c, b, s, a in corrections if a is None]
+    if stale:
+        db.connection().execute(
+            delete(SC).where(SC.c.counter == bindparam("b_counter"), SC.c.bucket == bindparam("b_bucket")),
+            stale,
+        )
+    return corrections
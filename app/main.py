@@ -1,30 +1,71 @@
+import asyncio
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request, status
-# from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager
+from sqlmodel import Session
 from app.api.v1.api_v1 import api_router
 from app.core.config import settings
-# from app.db.database import engine
+from app.db.database import engine
 # from app.db.base import Base
 # from app.core.init_db import seed_db
+from app.core.api_keys import last_used_tracker
+from app.core.rbac_graph import rbac_graph_store
+from app.core.authz_snapshot import snapshot_store
+from app.core.grant_expiry import grant_expiry_sweeper
+from app.core.source_health import source_health_prober
+from app.core.source_proxy import source_proxy
+from app.core.dashboard_catalog import dashboard_catalog
+from app.core.kibana_search import kibana_search
+from app.core.source_credentials import credential_reencryptor
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.response_controller import ResponseController
 
-# @asynccontextmanager
-# async def lifespan(app: FastAPI):
-#     # **Startup Tasks**
-#     Base.metadata.create_all(engine)
-#     seed_db()
-#     # If you have asynchronous startup tasks, perform them here
-#     yield
-#     # **Shutdown Tasks**
-#     # Perform any cleanup if necessary
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # **Startup Tasks**
+    # Base.metadata.create_all(engine)
+    # seed_db()
+    # Make sure the shared authorization snapshot matches the database: keep the
+    # one already in shared memory, else restore the persisted copy (validated
+    # with a single version query), and only compile from scratch as a last resort
+    with Session(engine) as session:
+        if not snapshot_store.is_current(session):
+            if snapshot_store.restore(session, settings.AUTHZ_PERSIST_PATH) is None:
+                snapshot_store.publish_full(session)
+        # Load the in-process RBAC graph
+        rbac_graph_store.load(session)
+        # Schedule the revocation of temporary grants; overdue ones are swept at once
+        grant_expiry_sweeper.load(session)
+    persist_task = asyncio.create_task(snapshot_store.persist_periodically(
+        settings.AUTHZ_PERSIST_PATH, settings.AUTHZ_PERSIST_INTERVAL_SECONDS))
+    expiry_task = asyncio.create_task(grant_expiry_sweeper.run())
+    probe_task = None
+    if settings.SOURCE_HEALTH_PROBE_ENABLED:
+        probe_task = asyncio.create_task(source_health_prober.run())
+    # Loads the dashboard search index, then syncs it (when enabled) and keeps it fresh
+    catalog_task = asyncio.create_task(dashboard_catalog.run())
+    # Seals legacy plaintext credentials and rewraps those under a retired key
+    reencrypt_task = asyncio.create_task(credential_reencryptor.run())
+    yield
+    # **Shutdown Tasks**
+    persist_task.cancel()
+    expiry_task.cancel()
+    if probe_task is not None:
+        probe_task.cancel()
+    catalog_task.cancel()
+    reencrypt_task.cancel()
+    await source_proxy.aclose()
+    await kibana_search.aclose()
+    snapshot_store.persist(settings.AUTHZ_PERSIST_PATH)
+    # Write back API key usage that is still pending
+    last_used_tracker.flush()
 
 def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.PROJECT_NAME,
-        # lifespan=lifespan
+        lifespan=lifespan
     )
     # https://fastapi.tiangolo.com/tutorial/cors/#use-corsmiddleware
     origins = [
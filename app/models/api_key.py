@@ -0,0 +1,34 @@
+# app/models/api_key.py
+
+from typing import Optional, TYPE_CHECKING
+from datetime import datetime
+from sqlmodel import Field, Relationship
+from app.db.base import Base, TimestampMixin
+
+if TYPE_CHECKING:
+    from app.models.user import User
+    from app.models.role import Role
+
+class ApiKey(Base, TimestampMixin, table=True):
+    __tablename__ = "api_keys"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(..., nullable=False)
+
+    # First characters of the key, kept so a key can be recognised in listings
+    key_prefix: str = Field(..., max_length=16, nullable=False)
+
+    # Only the SHA-256 digest of the key is stored, never the key itself
+    key_hash: str = Field(..., max_length=64, unique=True, index=True)
+
+    # The service account the key authenticates as
+    user_id: int = Field(foreign_key="users.id", index=True)
+
+    # The role the key is scoped to, independent of the account's own role
+    role_id: int = Field(foreign_key="roles.id", ondelete="CASCADE")
+
+    expires_at: Optional[datetime] = Field(default=None)
+    last_used_at: Optional[datetime] = Field(default=None)
+
+    # Relationships
+    user: "User" = Relationship(back_populates="api_keys")
+    role: "Role" = Relationship()
@@ -0,0 +1,16 @@
+# app/models/authz_version.py
+
+from typing import Optional
+from sqlmodel import Field
+from app.db.base import Base
+
+class AuthzVersion(Base, table=True):
+    """
+    Single row of counters bumped in the same transaction as every change
+    to the compiled authorization state, so a persisted snapshot can be
+    validated against the database with one query.
+    """
+    __tablename__ = "authz_versions"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    users_version: int = Field(default=0, nullable=False)
+    roles_version: int = Field(default=0, nullable=False)
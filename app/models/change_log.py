@@ -0,0 +1,26 @@
+# app/models/change_log.py
+
+from datetime import datetime, UTC
+from sqlalchemy import BigInteger, Column, Index
+from sqlmodel import Field
+from app.db.base import Base
+
+class ChangeLog(Base, table=True):
+    """
+    The latest change of one user, role or source, read by the change feeds of
+    app.core.change_feed; older changes of the same row are removed.
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        # Finds the previous change of a row when a new one replaces it
+        Index("ix_change_log_entity_entity_id", "entity", "entity_id"),
+        Base.__table_args__,
+    )
+
+    # "users", "roles" or "sources"; a feed is one range scan of the primary key
+    entity: str = Field(primary_key=True, max_length=16)
+    seq: int = Field(sa_column=Column(BigInteger, primary_key=True, autoincrement=False))
+    entity_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    # The row was deleted: a tombstone
+    deleted: bool = Field(default=False, nullable=False)
+    changed_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
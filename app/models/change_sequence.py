@@ -0,0 +1,17 @@
+# app/models/change_sequence.py
+
+from typing import Optional
+from sqlalchemy import BigInteger, Column
+from sqlmodel import Field
+from app.db.base import Base
+
+class ChangeSequence(Base, table=True):
+    """
+    Single row handing out the sequence numbers of change_log; a transaction
+    that took one keeps the row locked until it commits.
+    """
+    __tablename__ = "change_sequence"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    seq: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0))
+    # Tombstones up to this sequence number have been pruned
+    pruned_seq: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0))
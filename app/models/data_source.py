@@ -6,9 +6,9 @@ from app.db.base import Base, TimestampMixin
 from enum import Enum
 
 if TYPE_CHECKING:
-    from app.models.kibana_source import KibanaSource
-    from app.models.grafana_source import GrafanaSource
+    from app.models.source import Source
     from app.models.user import User
+    from app.models.data_source_acl import DataSourceAcl
 
 class SourceType(str, Enum):
     GRAFANA = "grafana"
@@ -37,10 +37,12 @@ class DataSource(Base, TimestampMixin, table=True):
     created_by_id: Optional[int] = Field(default=None, foreign_key="users.id")
 
     # Relationships
-    kibana_sources: List["KibanaSource"] = Relationship(back_populates="data_source")
-    grafana_sources: List["GrafanaSource"] = Relationship(back_populates="data_source")
+    sources: List["Source"] = Relationship(back_populates="data_source")
 
     # Relationship to User
     created_by: "User" = Relationship(back_populates="data_sources")
 
+    # Grants of the data source; removed with it
+    acl: List["DataSourceAcl"] = Relationship(cascade_delete=True)
+
 
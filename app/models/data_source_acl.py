@@ -0,0 +1,24 @@
+# app/models/data_source_acl.py
+
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field
+from app.db.base import Base, TimestampMixin
+
+class DataSourceAcl(Base, TimestampMixin, table=True):
+    """
+    Grants read access to one data source, and its Grafana and Kibana
+    sources, to either a user or a role (never both).
+    """
+    __tablename__ = "data_source_acls"
+    __table_args__ = (
+        # Lead with the grantee so "which sources may this principal see" is an
+        # index-only range scan; data_source_id makes the entries unique
+        Index("ix_data_source_acls_user_id_data_source_id", "user_id", "data_source_id", unique=True),
+        Index("ix_data_source_acls_role_id_data_source_id", "role_id", "data_source_id", unique=True),
+        Base.__table_args__,
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    data_source_id: int = Field(foreign_key="data_sources.id", index=True, ondelete="CASCADE")
+    user_id: Optional[int] = Field(default=None, foreign_key="users.id", ondelete="CASCADE")
+    role_id: Optional[int] = Field(default=None, foreign_key="roles.id", ondelete="CASCADE")
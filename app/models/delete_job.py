@@ -0,0 +1,23 @@
+# app/models/delete_job.py
+
+from typing import Dict, Optional
+from datetime import datetime, UTC
+from sqlalchemy import Column, JSON
+from sqlmodel import Field
+from app.db.base import Base
+
+class DeleteJob(Base, table=True):
+    """A cascading delete run in the background by app.core.cascade_delete."""
+    __tablename__ = "delete_jobs"
+    # Random hex id, handed out to the caller to poll the job
+    id: str = Field(primary_key=True, max_length=32)
+    # "data_source" or "role"
+    kind: str = Field(..., max_length=32)
+    target_id: int = Field(..., nullable=False)
+    # "pending", "running", "done" or "failed"
+    status: str = Field(..., max_length=16)
+    # Rows deleted so far, by table
+    counts: Dict[str, int] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    error: Optional[str] = Field(default=None, max_length=255)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    finished_at: Optional[datetime] = Field(default=None)
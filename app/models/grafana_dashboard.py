@@ -0,0 +1,28 @@
+# app/models/grafana_dashboard.py
+
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import Column, Index, JSON
+from sqlmodel import Field
+from app.db.base import Base
+
+class GrafanaDashboard(Base, table=True):
+    """Dashboard metadata pulled from a Grafana source by app.core.dashboard_catalog."""
+    __tablename__ = "grafana_dashboards"
+    __table_args__ = (
+        Index("ix_grafana_dashboards_grafana_source_id_uid", "grafana_source_id", "uid", unique=True),
+        Base.__table_args__,
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Id of the Grafana source (sources row); deleted with the source by app.core.cascade_delete
+    grafana_source_id: int
+    uid: str = Field(..., max_length=64)
+    title: str = Field(..., max_length=255)
+    tags: List[str] = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    folder_uid: Optional[str] = Field(default=None, max_length=64)
+    folder_title: Optional[str] = Field(default=None, max_length=255)
+    # Path of the dashboard on its Grafana instance
+    url: str = Field(..., max_length=512)
+    # Digest of the fields above; unchanged dashboards are not rewritten
+    fingerprint: str = Field(..., max_length=32)
+    synced_at: datetime = Field(..., nullable=False)
@@ -0,0 +1,29 @@
+# app/models/refresh_token.py
+
+from typing import Optional, TYPE_CHECKING
+from datetime import datetime, UTC
+from sqlmodel import Field, Relationship
+from app.db.base import Base
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+class RefreshToken(Base, table=True):
+    __tablename__ = "refresh_tokens"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", index=True)
+
+    # Only the SHA-256 digest of the token is stored, never the token itself
+    token_hash: str = Field(..., max_length=64, unique=True, index=True)
+
+    # Every token issued by rotation shares the family of the login that started it,
+    # so a reused token can revoke the whole chain at once
+    family_id: str = Field(..., max_length=32, index=True)
+
+    expires_at: datetime = Field(..., nullable=False)
+    revoked_at: Optional[datetime] = Field(default=None)
+    replaced_by_id: Optional[int] = Field(default=None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    # Relationship to User
+    user: "User" = Relationship(back_populates="refresh_tokens")
@@ -0,0 +1,30 @@
+# app.models.role_closure
+
+from typing import Optional
+from sqlmodel import Field
+from app.db.base import Base
+
+class RoleClosure(Base, table=True):
+    """
+    Transitive closure of the role hierarchy.
+
+    One row for every role that an ancestor role includes, directly or
+    through other roles, plus a row linking each role to itself. `paths`
+    counts the distinct paths from the ancestor to the descendant, which is
+    what lets an edge be removed without recomputing the whole closure.
+    Maintained by app.core.role_hierarchy.
+    """
+    __tablename__ = "role_closure"
+    ancestor_id: Optional[int] = Field(
+        default=None,
+        foreign_key="roles.id",
+        primary_key=True
+    )
+    # Indexed on its own to find the ancestors of a role
+    descendant_id: Optional[int] = Field(
+        default=None,
+        foreign_key="roles.id",
+        primary_key=True,
+        index=True
+    )
+    paths: int = Field(default=1, nullable=False)
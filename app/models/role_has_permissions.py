@@ -1,6 +1,7 @@
 # app.models.role_has_permissions
 
 from typing import Optional
+from datetime import datetime
 from sqlmodel import Field
 from app.db.base import Base
 
@@ -9,10 +10,13 @@ class RoleHasPermissions(Base, table=True):
     role_id: Optional[int] = Field(
         default=None,
         foreign_key="roles.id",
-        primary_key=True
+        primary_key=True,
+        ondelete="CASCADE"
     )
     permission_id: Optional[int] = Field(
         default=None,
         foreign_key="permissions.id",
         primary_key=True
     )
+    # Temporary grants are revoked at this time by app.core.grant_expiry; NULL never expires
+    expires_at: Optional[datetime] = Field(default=None, index=True)
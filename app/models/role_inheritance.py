@@ -0,0 +1,21 @@
+# app.models.role_inheritance
+
+from typing import Optional
+from sqlmodel import Field
+from app.db.base import Base
+
+class RoleInheritance(Base, table=True):
+    """A direct edge of the role hierarchy: the parent role includes the child role."""
+    __tablename__ = "role_inheritance"
+    parent_role_id: Optional[int] = Field(
+        default=None,
+        foreign_key="roles.id",
+        primary_key=True
+    )
+    # Indexed on its own to find the parents of a role
+    child_role_id: Optional[int] = Field(
+        default=None,
+        foreign_key="roles.id",
+        primary_key=True,
+        index=True
+    )
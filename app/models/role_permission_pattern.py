@@ -0,0 +1,19 @@
+# app.models.role_permission_pattern
+
+from typing import Optional
+from sqlmodel import Field
+from app.db.base import Base
+
+class RolePermissionPattern(Base, table=True):
+    """
+    A wildcard grant such as `read_*` or `*_grafana_source`, stored once per
+    role instead of one role_has_permissions row per matching permission.
+    """
+    __tablename__ = "role_permission_patterns"
+    role_id: Optional[int] = Field(
+        default=None,
+        foreign_key="roles.id",
+        primary_key=True,
+        ondelete="CASCADE"
+    )
+    pattern: str = Field(..., primary_key=True, max_length=100)
@@ -1,9 +1,11 @@
-# app/models/grafana_source.py
+# app/models/source.py
 
 from typing import Optional, TYPE_CHECKING
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship
 from enum import Enum
 from app.db.base import Base, TimestampMixin
+from app.models.data_source import SourceType
 
 if TYPE_CHECKING:
     from app.models.data_source import DataSource
@@ -25,11 +27,18 @@ class AuthType(str, Enum):
                     return member
         return None
     
-class GrafanaSource(Base, TimestampMixin, table=True):
-    __tablename__ = "grafana_sources"
+class Source(Base, TimestampMixin, table=True):
+    """A Grafana, Kibana, ... instance of a data source; `type` tells which."""
+    __tablename__ = "sources"
+    __table_args__ = (
+        # Loads the sources of a page of data sources, of one type or all, in one range scan
+        Index("ix_sources_data_source_id_type", "data_source_id", "type"),
+        Base.__table_args__,
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    data_source_id: int = Field(foreign_key="data_sources.id")
+    type: SourceType = Field(..., nullable=False)
+    data_source_id: int = Field(foreign_key="data_sources.id", ondelete="CASCADE")
 
     source_url: str = Field(..., nullable=False)
 
@@ -38,11 +47,10 @@ class GrafanaSource(Base, TimestampMixin, table=True):
 
     # For BASIC:
     auth_username: Optional[str] = Field(default=None)
-    auth_password: Optional[str] = Field(default=None)  # used only if auth_type == AuthType.BASIC
+    auth_password: Optional[str] = Field(default=None, max_length=2048)  # used only if auth_type == AuthType.BASIC, sealed
 
     # For Bearer Tokens:
-    bearer_token: Optional[str] = Field(default=None)  # used only if auth_type == AuthType.BEARER
+    bearer_token: Optional[str] = Field(default=None, max_length=2048)  # used only if auth_type == AuthType.BEARER, sealed
 
     # Relationship to DataSource
-    data_source: "DataSource" = Relationship(back_populates="grafana_sources")
-
+    data_source: "DataSource" = Relationship(back_populates="sources")
@@ -0,0 +1,20 @@
+# app.models.source_health
+
+from typing import Optional
+from datetime import datetime
+from sqlmodel import Field
+from app.db.base import Base
+from app.models.data_source import SourceType
+
+class SourceHealth(Base, table=True):
+    """Latest probe result of a Grafana or Kibana source, written by app.core.source_health."""
+    __tablename__ = "source_health"
+    source_type: SourceType = Field(primary_key=True)
+    # Id of the sources row
+    source_id: int = Field(primary_key=True)
+    # "up" or "down"
+    status: str = Field(..., max_length=16)
+    http_status: Optional[int] = Field(default=None)
+    latency_ms: Optional[int] = Field(default=None)
+    error: Optional[str] = Field(default=None, max_length=255)
+    checked_at: datetime = Field(..., nullable=False)
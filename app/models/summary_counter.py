@@ -0,0 +1,16 @@
+# app/models/summary_counter.py
+
+from sqlmodel import Field
+from app.db.base import Base
+
+class SummaryCounter(Base, table=True):
+    """
+    One bucket of a counter of app.core.summary_counters, e.g. the users of
+    role 3: updated in the transaction of every change to what it counts.
+    """
+    __tablename__ = "summary_counters"
+    # e.g. "users_per_role"
+    counter: str = Field(primary_key=True, max_length=32)
+    # e.g. the role id, as a string
+    bucket: str = Field(primary_key=True, max_length=64)
+    value: int = Field(default=0, nullable=False)
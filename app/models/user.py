@@ -1,12 +1,26 @@
 # app/models/user.py
 
 from typing import Optional, TYPE_CHECKING, List
+from datetime import datetime, UTC
+from sqlalchemy import and_, bindparam, or_
 from sqlmodel import Field, Relationship
 from app.db.base import Base, TimestampMixin
+from app.models.user_has_roles import UserHasRoles
 
 if TYPE_CHECKING:
     from app.models.role import Role
     from app.models.data_source import DataSource
+    from app.models.refresh_token import RefreshToken
+    from app.models.api_key import ApiKey
+    from app.models.data_source_acl import DataSourceAcl
+
+UHR = UserHasRoles.__table__
+
+def _unexpired_membership():
+    # The time is taken when the query runs; grants past expires_at no longer
+    # count even before app.core.grant_expiry removes them
+    now = bindparam("uhr_now", type_=UHR.c.expires_at.type, callable_=lambda: datetime.now(UTC))
+    return and_(User.id == UHR.c.user_id, or_(UHR.c.expires_at.is_(None), UHR.c.expires_at > now))
 
 class User(Base, TimestampMixin, table=True):
     __tablename__ = "users"
@@ -16,11 +30,27 @@ class User(Base, TimestampMixin, table=True):
     password: str = Field(..., nullable=False)
     status: str = Field(default="active", nullable=False)
     
-    # Foreign key to Role
-    role_id: Optional[int] = Field(default=None, foreign_key="roles.id")
+    # Foreign key to the primary Role; it is always one of the user's roles too
+    role_id: Optional[int] = Field(default=None, foreign_key="roles.id", ondelete="SET NULL")
 
     # Relationship to Role
     role: "Role" = Relationship(back_populates="users")
 
+    # All unexpired roles of the user, including the primary one; written
+    # through app.core.effective_permissions, never through this collection
+    roles: List["Role"] = Relationship(link_model=UserHasRoles, sa_relationship_kwargs={
+        "primaryjoin": _unexpired_membership,
+        "viewonly": True,
+    })
+
     # Relationship to DataSource
     data_sources: List["DataSource"] = Relationship(back_populates="created_by")
+
+    # Relationship to RefreshToken
+    refresh_tokens: List["RefreshToken"] = Relationship(back_populates="user", cascade_delete=True)
+
+    # Relationship to ApiKey
+    api_keys: List["ApiKey"] = Relationship(back_populates="user", cascade_delete=True)
+
+    # Data sources granted to the user
+    data_source_acls: List["DataSourceAcl"] = Relationship(cascade_delete=True)
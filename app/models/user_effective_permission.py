@@ -0,0 +1,26 @@
+# app.models.user_effective_permission
+
+from typing import Optional
+from sqlmodel import Field
+from app.db.base import Base
+
+class UserEffectivePermission(Base, table=True):
+    """
+    Materialized union of the permissions of all of a user's roles.
+
+    Maintained by app.core.effective_permissions whenever a user's roles or a
+    role's permissions change, so a permission check is a single primary key
+    lookup however many roles the user holds.
+    """
+    __tablename__ = "user_effective_permissions"
+    user_id: Optional[int] = Field(
+        default=None,
+        foreign_key="users.id",
+        primary_key=True
+    )
+    permission_id: Optional[int] = Field(
+        default=None,
+        foreign_key="permissions.id",
+        primary_key=True,
+        index=True
+    )
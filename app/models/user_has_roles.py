@@ -0,0 +1,23 @@
+# app.models.user_has_roles
+
+from typing import Optional
+from datetime import datetime
+from sqlmodel import Field
+from app.db.base import Base
+
+class UserHasRoles(Base, table=True):
+    __tablename__ = "user_has_roles"
+    user_id: Optional[int] = Field(
+        default=None,
+        foreign_key="users.id",
+        primary_key=True
+    )
+    # Indexed on its own to find the members of a role
+    role_id: Optional[int] = Field(
+        default=None,
+        foreign_key="roles.id",
+        primary_key=True,
+        index=True
+    )
+    # Temporary grants are revoked at this time by app.core.grant_expiry; NULL never expires
+    expires_at: Optional[datetime] = Field(default=None, index=True)
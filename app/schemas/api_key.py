@@ -0,0 +1,30 @@
+# app/schemas/api_key.py
+
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class ApiKeyCreate(BaseModel):
+    """
+    Fields for creating an API key.
+    user_id defaults to the current user; role is the name of the role
+    the key is scoped to.
+    """
+    name: str
+    role: str
+    user_id: Optional[int] = None
+    expires_at: Optional[datetime] = None
+
+class ApiKeyRead(BaseModel):
+    id: int
+    name: str
+    key_prefix: str
+    user_id: int
+    role_id: int
+    expires_at: Optional[datetime] = None
+    last_used_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,28 @@
+# app/schemas/authz.py
+
+from typing import List, Optional
+from enum import Enum
+from pydantic import BaseModel, Field
+
+class ResourceType(str, Enum):
+    DATA_SOURCE = "data_source"
+    GRAFANA_SOURCE = "grafana_source"
+    KIBANA_SOURCE = "kibana_source"
+
+class ResourceRef(BaseModel):
+    type: ResourceType
+    id: int
+
+class AuthzCheck(BaseModel):
+    """Can `subject` (a user id) perform `action` (a permission name), optionally on `resource`?"""
+    subject: int
+    action: str
+    resource: Optional[ResourceRef] = None
+
+class AuthzDecisionRequest(BaseModel):
+    checks: List[AuthzCheck] = Field(..., max_length=1000)
+
+class AuthzDecision(BaseModel):
+    allowed: bool
+    # Why the check was denied; None when allowed
+    reason: Optional[str] = None
@@ -2,10 +2,9 @@
 
 from typing import List, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from app.models.data_source import SourceType
-from app.schemas.grafana_source import GrafanaSourceRead
-from app.schemas.kibana_source import KibanaSourceRead
+from app.schemas.source import SourceRead
 
 class DataSourceBase(BaseModel):
     type: SourceType
@@ -26,12 +25,20 @@ class DataSourceRead(DataSourceBase):
     created_by_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
-    grafana_sources: List[GrafanaSourceRead] = []
-    kibana_sources: List[KibanaSourceRead] = []
+    sources: List[SourceRead] = []
+    # The same sources split by type, as listed before sources shared a table
+    grafana_sources: List[SourceRead] = []
+    kibana_sources: List[SourceRead] = []
 
     class Config:
         from_attributes = True
 
+    @model_validator(mode='after')
+    def split_sources(self):
+        self.grafana_sources = [source for source in self.sources if source.type == SourceType.GRAFANA]
+        self.kibana_sources = [source for source in self.sources if source.type == SourceType.KIBANA]
+        return self
+
 class DataSourceUpdate(BaseModel):
     type: Optional[SourceType] = None
     name: Optional[str] = None
@@ -0,0 +1,20 @@
+# app/schemas/data_source_acl.py
+
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class DataSourceAclCreate(BaseModel):
+    """Grant a data source to exactly one of a user or a role."""
+    user_id: Optional[int] = None
+    role_id: Optional[int] = None
+
+class DataSourceAclRead(BaseModel):
+    id: int
+    data_source_id: int
+    user_id: Optional[int] = None
+    role_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
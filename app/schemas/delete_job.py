@@ -0,0 +1,21 @@
+# app/schemas/delete_job.py
+
+from typing import Dict, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class DeleteJobRead(BaseModel):
+    id: str
+    # "data_source" or "role"
+    kind: str
+    target_id: int
+    # "pending", "running", "done" or "failed"
+    status: str
+    # Rows deleted so far, by table
+    counts: Dict[str, int]
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,20 @@
+# app/schemas/grafana_dashboard.py
+
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class GrafanaDashboardRead(BaseModel):
+    id: int
+    grafana_source_id: int
+    uid: str
+    title: str
+    tags: List[str]
+    folder_uid: Optional[str] = None
+    folder_title: Optional[str] = None
+    # Path of the dashboard on its Grafana instance
+    url: str
+    synced_at: datetime
+
+    class Config:
+        from_attributes = True
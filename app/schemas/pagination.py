@@ -0,0 +1,8 @@
+# app/schemas/pagination.py
+
+from typing import Optional
+from pydantic import BaseModel
+
+class Pagination(BaseModel):
+    limit: int = 100
+    after_id: Optional[int] = None
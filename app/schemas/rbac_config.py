@@ -0,0 +1,37 @@
+# app/schemas/rbac_config.py
+
+from typing import Dict, List, Tuple
+from pydantic import BaseModel
+
+class RoleConfig(BaseModel):
+    # Permission names granted explicitly
+    permissions: List[str] = []
+    # Wildcard grants such as `read_*`
+    patterns: List[str] = []
+    # Names of the roles this role includes
+    children: List[str] = []
+
+class RbacConfig(BaseModel):
+    """The declarative RBAC state: permissions, roles and their grants, by name."""
+    version: int = 1
+    permissions: List[str] = []
+    roles: Dict[str, RoleConfig] = {}
+
+class RbacPlan(BaseModel):
+    """The changes that bring the database in line with an RbacConfig."""
+    permissions_created: List[str] = []
+    permissions_deleted: List[str] = []
+    roles_created: List[str] = []
+    roles_deleted: List[str] = []
+    # (role, permission) pairs
+    grants_added: List[Tuple[str, str]] = []
+    grants_removed: List[Tuple[str, str]] = []
+    # (role, pattern) pairs
+    patterns_added: List[Tuple[str, str]] = []
+    patterns_removed: List[Tuple[str, str]] = []
+    # (parent role, child role) pairs
+    children_added: List[Tuple[str, str]] = []
+    children_removed: List[Tuple[str, str]] = []
+
+    def is_empty(self) -> bool:
+        return not any(getattr(self, name) for name in type(self).model_fields)
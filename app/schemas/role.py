@@ -8,16 +8,23 @@ class RoleBase(BaseModel):
 
 class RoleCreate(RoleBase):
     permission_ids: Optional[List[int]] = None
+    permission_patterns: Optional[List[str]] = None
 
 class RoleUpdate(BaseModel):
     name: Optional[str] = None
 
+class RoleChildRequest(BaseModel):
+    child_role_id: int
+
 class RoleRead(BaseModel):
     id: int
     name: str
     created_at: datetime
     updated_at: datetime
     permissions: List[PermissionRead] = []
+    permission_patterns: List[str] = []
+    # Roles whose permissions this role inherits
+    child_role_ids: List[int] = []
 
     class Config:
         from_attributes = True
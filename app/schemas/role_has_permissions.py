@@ -1,6 +1,22 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
 
 
 class AssignPermissionsRequest(BaseModel):
-    permission_ids: List[int]
+    permission_ids: List[int] = []
+    # Wildcard grants such as `read_*` or `*_grafana_source`
+    patterns: List[str] = []
+    # Makes the `permission_ids` grants temporary; patterns are always permanent
+    expires_at: Optional[datetime] = None
+
+class BulkRolePermissionsRequest(BaseModel):
+    role_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    permission_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    # Makes the grants temporary; ignored when removing
+    expires_at: Optional[datetime] = None
+
+class RolePermissionChanges(BaseModel):
+    role_id: int
+    added: int = 0
+    removed: int = 0
@@ -0,0 +1,72 @@
+# app/schemas/source.py
+
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, model_validator
+from app.schemas.source_health import SourceHealthRead
+from app.models.data_source import SourceType
+from app.models.source import AuthType
+
+def validate_auth_fields(source):
+    """
+    Ensures that only relevant authentication fields are populated based on auth_type.
+    """
+    if source.auth_type == AuthType.BASIC:
+        if not source.auth_username or not source.auth_password:
+            raise ValueError("auth_username and auth_password must be set for BASIC auth")
+        if source.bearer_token:
+            raise ValueError("bearer_token should not be set for BASIC auth")
+    elif source.auth_type == AuthType.BEARER:
+        if not source.bearer_token:
+            raise ValueError("bearer_token must be set for BEARER auth")
+        if source.auth_username or source.auth_password:
+            raise ValueError("auth_username and auth_password should not be set for BEARER auth")
+    else:
+        raise ValueError("Invalid auth_type provided")
+    return source
+
+class SourceBase(BaseModel):
+    source_url: str
+    auth_type: AuthType
+
+class SourceCreate(SourceBase):
+    """
+    Fields for creating a source; its type comes from the route
+    (/sources/grafana/, /kibana-sources/, ...).
+    """
+    auth_username: Optional[str] = None
+    auth_password: Optional[str] = None
+    bearer_token: Optional[str] = None
+    data_source_id: int
+
+    @model_validator(mode='after')
+    def validate_auth_fields(self):
+        return validate_auth_fields(self)
+
+class SourceRead(SourceBase):
+    id: int
+    type: SourceType
+    data_source_id: int
+    created_at: datetime
+    updated_at: datetime
+    # Latest probe result, None until the source has been probed
+    health: Optional[SourceHealthRead] = None
+
+    class Config:
+        from_attributes = True
+
+class SourceUpdate(BaseModel):
+    source_url: Optional[str] = None
+    data_source_id: Optional[int] = None
+    auth_type: Optional[AuthType] = None
+    auth_username: Optional[str] = None
+    auth_password: Optional[str] = None
+    bearer_token: Optional[str] = None
+
+    @model_validator(mode='after')
+    def validate_auth_fields(self):
+        return validate_auth_fields(self)
+
+class SourceBulkUpdate(SourceUpdate):
+    """An item of a bulk update: the fields of SourceUpdate and the id of the source."""
+    id: int
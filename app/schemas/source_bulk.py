@@ -0,0 +1,18 @@
+# app/schemas/source_bulk.py
+
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class SourceBulkRequest(BaseModel):
+    # Create or update payloads, validated one by one so each item gets its own result
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+    # Write nothing unless every item is valid
+    atomic: bool = True
+
+class SourceBulkResult(BaseModel):
+    # Position of the item in the request
+    index: int
+    # "created", "updated" or "failed"
+    status: str
+    id: Optional[int] = None
+    errors: List[str] = []
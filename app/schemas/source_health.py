@@ -0,0 +1,16 @@
+# app/schemas/source_health.py
+
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+class SourceHealthRead(BaseModel):
+    # "up" or "down"
+    status: str
+    http_status: Optional[int] = None
+    latency_ms: Optional[int] = None
+    error: Optional[str] = None
+    checked_at: datetime
+
+    class Config:
+        from_attributes = True
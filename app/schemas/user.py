@@ -1,6 +1,6 @@
 # app/schemas/user.py
 
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, field_validator
 from app.models.role import Role
@@ -13,12 +13,16 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
     role: Optional[str] = "editor"
+    # Additional roles besides the primary one
+    roles: Optional[List[str]] = None
 
 class UserRead(UserBase):
     id: int
     created_at: datetime
     updated_at: datetime
-    role: str
+    # None once the primary role was deleted
+    role: Optional[str] = None
+    roles: List[str] = []
 
     @field_validator("role", mode="before")
     def extract_role_name(cls, v):
@@ -27,6 +31,10 @@ class UserRead(UserBase):
             return v.name
         return v
 
+    @field_validator("roles", mode="before")
+    def extract_role_names(cls, v):
+        return [r.name if isinstance(r, Role) else r for r in v]
+
     class Config:
         from_attributes = True
 
@@ -35,10 +43,19 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     status: Optional[str] = None
     role: Optional[str] = None
+    # Replaces the additional roles besides the primary one
+    roles: Optional[List[str]] = None
+
+class UserRoleGrant(BaseModel):
+    role: str
+    # The role is revoked at this time; None grants it permanently
+    expires_at: Optional[datetime] = None
 
 class UserPermissions(UserBase):
     id: int
     role: Role 
+    roles: list[str] = []
+    role_ids: list[int] = []
     permissions: list[str] = []
 
     class Config:
@@ -0,0 +1,72 @@
+"""
+Shared setup of the benchmarks: the settings they need and a fresh database
+(in-memory SQLite unless `--database-url` points at e.g. a scratch MySQL).
+Run them from the repository root, e.g. `python -m benchmarks.role_closure`.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+for key, value in dict(
+    PROJECT_NAME="Anveshan", JWT_SECRET_KEY="benchmark", ALGORITHM="HS256", ACCESS_TOKEN_EXPIRE_MINUTES="15",
+    DATABASE_USER="benchmark", DATABASE_PASSWORD="benchmark", DATABASE_HOST="localhost", DATABASE_PORT="3306",
+    DATABASE_NAME="benchmark", SOURCE_HEALTH_PROBE_ENABLED="false", DASHBOARD_SYNC_ENABLED="false",
+).items():
+    os.environ.setdefault(key, value)
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine
+import app.db.database as database
+
+
+def parser(description: str, database_url: str = "sqlite://") -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--database-url", default=database_url,
+                        help="Database to run against; its tables are dropped and recreated.")
+    return parser
+
+def setup_database(url: str) -> Engine:
+    """Point the app at a fresh database with every table created."""
+    if url == "sqlite://":
+        # One shared connection: only for benchmarks that do not query from several threads at once
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    elif url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+    else:
+        engine = create_engine(url)
+    database.engine = engine
+    # Registers every model with the metadata
+    import app.main  # noqa: F401
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+class Timings:
+    """Collects named durations and prints them as a table."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def measure(self, name: str):
+        start = time.perf_counter()
+        yield
+        self.samples.setdefault(name, []).append(time.perf_counter() - start)
+
+    def repeat(self, name: str, n: int, fn: Callable[[], None]) -> None:
+        for _ in range(n):
+            with self.measure(name):
+                fn()
+
+    def report(self) -> None:
+        print(f"{'operation':<44} {'n':>6} {'median ms':>10} {'p95 ms':>10} {'total ms':>10}")
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            print(f"{name:<44} {len(samples):>6} {statistics.median(samples) * 1000:>10.2f} "
+                  f"{p95 * 1000:>10.2f} {sum(samples) * 1000:>10.2f}")
@@ -0,0 +1,98 @@
+"""
+Benchmark of the role closure table on a deep hierarchy (a chain of `--depth`
+roles) and a wide one (one parent with `--width` children): edge inserts and
+removals, resolving a user's permissions through the closure, and a full
+rebuild.
+
+    python -m benchmarks.role_closure [--depth 10] [--width 1000] [--database-url URL]
+"""
+
+from benchmarks.common import Timings, parser, setup_database
+
+from sqlalchemy import insert
+from sqlmodel import Session
+from app.core import role_hierarchy
+from app.core.effective_permissions import refresh_users, set_user_roles, user_permission_names
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.role_has_permissions import RoleHasPermissions
+from app.models.user import User
+
+PERMISSIONS_PER_ROLE = 5
+
+
+def create_roles(db: Session, prefix: str, n: int, first_permission: int) -> list:
+    """`n` roles, each granting its own PERMISSIONS_PER_ROLE permissions."""
+    roles = [Role(name=f"{prefix}-{i}") for i in range(n)]
+    db.add_all(roles)
+    db.flush()
+    db.exec(insert(Permission.__table__), params=[
+        {"id": first_permission + i, "name": f"{prefix}-permission-{i}"} for i in range(n * PERMISSIONS_PER_ROLE)
+    ])
+    db.exec(insert(RoleHasPermissions.__table__), params=[
+        {"role_id": role.id, "permission_id": first_permission + i * PERMISSIONS_PER_ROLE + j}
+        for i, role in enumerate(roles) for j in range(PERMISSIONS_PER_ROLE)
+    ])
+    for role in roles:
+        role_hierarchy.add_role(db, role.id)
+    db.commit()
+    return [role.id for role in roles]
+
+def resolve_user(db: Session, user_id: int) -> None:
+    refresh_users(db, [user_id])
+    user_permission_names(db, user_id)
+    db.rollback()
+
+def main() -> None:
+    args = parser(__doc__.strip().splitlines()[0])
+    args.add_argument("--depth", type=int, default=10)
+    args.add_argument("--width", type=int, default=1000)
+    args = args.parse_args()
+    engine = setup_database(args.database_url)
+    timings = Timings()
+
+    with Session(engine) as db:
+        chain = create_roles(db, "deep", args.depth, 1)
+        fan = create_roles(db, "wide", args.width + 1, 1 + args.depth * PERMISSIONS_PER_ROLE)
+        root, children = fan[0], fan[1:]
+        user = User(name="bench", email="bench@example.com", password="x", status="active", role_id=chain[0])
+        db.add(user)
+        db.flush()
+        set_user_roles(db, user.id, [chain[0], root])
+        db.commit()
+
+        # Deep: link the chain top-down, then unlink and relink its middle edge
+        for parent, child in zip(chain, chain[1:]):
+            with timings.measure(f"depth {args.depth}: add edge"):
+                role_hierarchy.add_edge(db, parent, child)
+                db.commit()
+        middle = args.depth // 2
+        for _ in range(20):
+            with timings.measure(f"depth {args.depth}: remove middle edge"):
+                role_hierarchy.remove_edge(db, chain[middle - 1], chain[middle])
+                db.commit()
+            with timings.measure(f"depth {args.depth}: re-add middle edge"):
+                role_hierarchy.add_edge(db, chain[middle - 1], chain[middle])
+                db.commit()
+        with timings.measure(f"depth {args.depth}: cycle check"):
+            assert role_hierarchy.creates_cycle(db, chain[-1], chain[0])
+
+        # Wide: one parent including every child
+        for child in children:
+            with timings.measure(f"width {args.width}: add edge"):
+                role_hierarchy.add_edge(db, root, child)
+                db.commit()
+        for child in children[:100]:
+            with timings.measure(f"width {args.width}: remove edge"):
+                role_hierarchy.remove_edge(db, root, child)
+                db.commit()
+
+        timings.repeat("resolve a user's permissions (both trees)", 20, lambda: resolve_user(db, user.id))
+        with timings.measure("full closure rebuild"):
+            role_hierarchy.rebuild_closure(db)
+            db.commit()
+
+    timings.report()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Throughput and latency of the source proxy against a local stub upstream,
+compared with calling the stub directly and with a plain source read, plus
+the rate of a large download streamed through the proxy. The app runs in
+process behind httpx's ASGI transport, so the numbers include the load
+generator's own overhead.
+
+    python -m benchmarks.source_proxy [--requests 500] [--concurrency 50] [--download-mb 100]
+"""
+
+from benchmarks.common import parser, setup_database
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+import httpx
+
+
+async def run_load(client: httpx.AsyncClient, url: str, requests: int, concurrency: int, **kwargs) -> List[float]:
+    """Latencies of `requests` GETs of `url`, at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(url, **kwargs)
+            assert response.status_code == 200, response.text
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+def report(name: str, latencies: List[float], elapsed: float) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<28} {len(latencies) / elapsed:>9.0f} {statistics.median(ordered) * 1000:>10.2f} {p95 * 1000:>10.2f}")
+
+async def benchmark(args) -> None:
+    from sqlmodel import Session
+    from app.core.init_db import seed_db
+    from app.core.source_proxy import ResponseCache, source_proxy
+    from app.db import database
+    from app.main import app
+    from app.models.data_source import DataSource, SourceType
+    from app.models.source import AuthType, Source
+    from tests.stub_http import StubServer
+
+    stub = StubServer().start()
+    stub.route("GET", "/api/health", 200, {"database": "ok", "version": "11.0.0"})
+    stub.route("GET", "/download", 200, b"x" * (args.download_mb << 20))
+
+    seed_db()
+    with Session(database.engine) as db:
+        data_source = DataSource(name="benchmark", type=SourceType.GRAFANA)
+        db.add(data_source)
+        db.flush()
+        source = Source(type=SourceType.GRAFANA, data_source_id=data_source.id, source_url=stub.url,
+                        auth_type=AuthType.BEARER, bearer_token="token")
+        db.add(source)
+        db.commit()
+        source_id = source.id
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=120) as client, \
+                httpx.AsyncClient(timeout=120) as direct:
+            response = await client.post("/api/v1/auth/login",
+                                         json={"email": "admin@example.com", "password": "adminpassword"})
+            headers = {"Authorization": f"Bearer {response.json()['data']['access_token']['token']}"}
+            proxy = f"/api/v1/sources/grafana/{source_id}/proxy"
+
+            print(f"{'scenario':<28} {'req/s':>9} {'p50 ms':>10} {'p95 ms':>10}")
+            scenarios = [
+                ("stub, direct", direct, f"{stub.url}/api/health", {}),
+                ("source read endpoint", client, f"/api/v1/sources/grafana/{source_id}", {"headers": headers}),
+                ("proxy", client, f"{proxy}/api/health", {"headers": headers}),
+            ]
+            for name, http, url, kwargs in scenarios:
+                started = time.perf_counter()
+                latencies = await run_load(http, url, args.requests, args.concurrency, **kwargs)
+                report(name, latencies, time.perf_counter() - started)
+
+            source_proxy.cache = ResponseCache(ttl=60, max_bytes=1 << 20, max_entries=100)
+            started = time.perf_counter()
+            latencies = await run_load(client, f"{proxy}/api/health", args.requests, args.concurrency, headers=headers)
+            report("proxy, cached", latencies, time.perf_counter() - started)
+
+            started = time.perf_counter()
+            size = 0
+            async with client.stream("GET", f"{proxy}/download", headers=headers) as response:
+                async for chunk in response.aiter_raw():
+                    size += len(chunk)
+            elapsed = time.perf_counter() - started
+            print(f"streamed download: {size >> 20} MB in {elapsed:.2f} s, {(size >> 20) / elapsed:.0f} MB/s")
+    stub.stop()
+
+def main() -> None:
+    # Requests are served from several threads at once, so not the shared in-memory database
+    args = parser(__doc__.strip().splitlines()[0], "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db"))
+    args.add_argument("--requests", type=int, default=500)
+    args.add_argument("--concurrency", type=int, default=50)
+    args.add_argument("--download-mb", type=int, default=100)
+    args = args.parse_args()
+    setup_database(args.database_url)
+    asyncio.run(benchmark(args))
+
+if __name__ == "__main__":
+    main()
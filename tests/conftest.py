@@ -0,0 +1,84 @@
+"""
+Fixtures shared by the tests: the app on an in-memory SQLite database,
+recreated and seeded for every test, and a client logged in as the seeded admin.
+"""
+
+import os
+import tempfile
+
+_var = tempfile.mkdtemp(prefix="anveshan-tests-")
+for key, value in dict(
+    PROJECT_NAME="Anveshan", JWT_SECRET_KEY="test-secret", ALGORITHM="HS256", ACCESS_TOKEN_EXPIRE_MINUTES="15",
+    DATABASE_USER="test", DATABASE_PASSWORD="test", DATABASE_HOST="localhost", DATABASE_PORT="3306",
+    DATABASE_NAME="test", AUTHZ_SNAPSHOT_PATH=os.path.join(_var, "authz.snapshot"),
+    AUTHZ_PERSIST_PATH=os.path.join(_var, "authz.persist"), SOURCE_HEALTH_PROBE_ENABLED="false",
+    DASHBOARD_SYNC_ENABLED="false",
+).items():
+    os.environ.setdefault(key, value)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+# Swap the MySQL engine for SQLite before any module imports it by name
+import app.db.database as database
+database.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+from app.core.grant_expiry import grant_expiry_sweeper
+from app.core.init_db import seed_db
+from app.main import app
+from tests.stub_http import StubServer
+
+ADMIN = {"email": "admin@example.com", "password": "adminpassword"}
+
+
+@pytest.fixture
+def db_engine():
+    SQLModel.metadata.drop_all(database.engine)
+    SQLModel.metadata.create_all(database.engine)
+    seed_db()
+    return database.engine
+
+@pytest.fixture
+def db(db_engine):
+    with Session(db_engine) as session:
+        yield session
+
+@pytest.fixture
+def client(db_engine):
+    # The sweeper still points at the event loop of the previous test's app
+    grant_expiry_sweeper._loop = grant_expiry_sweeper._wakeup = None
+    with TestClient(app) as client:
+        yield client
+
+def login(client: TestClient, email: str, password: str) -> dict:
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']['token']}"}
+
+@pytest.fixture
+def stub_server():
+    """A local HTTP server standing in for a Grafana or Kibana instance."""
+    server = StubServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def admin(client):
+    """Authorization headers of the seeded admin."""
+    return login(client, **ADMIN)
+
+def create_user(client: TestClient, admin: dict, db: Session, name: str, permissions: list) -> dict:
+    """Create a user with a role of its own granting `permissions`; returns their login headers."""
+    from sqlmodel import select
+    from app.models.permission import Permission
+    permission_ids = list(db.exec(select(Permission.id).where(Permission.name.in_(permissions))).all())
+    assert len(permission_ids) == len(permissions)
+    response = client.post("/api/v1/roles/", json={"name": name, "permission_ids": permission_ids}, headers=admin)
+    assert response.status_code == 201, response.text
+    email = f"{name}@example.com"
+    response = client.post("/api/v1/users/", json={"name": name, "email": email, "password": "password", "role": name},
+                           headers=admin)
+    assert response.status_code == 201, response.text
+    return login(client, email, "password")
@@ -0,0 +1,90 @@
+"""
+A local HTTP server standing in for Grafana and Kibana: routes answer with a
+canned status, headers and body (optionally after a delay), or with a
+function of the request; every request is recorded.
+"""
+
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import json
+import threading
+import time
+
+
+@dataclass
+class StubRequest:
+    method: str
+    path: str
+    query: str
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self):
+        return json.loads(self.body)
+
+@dataclass
+class StubRoute:
+    status: int = 200
+    body: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    delay: float = 0.0
+    handler: Optional[Callable[[StubRequest], Tuple[int, Dict[str, str], bytes]]] = None
+
+
+class StubServer:
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], StubRoute] = {}
+        self.requests: List[StubRequest] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _serve(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                request = StubRequest(self.command, url.path, url.query,
+                                      {k.lower(): v for k, v in self.headers.items()}, self.rfile.read(length))
+                stub.requests.append(request)
+                route = stub.routes.get((self.command, url.path)) or StubRoute(status=404, body=b"not found")
+                if route.delay:
+                    time.sleep(route.delay)
+                if route.handler is not None:
+                    status, headers, body = route.handler(request)
+                else:
+                    status, headers, body = route.status, route.headers, route.body
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _serve
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, method: str, path: str, status: int = 200, body=b"", headers: Optional[Dict[str, str]] = None,
+              delay: float = 0.0, handler=None) -> None:
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        self.routes[(method, path)] = StubRoute(status, body, headers or {}, delay, handler)
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
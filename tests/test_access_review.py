@@ -0,0 +1,32 @@
+import csv
+import io
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import insert
+from sqlmodel import select
+from app.core.access_review import load_access_review
+from app.models.role import Role
+from app.models.user import User
+from app.models.user_has_roles import UserHasRoles
+from tests.conftest import create_user
+
+
+def test_expired_membership_not_yet_swept_is_not_reported(client, admin, db):
+    create_user(client, admin, db, "auditor", ["read_access_review"])
+    create_user(client, admin, db, "deleter", ["delete_data_source"])
+    auditor = db.exec(select(User).where(User.email == "auditor@example.com")).one()
+    deleter_role = db.exec(select(Role).where(Role.name == "deleter")).one()
+    # As left behind by a membership that expired before the sweeper ran
+    db.exec(insert(UserHasRoles.__table__).values(
+        user_id=auditor.id, role_id=deleter_role.id, expires_at=datetime.now(UTC) - timedelta(minutes=1)
+    ))
+    db.commit()
+
+    review = load_access_review(db)
+    assert review.role_member_counts()[deleter_role.id] == 1
+
+    response = client.get("/api/v1/reports/access-review", params={"report": "matrix"}, headers=admin)
+    assert response.status_code == 200
+    rows = {row["email"]: row for row in csv.DictReader(io.StringIO(response.text))}
+    assert rows["auditor@example.com"]["read_access_review"] == "1"
+    assert rows["auditor@example.com"]["delete_data_source"] == "0"
+    assert rows["deleter@example.com"]["delete_data_source"] == "1"
@@ -0,0 +1,29 @@
+from tests.conftest import create_user
+
+
+def test_key_for_own_role(client, admin, db):
+    headers = create_user(client, admin, db, "keymaker", ["create_api_key"])
+    response = client.post("/api/v1/api-keys/", json={"name": "ci", "role": "keymaker"}, headers=headers)
+    assert response.status_code == 201, response.text
+    key = response.json()["data"]["key"]
+    # The key authenticates as its role
+    response = client.post("/api/v1/api-keys/", json={"name": "ci2", "role": "keymaker"}, headers={"X-API-Key": key})
+    assert response.status_code == 201, response.text
+
+def test_key_for_more_powerful_role_is_refused(client, admin, db):
+    headers = create_user(client, admin, db, "keymaker", ["create_api_key"])
+    response = client.post("/api/v1/api-keys/", json={"name": "escalate", "role": "admin"}, headers=headers)
+    assert response.status_code == 403
+    assert "delete_user" in response.json()["data"]["role"]
+
+def test_key_for_another_user_is_refused(client, admin, db):
+    headers = create_user(client, admin, db, "keymaker", ["create_api_key"])
+    response = client.post("/api/v1/api-keys/", json={"name": "theirs", "role": "keymaker", "user_id": 1},
+                           headers=headers)
+    assert response.status_code == 403
+
+def test_admin_may_create_keys_for_others(client, admin, db):
+    create_user(client, admin, db, "keymaker", ["create_api_key"])
+    response = client.post("/api/v1/api-keys/", json={"name": "theirs", "role": "keymaker", "user_id": 2},
+                           headers=admin)
+    assert response.status_code == 201, response.text
@@ -0,0 +1,41 @@
+from datetime import datetime, UTC
+import pytest
+from app.api.v1.endpoints import grafana_dashboards
+from app.core.dashboard_catalog import DashboardCatalog
+from app.models.grafana_dashboard import GrafanaDashboard
+from tests.conftest import create_user
+from tests.test_data_source_acl import CREDENTIALS, create_data_source, create_source, grant
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    """A catalog with an empty index, in place of the app's."""
+    catalog = DashboardCatalog(sync_enabled=False, interval=60, concurrency=1, timeout=1)
+    monkeypatch.setattr(grafana_dashboards, "dashboard_catalog", catalog)
+    return catalog
+
+def titles(client, headers) -> list:
+    response = client.get("/api/v1/grafana-dashboards/", params={"q": "latency"}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [dashboard["title"] for dashboard in response.json()["data"]["grafana_dashboards"]]
+
+
+def test_moving_a_source_hides_its_dashboards(client, admin, db, catalog):
+    granted, other = create_data_source(client, admin, "granted"), create_data_source(client, admin, "other")
+    source_id = create_source(client, admin, granted)
+    db.add(GrafanaDashboard(grafana_source_id=source_id, uid="abc", title="Latency", url="/d/abc",
+                            fingerprint="f" * 32, synced_at=datetime.now(UTC)))
+    db.commit()
+    viewer = create_user(client, admin, db, "viewer", ["read_grafana_source"])
+    grant(client, admin, db, granted, "viewer")
+    assert catalog.refresh()
+    assert titles(client, viewer) == ["Latency"]
+
+    response = client.put(f"/api/v1/sources/grafana/{source_id}", json={"data_source_id": other, **CREDENTIALS},
+                          headers=admin)
+    assert response.status_code == 200, response.text
+    # Hidden even before the index catches up
+    assert titles(client, viewer) == []
+    assert catalog.refresh()
+    assert titles(client, viewer) == []
+    assert titles(client, admin) == ["Latency"]
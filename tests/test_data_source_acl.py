@@ -0,0 +1,114 @@
+import pytest
+from sqlmodel import select
+from app.models.role import Role
+from app.models.source import Source
+from tests.conftest import create_user
+
+WRITER_PERMISSIONS = [
+    "update_data_source", "delete_data_source",
+    "create_grafana_source", "update_grafana_source", "delete_grafana_source",
+]
+CREDENTIALS = {"auth_type": "bearer", "bearer_token": "token"}
+
+
+def create_data_source(client, admin, name: str) -> int:
+    response = client.post("/api/v1/data-sources/", json={"name": name, "type": "grafana"}, headers=admin)
+    assert response.status_code == 201, response.text
+    return response.json()["data"]["data_source"]["id"]
+
+def create_source(client, admin, data_source_id: int) -> int:
+    response = client.post("/api/v1/sources/grafana/", json={
+        "data_source_id": data_source_id, "source_url": "http://grafana.local", **CREDENTIALS,
+    }, headers=admin)
+    assert response.status_code == 201, response.text
+    return response.json()["data"]["grafana_source"]["id"]
+
+def grant(client, admin, db, data_source_id: int, role_name: str) -> None:
+    role_id = db.exec(select(Role.id).where(Role.name == role_name)).one()
+    response = client.post(f"/api/v1/data-sources/{data_source_id}/acl", json={"role_id": role_id}, headers=admin)
+    assert response.status_code == 201, response.text
+
+@pytest.fixture
+def setup(client, admin, db):
+    """A writer granted data source `visible` but not `hidden`, each with one source."""
+    visible, hidden = create_data_source(client, admin, "visible"), create_data_source(client, admin, "hidden")
+    sources = {"visible": create_source(client, admin, visible), "hidden": create_source(client, admin, hidden)}
+    writer = create_user(client, admin, db, "writer", WRITER_PERMISSIONS)
+    grant(client, admin, db, visible, "writer")
+    return writer, {"visible": visible, "hidden": hidden}, sources
+
+
+def test_hidden_data_sources_cannot_be_changed(client, setup):
+    writer, data_sources, _ = setup
+    hidden = data_sources["hidden"]
+    assert client.put(f"/api/v1/data-sources/{hidden}", json={"name": "mine"}, headers=writer).status_code == 404
+    assert client.delete(f"/api/v1/data-sources/{hidden}", headers=writer).status_code == 404
+    assert client.delete(f"/api/v1/data-sources/{hidden}?async=true", headers=writer).status_code == 404
+
+    visible = data_sources["visible"]
+    assert client.put(f"/api/v1/data-sources/{visible}", json={"name": "renamed"}, headers=writer).status_code == 200
+
+def test_hidden_sources_cannot_be_changed(client, admin, db, setup):
+    writer, _, sources = setup
+    hidden = sources["hidden"]
+    response = client.put(f"/api/v1/sources/grafana/{hidden}", json={"source_url": "http://attacker.example",
+                                                                **CREDENTIALS}, headers=writer)
+    assert response.status_code == 404
+    response = client.put("/api/v1/sources/grafana/bulk", json={"items": [
+        {"id": hidden, "source_url": "http://attacker.example", **CREDENTIALS},
+    ]}, headers=writer)
+    assert response.status_code == 400
+    assert response.json()["data"]["items"][0]["errors"] == ["Grafana source not found"]
+    assert client.delete(f"/api/v1/sources/grafana/{hidden}", headers=writer).status_code == 404
+
+    source = db.get(Source, hidden)
+    db.refresh(source)
+    assert source.source_url == "http://grafana.local"
+
+def test_sources_cannot_be_attached_to_hidden_data_sources(client, setup):
+    writer, data_sources, sources = setup
+    hidden = data_sources["hidden"]
+    body = {"data_source_id": hidden, "source_url": "http://grafana.local", **CREDENTIALS}
+    response = client.post("/api/v1/sources/grafana/", json=body, headers=writer)
+    assert response.status_code == 400
+    assert response.json()["message"] == "Associated DataSource not found"
+    response = client.post("/api/v1/sources/grafana/bulk", json={"items": [body]}, headers=writer)
+    assert response.status_code == 400
+    assert response.json()["data"]["items"][0]["errors"] == ["Associated DataSource not found"]
+
+    visible = sources["visible"]
+    response = client.put(f"/api/v1/sources/grafana/{visible}", json={"data_source_id": hidden, **CREDENTIALS},
+                          headers=writer)
+    assert response.status_code == 400
+    response = client.put("/api/v1/sources/grafana/bulk", json={"items": [
+        {"id": visible, "data_source_id": hidden, **CREDENTIALS},
+    ]}, headers=writer)
+    assert response.status_code == 400
+    assert response.json()["data"]["items"][0]["errors"] == ["Associated DataSource not found"]
+
+    response = client.put(f"/api/v1/sources/grafana/{visible}", json={"source_url": "http://grafana2.local",
+                                                                   **CREDENTIALS}, headers=writer)
+    assert response.status_code == 200, response.text
+
+def test_grants_and_revokes_reach_the_source_feed(client, admin, db):
+    data_source_id = create_data_source(client, admin, "metrics")
+    source_id = create_source(client, admin, data_source_id)
+    viewer = create_user(client, admin, db, "viewer", ["read_grafana_source"])
+
+    def changes(cursor):
+        response = client.get("/api/v1/sources/changes", params={"cursor": cursor}, headers=viewer)
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        return [(change["id"], change["deleted"]) for change in data["changes"]], data["cursor"]
+
+    seen, cursor = changes(None)
+    assert seen == [(source_id, True)]
+
+    grant(client, admin, db, data_source_id, "viewer")
+    seen, cursor = changes(cursor)
+    assert seen == [(source_id, False)]
+
+    acl_id = client.get(f"/api/v1/data-sources/{data_source_id}/acl", headers=admin).json()["data"]["acl"][0]["id"]
+    assert client.delete(f"/api/v1/data-sources/{data_source_id}/acl/{acl_id}", headers=admin).status_code == 200
+    seen, cursor = changes(cursor)
+    assert seen == [(source_id, True)]
@@ -0,0 +1,91 @@
+import json
+import pytest
+from sqlmodel import select
+from app.api.v1.endpoints import kibana_saved_objects
+from app.core.kibana_search import ERROR, OK, TIMEOUT, KibanaSearch, ResultCache
+from app.models.role import Role
+from tests.conftest import create_user
+
+FIND = "/api/saved_objects/_find"
+
+
+def create_kibana_source(client, admin, name: str, source_url: str) -> int:
+    response = client.post("/api/v1/data-sources/", json={"name": name, "type": "kibana"}, headers=admin)
+    assert response.status_code == 201, response.text
+    data_source_id = response.json()["data"]["data_source"]["id"]
+    response = client.post("/api/v1/sources/kibana/", json={
+        "data_source_id": data_source_id, "source_url": source_url, "auth_type": "bearer", "bearer_token": name,
+    }, headers=admin)
+    assert response.status_code == 201, response.text
+    return data_source_id
+
+def saved_objects(*titles: str) -> dict:
+    return {"saved_objects": [
+        {"id": title.lower(), "type": "dashboard", "attributes": {"title": title}, "score": 1.0}
+        for title in titles
+    ]}
+
+@pytest.fixture
+def search(client, monkeypatch):
+    """A search with its own cache and a short deadline, in place of the app's."""
+    search = KibanaSearch(concurrency=10, connections_per_host=2, timeout=0.5, deadline=1.0,
+                          cache=ResultCache(ttl=60, max_entries=100))
+    monkeypatch.setattr(kibana_saved_objects, "kibana_search", search)
+    yield search
+    client.portal.call(search.aclose)
+
+
+def test_one_failing_source_does_not_fail_the_search(client, admin, stub_server, search):
+    create_kibana_source(client, admin, "logs", f"{stub_server.url}/logs")
+    create_kibana_source(client, admin, "audit", f"{stub_server.url}/audit")
+    create_kibana_source(client, admin, "slow", f"{stub_server.url}/slow")
+    stub_server.route("GET", f"/logs{FIND}", 200, saved_objects("Errors", "Error rates"))
+    stub_server.route("GET", f"/audit{FIND}", 500, b"internal error")
+    stub_server.route("GET", f"/slow{FIND}", 200, saved_objects("Errors by host"), delay=2.0)
+
+    response = client.get("/api/v1/kibana-saved-objects/", params={"q": "errors"}, headers=admin)
+    assert response.status_code == 200, response.text
+    result = response.json()["data"]
+    assert [(s["status"], s["error"]) for s in result["sources"]] == [
+        (OK, None), (ERROR, "HTTP 500"), (TIMEOUT, "The source did not answer in time"),
+    ]
+    assert [obj["title"] for obj in result["saved_objects"]] == ["Errors", "Error rates"]
+
+    # Only the source that answered is cached; the others are asked again
+    stub_server.requests.clear()
+    result = client.get("/api/v1/kibana-saved-objects/", params={"q": "errors"}, headers=admin).json()["data"]
+    assert [s["cached"] for s in result["sources"]] == [True, False, False]
+    assert sorted(r.path for r in stub_server.requests) == [f"/audit{FIND}", f"/slow{FIND}"]
+
+def test_stream_reports_each_source(client, admin, stub_server, search):
+    create_kibana_source(client, admin, "logs", f"{stub_server.url}/logs")
+    create_kibana_source(client, admin, "audit", f"{stub_server.url}/audit")
+    stub_server.route("GET", f"/logs{FIND}", 200, saved_objects("Errors"))
+    stub_server.route("GET", f"/audit{FIND}", 503, b"unavailable")
+
+    response = client.get("/api/v1/kibana-saved-objects/", params={"q": "errors", "stream": True}, headers=admin)
+    assert response.status_code == 200
+    *sources, merged = [line for line in response.iter_lines() if line]
+    assert sorted(json.loads(line)["status"] for line in sources) == [ERROR, OK]
+    assert [obj["title"] for obj in json.loads(merged)["saved_objects"]] == ["Errors"]
+
+def test_searches_only_granted_sources(client, admin, db, stub_server, search):
+    granted = create_kibana_source(client, admin, "logs", f"{stub_server.url}/logs")
+    create_kibana_source(client, admin, "audit", f"{stub_server.url}/audit")
+    stub_server.route("GET", f"/logs{FIND}", 200, saved_objects("Errors"))
+    stub_server.route("GET", f"/audit{FIND}", 200, saved_objects("Errors in audit"))
+    analyst = create_user(client, admin, db, "analyst", ["read_kibana_source"])
+    role_id = db.exec(select(Role.id).where(Role.name == "analyst")).one()
+    response = client.post(f"/api/v1/data-sources/{granted}/acl", json={"role_id": role_id}, headers=admin)
+    assert response.status_code == 201, response.text
+
+    result = client.get("/api/v1/kibana-saved-objects/", params={"q": "errors"}, headers=analyst).json()["data"]
+    assert len(result["sources"]) == 1
+    assert [obj["title"] for obj in result["saved_objects"]] == ["Errors"]
+    # The other source is not even asked
+    assert [r.path for r in stub_server.requests] == [f"/logs{FIND}"]
+
+    # Nor served from the cache filled by someone who may see it
+    client.get("/api/v1/kibana-saved-objects/", params={"q": "errors"}, headers=admin)
+    result = client.get("/api/v1/kibana-saved-objects/", params={"q": "errors"}, headers=analyst).json()["data"]
+    assert [obj["title"] for obj in result["saved_objects"]] == ["Errors"]
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import insert
+from sqlmodel import select
+from app.core.rbac_config import export_config
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.role_has_permissions import RoleHasPermissions
+
+RHP = RoleHasPermissions.__table__
+
+
+def test_apply_restores_an_expired_grant_not_yet_swept(client, admin, db):
+    response = client.post("/api/v1/roles/", json={"name": "analysts", "permission_ids": []}, headers=admin)
+    assert response.status_code == 201, response.text
+    role_id = db.exec(select(Role.id).where(Role.name == "analysts")).one()
+    permission_id = db.exec(select(Permission.id).where(Permission.name == "read_data_source")).one()
+    # As left behind by a grant that expired before the sweeper ran
+    db.exec(insert(RHP).values(role_id=role_id, permission_id=permission_id,
+                               expires_at=datetime.now(UTC) - timedelta(minutes=1)))
+    db.commit()
+
+    config = export_config(db)
+    assert config.roles["analysts"].permissions == []
+    config.roles["analysts"].permissions = ["read_data_source"]
+    response = client.post("/api/v1/rbac/apply", json=config.model_dump(), headers=admin)
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["plan"]["grants_added"] == [["analysts", "read_data_source"]]
+
+    db.expire_all()
+    assert db.exec(select(RHP.c.expires_at).where(RHP.c.role_id == role_id)).all() == [None]
+    assert export_config(db).roles["analysts"].permissions == ["read_data_source"]
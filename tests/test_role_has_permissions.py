@@ -0,0 +1,26 @@
+from sqlmodel import select
+from app.core.authz_versions import current_versions
+from app.models.permission import Permission
+from app.models.role import Role
+
+
+def test_idempotent_bulk_changes_leave_the_versions(client, admin, db):
+    response = client.post("/api/v1/roles/", json={"name": "analysts", "permission_ids": []}, headers=admin)
+    assert response.status_code == 201, response.text
+    role_id = db.exec(select(Role.id).where(Role.name == "analysts")).one()
+    permission_id = db.exec(select(Permission.id).where(Permission.name == "read_data_source")).one()
+    body = {"role_ids": [role_id], "permission_ids": [permission_id]}
+
+    response = client.post("/api/v1/role-has-permissions/bulk-assign", json=body, headers=admin)
+    assert response.json()["data"]["added"] == 1
+    versions = current_versions(db)
+    response = client.post("/api/v1/role-has-permissions/bulk-assign", json=body, headers=admin)
+    assert response.status_code == 200 and response.json()["data"]["added"] == 0
+    assert current_versions(db) == versions
+
+    response = client.post("/api/v1/role-has-permissions/bulk-remove", json=body, headers=admin)
+    assert response.json()["data"]["removed"] == 1
+    versions = current_versions(db)
+    response = client.post("/api/v1/role-has-permissions/bulk-remove", json=body, headers=admin)
+    assert response.status_code == 200 and response.json()["data"]["removed"] == 0
+    assert current_versions(db) == versions
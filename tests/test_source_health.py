@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, UTC
+from sqlmodel import select
+from app.core.source_health import DOWN, UP, ProbeTarget, SourceHealthCache, probe_all, write_results
+from app.models.data_source import DataSource, SourceType
+from app.models.source import AuthType, Source
+from app.models.source_health import SourceHealth
+
+
+def target(url: str, source_id: int = 1) -> ProbeTarget:
+    return ProbeTarget(SourceType.GRAFANA, source_id, url + "/api/health", AuthType.BEARER, None, None, "token")
+
+def test_probe_up(stub_server):
+    stub_server.route("GET", "/api/health", 200, {"database": "ok"})
+    [result] = asyncio.run(probe_all([target(stub_server.url)], concurrency=4, timeout=2))
+    assert result["status"] == UP
+    assert result["http_status"] == 200
+    assert result["error"] is None
+    assert result["latency_ms"] >= 0
+    assert stub_server.requests[0].headers["authorization"] == "Bearer token"
+
+def test_probe_http_error_is_down(stub_server):
+    stub_server.route("GET", "/api/health", 503, b"unavailable")
+    [result] = asyncio.run(probe_all([target(stub_server.url)], concurrency=4, timeout=2))
+    assert result["status"] == DOWN
+    assert result["http_status"] == 503
+    assert result["error"] == "HTTP 503"
+
+def test_probe_timeout_is_down(stub_server):
+    stub_server.route("GET", "/api/health", 200, b"late", delay=1.0)
+    [result] = asyncio.run(probe_all([target(stub_server.url)], concurrency=4, timeout=0.2))
+    assert result["status"] == DOWN
+    assert result["http_status"] is None
+    assert result["error"].startswith("ReadTimeout")
+
+def test_probe_all_keeps_target_order(stub_server):
+    stub_server.route("GET", "/api/health", 200, b"ok")
+    targets = [target(stub_server.url, source_id) for source_id in range(1, 21)]
+    results = asyncio.run(probe_all(targets, concurrency=3, timeout=2, connections_per_host=2))
+    assert [result["source_id"] for result in results] == list(range(1, 21))
+    assert {result["status"] for result in results} == {UP}
+
+def test_write_results_replaces_rows_and_drops_orphans(db):
+    data_source = DataSource(name="metrics", type=SourceType.GRAFANA)
+    db.add(data_source)
+    db.flush()
+    source = Source(type=SourceType.GRAFANA, data_source_id=data_source.id, source_url="http://grafana.local",
+                    auth_type=AuthType.BEARER, bearer_token="token")
+    db.add(source)
+    db.flush()
+    old = datetime(2020, 1, 1, tzinfo=UTC)
+    # A previous result of the source, and one of a source deleted since
+    db.add(SourceHealth(source_type=SourceType.GRAFANA, source_id=source.id, status=DOWN, checked_at=old))
+    db.add(SourceHealth(source_type=SourceType.GRAFANA, source_id=source.id + 1, status=UP, checked_at=old))
+    db.commit()
+
+    write_results(db, [{"source_type": SourceType.GRAFANA, "source_id": source.id, "status": UP, "http_status": 200,
+                        "latency_ms": 3, "error": None, "checked_at": datetime.now(UTC)}])
+    db.commit()
+    rows = db.exec(select(SourceHealth)).all()
+    assert [(row.source_id, row.status) for row in rows] == [(source.id, UP)]
+
+def test_cache_serves_replaced_results_and_reloads_stale_ones(db):
+    row = {"source_type": SourceType.KIBANA, "source_id": 7, "status": UP, "http_status": 200, "latency_ms": 1,
+           "error": None, "checked_at": datetime.now(UTC)}
+    cache = SourceHealthCache(max_age=60)
+    cache.replace([row])
+    assert cache.get(db, SourceType.KIBANA, 7).status == UP
+    assert cache.get(db, SourceType.GRAFANA, 7) is None
+
+    # A worker that did not probe reloads from the table once its copy is stale
+    db.add(SourceHealth(**{**row, "status": DOWN}))
+    db.commit()
+    stale = SourceHealthCache(max_age=0)
+    stale.replace([row])
+    assert stale.get(db, SourceType.KIBANA, 7).status == DOWN
@@ -0,0 +1,84 @@
+import pytest
+from app.core.source_proxy import ResponseCache, source_proxy
+from tests.test_sources import create_grafana_source
+
+
+@pytest.fixture
+def proxy_url(client, admin, stub_server, db):
+    from app.models.source import Source
+    source_id = create_grafana_source(client, admin)
+    source = db.get(Source, source_id)
+    source.source_url = stub_server.url
+    db.add(source)
+    db.commit()
+    return f"/api/v1/sources/grafana/{source_id}/proxy"
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(ttl=60, max_bytes=1024, max_entries=10)
+    monkeypatch.setattr(source_proxy, "cache", cache)
+    return cache
+
+
+def test_forwards_with_source_credentials_only(client, admin, stub_server, proxy_url):
+    stub_server.route("GET", "/api/search", 200, [{"uid": "abc"}],
+                      headers={"Set-Cookie": "grafana_session=secret", "X-Grafana-Version": "11"})
+    response = client.get(f"{proxy_url}/api/search", params={"query": "cpu"}, headers={
+        **admin, "Cookie": "session=caller", "Proxy-Authorization": "Basic eDp5", "Keep-Alive": "timeout=5",
+        "TE": "trailers", "Upgrade": "websocket", "X-Request-Id": "r1",
+    })
+    assert response.status_code == 200
+    assert response.json() == [{"uid": "abc"}]
+    # The upstream's session cookie stays on the server side
+    assert "set-cookie" not in response.headers
+    assert response.headers["x-grafana-version"] == "11"
+
+    [upstream] = stub_server.requests
+    assert upstream.path == "/api/search" and upstream.query == "query=cpu"
+    assert upstream.headers["authorization"] == "Bearer token"
+    for dropped in ("cookie", "proxy-authorization", "keep-alive", "te", "upgrade"):
+        assert dropped not in upstream.headers
+    assert upstream.headers["x-request-id"] == "r1"
+
+def test_forwards_request_bodies(client, admin, stub_server, proxy_url):
+    stub_server.route("POST", "/api/ds/query", handler=lambda request: (200, {}, request.body))
+    response = client.post(f"{proxy_url}/api/ds/query", content=b'{"queries": []}', headers=admin)
+    assert response.status_code == 200
+    assert response.content == b'{"queries": []}'
+
+@pytest.mark.parametrize("path", ["api/%2E%2E/admin", "%2E%2E/%2E%2E/etc/passwd"])
+def test_rejects_parent_segments(client, admin, stub_server, proxy_url, path):
+    response = client.get(f"{proxy_url}/{path}", headers=admin)
+    assert response.status_code == 400
+    assert response.json()["message"] == "Invalid proxy path"
+    assert stub_server.requests == []
+
+def test_unreachable_source_is_bad_gateway(client, admin, stub_server, proxy_url):
+    stub_server.stop()
+    assert client.get(f"{proxy_url}/api/health", headers=admin).status_code == 502
+
+def test_cache_hit_and_miss(client, admin, stub_server, proxy_url, cache):
+    stub_server.route("GET", "/api/health", 200, {"database": "ok"})
+    for _ in range(3):
+        response = client.get(f"{proxy_url}/api/health", headers=admin)
+        assert response.status_code == 200 and response.json() == {"database": "ok"}
+    assert len(stub_server.requests) == 1
+    # Another query string is another entry
+    client.get(f"{proxy_url}/api/health", params={"verbose": "1"}, headers=admin)
+    assert len(stub_server.requests) == 2
+
+def test_cache_skips_no_store_errors_and_writes(client, admin, stub_server, proxy_url, cache):
+    stub_server.route("GET", "/api/user", 200, {"login": "x"}, headers={"Cache-Control": "private, no-store"})
+    stub_server.route("GET", "/api/missing", 404, b"not found")
+    stub_server.route("POST", "/api/search", 200, [])
+    for _ in range(2):
+        client.get(f"{proxy_url}/api/user", headers=admin)
+        client.get(f"{proxy_url}/api/missing", headers=admin)
+        client.post(f"{proxy_url}/api/search", json={}, headers=admin)
+    assert len(stub_server.requests) == 6
+
+def test_cache_skips_large_bodies(client, admin, stub_server, proxy_url, cache):
+    stub_server.route("GET", "/api/big", 200, b"x" * 2048)
+    for _ in range(2):
+        assert len(client.get(f"{proxy_url}/api/big", headers=admin).content) == 2048
+    assert len(stub_server.requests) == 2
@@ -0,0 +1,36 @@
+from datetime import datetime, UTC
+from sqlmodel import select
+from app.core.summary_counters import reconcile
+from app.models.data_source import SourceType
+from app.models.grafana_dashboard import GrafanaDashboard
+from app.models.source_health import SourceHealth
+
+
+def create_grafana_source(client, admin) -> int:
+    response = client.post("/api/v1/data-sources/", json={"name": "metrics", "type": "grafana"}, headers=admin)
+    assert response.status_code == 201, response.text
+    data_source_id = response.json()["data"]["data_source"]["id"]
+    response = client.post("/api/v1/sources/grafana/", json={
+        "data_source_id": data_source_id, "source_url": "http://grafana.local", "auth_type": "bearer",
+        "bearer_token": "token",
+    }, headers=admin)
+    assert response.status_code == 201, response.text
+    return response.json()["data"]["grafana_source"]["id"]
+
+def test_delete_source_removes_dashboards_and_health(client, admin, db):
+    source_id = create_grafana_source(client, admin)
+    now = datetime.now(UTC)
+    db.add(GrafanaDashboard(grafana_source_id=source_id, uid="abc", title="Latency", url="/d/abc",
+                            fingerprint="f" * 32, synced_at=now))
+    db.add(SourceHealth(source_type=SourceType.GRAFANA, source_id=source_id, status="up", checked_at=now))
+    db.commit()
+
+    response = client.delete(f"/api/v1/sources/grafana/{source_id}", headers=admin)
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["deleted"] == {"sources": 1, "grafana_dashboards": 1, "source_health": 1}
+    assert db.exec(select(GrafanaDashboard)).all() == []
+    assert db.exec(select(SourceHealth)).all() == []
+    # Counted and fed like a cascading delete
+    assert reconcile(db) == []
+    changes = client.get("/api/v1/sources/changes", headers=admin).json()["data"]["changes"]
+    assert changes == [{"id": source_id, "deleted": True, "source": None}]
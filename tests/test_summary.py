@@ -0,0 +1,28 @@
+from tests.test_data_source_acl import create_data_source, create_source
+
+
+def test_summary_has_fixed_buckets_and_pages_the_others(client, admin):
+    data_source_ids = [create_data_source(client, admin, f"metrics-{i}") for i in range(3)]
+    create_source(client, admin, data_source_ids[0])
+    create_source(client, admin, data_source_ids[0])
+    create_source(client, admin, data_source_ids[2])
+
+    summary = client.get("/api/v1/summary/", headers=admin).json()["data"]
+    assert summary["data_sources"] == {"total": 3, "per_type": {"grafana": 3, "kibana": 0}}
+    assert summary["sources"] == {"total": 3, "per_type": {"grafana": 3, "kibana": 0}}
+    assert summary["users"]["total"] == 1
+    assert "per_role" not in summary["users"] and "per_data_source" not in summary["sources"]
+
+    page = client.get("/api/v1/summary/sources-per-data-source", params={"limit": 2}, headers=admin).json()["data"]
+    assert [(row["data_source_id"], row["sources"]) for row in page["sources_per_data_source"]] == [
+        (data_source_ids[0], 2), (data_source_ids[1], 0),
+    ]
+    page = client.get("/api/v1/summary/sources-per-data-source", params={"limit": 2, "after_id": page["next_after_id"]},
+                      headers=admin).json()["data"]
+    assert [(row["data_source_id"], row["sources"]) for row in page["sources_per_data_source"]] == [
+        (data_source_ids[2], 1),
+    ]
+    assert page["next_after_id"] is None
+
+    roles = client.get("/api/v1/summary/users-per-role", headers=admin).json()["data"]["users_per_role"]
+    assert {row["role"]: row["users"] for row in roles}["admin"] == 1
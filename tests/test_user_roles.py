@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import insert, update
+from sqlmodel import select
+from app.models.user import User
+from app.models.user_has_roles import UserHasRoles
+from tests.conftest import create_user
+from tests.test_data_source_acl import create_data_source, grant
+
+UHR = UserHasRoles.__table__
+
+
+def test_expired_membership_not_yet_swept_is_ignored(client, admin, db):
+    data_source_id = create_data_source(client, admin, "metrics")
+    response = client.post("/api/v1/roles/", json={"name": "analysts", "permission_ids": []}, headers=admin)
+    assert response.status_code == 201, response.text
+    grant(client, admin, db, data_source_id, "analysts")
+    viewer = create_user(client, admin, db, "viewer", ["read_data_source"])
+    user_id = db.exec(select(User.id).where(User.email == "viewer@example.com")).one()
+    role_id = response.json()["data"]["role"]["id"]
+    db.exec(insert(UHR).values(user_id=user_id, role_id=role_id, expires_at=datetime.now(UTC) + timedelta(hours=1)))
+    db.commit()
+
+    assert client.get(f"/api/v1/data-sources/{data_source_id}", headers=viewer).status_code == 200
+    assert "analysts" in client.get(f"/api/v1/users/{user_id}", headers=admin).json()["data"]["user"]["roles"]
+
+    # As left behind by a membership that expired before the sweeper ran
+    db.exec(update(UHR).where(UHR.c.user_id == user_id, UHR.c.role_id == role_id)
+            .values(expires_at=datetime.now(UTC) - timedelta(minutes=1)))
+    db.commit()
+
+    assert client.get(f"/api/v1/data-sources/{data_source_id}", headers=viewer).status_code == 404
+    assert client.get(f"/api/v1/users/{user_id}", headers=admin).json()["data"]["user"]["roles"] == ["viewer"]